@@ -0,0 +1,445 @@
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, NamedTuple
+from db import BUSY_TIMEOUT, connect, retry_busy
+from migrations import MIGRATIONS, migrate
+
+# Сколько страниц БД копируется за один шаг (4 МиБ при странице 4 КиБ)
+# и пауза между шагами (с): между шагами блокировка чтения снимается,
+# и в режиме журнала DELETE писатели успевают зафиксировать изменения.
+STEP_PAGES: int = 1024
+STEP_SLEEP: float = 0.005
+
+# Изменение БД другим соединением заставляет SQLite начать пошаговое
+# копирование заново. После стольких перезапусков оставшаяся часть
+# копируется за один шаг (в режиме WAL это одна транзакция чтения, она
+# не блокирует писателей).
+MAX_RESTARTS: int = 3
+
+# Сколько последних снимков хранится и как часто снимки создаются по
+# расписанию.
+KEEP: int = 7
+SNAPSHOT_INTERVAL: timedelta = timedelta(days=1)
+
+BACKUP_DIR: str = "backups"
+
+# Таблицы без триггеров, которые при восстановлении заменяются целиком
+# (задачи и архив изменяются построчно, журнал изменений сохраняется).
+RESTORED_TABLES: tuple[str, ...] = ("tags", "task_tags", "archive_task_tags")
+
+TIME_FORMAT: str = "%Y%m%d-%H%M%S"
+SNAPSHOT_NAME = re.compile(r"(?P<stem>.+)-(?P<time>\d{8}-\d{6})\.sqlite")
+
+
+class Snapshot(NamedTuple):
+    """Класс представляет собой снимок БД.
+
+    Attributes:
+        path: Путь к файлу снимка.
+        created_at: Время создания (из имени файла).
+        size: Размер файла, байт.
+    """
+
+    path: str
+    created_at: datetime
+    size: int
+
+
+class _Restarted(Exception):
+    """Пошаговое копирование перезапускалось слишком часто."""
+
+
+def backup_dir(db_name: str) -> str:
+    """Каталог снимков по умолчанию: BACKUP_DIR рядом с файлом БД."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_name)),
+                        BACKUP_DIR)
+
+
+def snapshot_path(directory: str, db_name: str, moment: datetime) -> str:
+    """Путь к снимку БД db_name, созданному в moment."""
+    return os.path.join(directory,
+                        f"{Path(db_name).stem}-{moment:{TIME_FORMAT}}.sqlite")
+
+
+def copy_database(source: sqlite3.Connection,
+                  target: sqlite3.Connection,
+                  pages: int = STEP_PAGES,
+                  sleep: float = STEP_SLEEP,
+                  max_restarts: int = MAX_RESTARTS,
+                  progress: Callable[[int, int], None] | None = None
+                  ) -> int:
+    """Копирует БД через backup API SQLite шагами по pages страниц.
+
+    Если БД меняется другим соединением, SQLite начинает копирование
+    заново; после max_restarts перезапусков копия делается за один шаг,
+    чтобы при постоянной записи копирование завершилось.
+
+    Args:
+        source: Соединение с копируемой БД.
+        target: Соединение с БД, в которую копируется.
+        pages: Страниц за шаг, -1 - за один шаг (по умол. STEP_PAGES).
+        sleep: Пауза между шагами, с (по умол. STEP_SLEEP).
+        max_restarts: Допустимое количество перезапусков
+            (по умол. MAX_RESTARTS).
+        progress: Вызывается после каждого шага с количеством
+            скопированных и всех страниц (по умол. None).
+
+    Returns:
+        Количество перезапусков копирования.
+    """
+    restarts: int = 0
+    previous: int | None = None
+
+    def on_step(status: int, remaining: int, total: int) -> None:
+        nonlocal restarts, previous
+        if previous is not None and remaining > previous:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _Restarted
+        previous = remaining
+        if progress is not None:
+            progress(total - remaining, total)
+
+    try:
+        source.backup(target, pages=pages, progress=on_step, sleep=sleep)
+    except _Restarted:
+        source.backup(target, progress=on_step)
+    return restarts
+
+
+def open_snapshot(path: str) -> sqlite3.Connection:
+    """Открывает снимок только для чтения (файлы журнала не создаются)."""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Снимок не найден: {path}")
+    return connect(f"{Path(path).absolute().as_uri()}?mode=ro", uri=True)
+
+
+def verify_snapshot(path: str) -> list[str]:
+    """Проверяет целостность снимка (PRAGMA integrity_check).
+
+    Args:
+        path: Путь к файлу снимка.
+
+    Returns:
+        Найденные ошибки; пустой список - снимок цел.
+    """
+    conn = open_snapshot(path)
+    try:
+        return [message for message, in conn.execute(
+            "PRAGMA integrity_check") if message != "ok"]
+    except sqlite3.DatabaseError as e:
+        return [str(e)]
+    finally:
+        conn.close()
+
+
+def create_snapshot(db_name: str,
+                    directory: str | None = None,
+                    pages: int = STEP_PAGES,
+                    sleep: float = STEP_SLEEP,
+                    progress: Callable[[int, int], None] | None = None
+                    ) -> Snapshot:
+    """Создает и проверяет снимок БД, не останавливая работу с ней.
+
+    Копия пишется во временный файл и переименовывается после проверки
+    целостности, поэтому в каталоге снимков не бывает недописанных или
+    поврежденных снимков. Снимок - один файл в режиме журнала DELETE.
+
+    Args:
+        db_name: Название БД.
+        directory: Каталог снимков (по умол. backup_dir(db_name)).
+        pages: Страниц за шаг копирования (по умол. STEP_PAGES).
+        sleep: Пауза между шагами, с (по умол. STEP_SLEEP).
+        progress: Обработчик хода копирования (по умол. None).
+
+    Returns:
+        Созданный снимок.
+
+    Raises:
+        FileNotFoundError: Если БД не существует.
+        RuntimeError: Если копия не прошла проверку целостности.
+    """
+    if not os.path.isfile(db_name):
+        raise FileNotFoundError(f"БД не найдена: {db_name}")
+    directory = directory or backup_dir(db_name)
+    os.makedirs(directory, exist_ok=True)
+    moment: datetime = datetime.now().replace(microsecond=0)
+    path: str = snapshot_path(directory, db_name, moment)
+    # Имя снимка - время с точностью до секунды: снимок, созданный в ту
+    # же секунду, не должен заменить предыдущий.
+    while os.path.exists(path):
+        moment += timedelta(seconds=1)
+        path = snapshot_path(directory, db_name, moment)
+    partial: str = path + ".partial"
+    try:
+        source = sqlite3.connect(db_name, timeout=BUSY_TIMEOUT)
+        target = sqlite3.connect(partial)
+        try:
+            copy_database(source, target, pages, sleep, progress=progress)
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            source.close()
+        problems: list[str] = verify_snapshot(partial)
+        if problems:
+            raise RuntimeError("Снимок поврежден: " + "; ".join(problems))
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return Snapshot(path, moment, os.path.getsize(path))
+
+
+def list_snapshots(db_name: str,
+                   directory: str | None = None) -> list[Snapshot]:
+    """Возвращает снимки БД db_name от старых к новым.
+
+    Args:
+        db_name: Название БД.
+        directory: Каталог снимков (по умол. backup_dir(db_name)).
+
+    Returns:
+        Снимки по возрастанию времени создания.
+    """
+    directory = directory or backup_dir(db_name)
+    if not os.path.isdir(directory):
+        return []
+    snapshots: list[Snapshot] = []
+    for entry in os.scandir(directory):
+        match = SNAPSHOT_NAME.fullmatch(entry.name)
+        if (match is None or not entry.is_file()
+                or match["stem"] != Path(db_name).stem):
+            continue
+        snapshots.append(Snapshot(
+            entry.path, datetime.strptime(match["time"], TIME_FORMAT),
+            entry.stat().st_size))
+    snapshots.sort(key=lambda snapshot: snapshot.created_at)
+    return snapshots
+
+
+def prune_snapshots(db_name: str,
+                    directory: str | None = None,
+                    keep: int = KEEP) -> list[Snapshot]:
+    """Удаляет снимки, кроме keep последних.
+
+    Args:
+        db_name: Название БД.
+        directory: Каталог снимков (по умол. backup_dir(db_name)).
+        keep: Сколько последних снимков оставить (по умол. KEEP).
+
+    Returns:
+        Удаленные снимки.
+
+    Raises:
+        ValueError: Если keep меньше 1.
+    """
+    if keep < 1:
+        raise ValueError("Нужно оставить хотя бы один снимок.")
+    removed: list[Snapshot] = list_snapshots(db_name, directory)[:-keep]
+    for snapshot in removed:
+        os.remove(snapshot.path)
+    return removed
+
+
+def _apply_rows(cursor: sqlite3.Cursor, table: str) -> None:
+    """Приводит строки таблицы к строкам снимка (схема snapshot),
+       изменяя только отличающиеся строки.
+
+    Изменения выполняются обычными DELETE, UPDATE и INSERT, поэтому
+    триггеры обновляют полнотекстовый индекс и журнал изменений.
+    """
+    columns: list[str] = [row[1] for row in cursor.execute(
+        f"PRAGMA main.table_info({table})")]
+    names: str = ", ".join(columns)
+    values: str = ", ".join(column for column in columns if column != "id")
+    cursor.execute("DROP TABLE IF EXISTS temp.restore_changed")
+    cursor.execute(f"""
+        CREATE TEMP TABLE restore_changed AS
+        SELECT id FROM (SELECT {names} FROM snapshot.{table}
+                        EXCEPT SELECT {names} FROM main.{table})
+    """)
+    cursor.execute(f"""
+        DELETE FROM main.{table}
+        WHERE id NOT IN (SELECT id FROM snapshot.{table})
+    """)
+    cursor.execute(f"""
+        UPDATE main.{table} SET ({values}) = (
+            SELECT {values} FROM snapshot.{table} AS restored
+            WHERE restored.id = {table}.id)
+        WHERE id IN (SELECT id FROM temp.restore_changed)
+    """)
+    cursor.execute(f"""
+        INSERT INTO main.{table} ({names})
+        SELECT {names} FROM snapshot.{table}
+        WHERE id IN (SELECT id FROM temp.restore_changed)
+          AND id NOT IN (SELECT id FROM main.{table})
+    """)
+    cursor.execute("DROP TABLE temp.restore_changed")
+
+
+def restore_snapshot(path: str, db_name: str) -> None:
+    """Восстанавливает БД из снимка.
+
+    Снимок проверяется, копируется во временный файл и дополняется
+    недостающими миграциями. Затем одной транзакцией записи в БД
+    изменяются только задачи, которые отличаются от снимка, а таблицы
+    тэгов заменяются целиком. Журнал изменений и счетчики AUTOINCREMENT
+    БД не откатываются: триггеры записывают восстановленные задачи в
+    журнал с новыми номерами, поэтому инкрементальная синхронизация
+    получает их как обычные изменения, а номера записей журнала и id
+    задач не выдаются повторно. Открытые соединения (в том числе других
+    процессов) сразу видят восстановленные данные.
+
+    Args:
+        path: Путь к файлу снимка.
+        db_name: Название БД.
+
+    Raises:
+        FileNotFoundError: Если снимка нет.
+        RuntimeError: Если снимок не прошел проверку целостности или
+            создан более новой версией программы.
+    """
+    problems: list[str] = verify_snapshot(path)
+    if problems:
+        raise RuntimeError("Снимок поврежден: " + "; ".join(problems))
+    with tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(db_name))) as directory:
+        copy: str = os.path.join(directory, "restore.sqlite")
+        source = open_snapshot(path)
+        try:
+            version: int = source.execute(
+                "PRAGMA user_version").fetchone()[0]
+            if version > len(MIGRATIONS):
+                raise RuntimeError(
+                    f"Схема снимка (версия {version}) новее схемы "
+                    f"программы ({len(MIGRATIONS)}).")
+            target = connect(copy)
+            try:
+                source.backup(target)
+                migrate(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+        conn = connect(db_name, isolation_level=None)
+        try:
+            conn.execute("ATTACH DATABASE ? AS snapshot", (copy,))
+            cursor = conn.cursor()
+            retry_busy(lambda: cursor.execute("BEGIN IMMEDIATE"))
+            try:
+                # Сначала архив: задача, перенесенная в архив в снимке,
+                # записывается в журнал как "archive".
+                for table in ("tasks_archive", "tasks"):
+                    _apply_rows(cursor, table)
+                for table in RESTORED_TABLES:
+                    cursor.execute(f"DELETE FROM main.{table}")
+                    cursor.execute(f"INSERT INTO main.{table} "
+                                   f"SELECT * FROM snapshot.{table}")
+                # id архивных задач снимка тоже не должны выдаваться
+                # повторно.
+                cursor.execute("""
+                    UPDATE sqlite_sequence SET seq = MAX(seq, (
+                        SELECT IFNULL(MAX(id), 0) FROM tasks_archive))
+                    WHERE name = 'tasks'
+                """)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            conn.execute("DETACH DATABASE snapshot")
+        finally:
+            conn.close()
+
+
+class SnapshotThread:
+    """Класс представляет собой создание снимков БД по расписанию.
+
+    Фоновый поток создает снимок каждые interval и удаляет старые,
+    оставляя keep последних. Первый снимок создается через interval
+    после последнего существующего, поэтому перезапуск программы не
+    добавляет лишних снимков.
+    """
+
+    def __init__(self,
+                 db_name: str,
+                 directory: str | None = None,
+                 interval: timedelta = SNAPSHOT_INTERVAL,
+                 keep: int = KEEP,
+                 on_snapshot: Callable[[Snapshot], None] | None = None
+                 ) -> None:
+        """Инициализация объекта SnapshotThread.
+
+        Args:
+            db_name: Название БД.
+            directory: Каталог снимков (по умол. backup_dir(db_name)).
+            interval: Период создания снимков (по умол. SNAPSHOT_INTERVAL).
+            keep: Сколько последних снимков хранить (по умол. KEEP).
+            on_snapshot: Вызывается в потоке после создания снимка
+                (по умол. None).
+        """
+        self.db_name: str = db_name
+        self.directory: str = directory or backup_dir(db_name)
+        self.interval: timedelta = interval
+        self.keep: int = keep
+        self.on_snapshot = on_snapshot
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def next_time(self) -> datetime:
+        """Время следующего снимка."""
+        snapshots = list_snapshots(self.db_name, self.directory)
+        if not snapshots:
+            return datetime.now()
+        return snapshots[-1].created_at + self.interval
+
+    def snapshot(self) -> Snapshot | None:
+        """Создает снимок и удаляет старые.
+
+        Returns:
+            Созданный снимок; None при ошибке (она выводится).
+        """
+        try:
+            snapshot = create_snapshot(self.db_name, self.directory)
+            prune_snapshots(self.db_name, self.directory, self.keep)
+        except (sqlite3.Error, OSError, RuntimeError) as e:
+            print(f"Ошибка при создании снимка БД: {e}")
+            return None
+        if self.on_snapshot is not None:
+            self.on_snapshot(snapshot)
+        return snapshot
+
+    def start(self) -> None:
+        """Запускает поток."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name="snapshots", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает поток (снимок, который создается, дописывается)."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def join(self, timeout: float | None = None) -> None:
+        """Ожидает завершения потока."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            delay = (self.next_time() - datetime.now()).total_seconds()
+            if delay > 0:
+                self._stopped.wait(delay)
+                continue
+            if self.snapshot() is None:
+                # Повтор после ошибки - не раньше, чем через минуту.
+                self._stopped.wait(min(self.interval.total_seconds(), 60))
@@ -0,0 +1,869 @@
+"""Бенчмарки слоя БД и логического слоя.
+
+Примеры:
+    python benchmark.py run --rows 100000 --output bench.json
+    python benchmark.py compare old.json bench.json
+    python benchmark.py memory --rows 1000000
+    python benchmark.py stress --processes 8 --operations 500
+    python benchmark.py http --connections 16 --requests 5000
+    python benchmark.py backup --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Iterator
+from urllib.parse import quote, urlsplit
+import backup
+from db import SORT_FIELDS, ConnectionPool, Database
+from models import Task
+from profiling import percentile
+from query import TaskQuery
+
+PRIORITIES: tuple[str, ...] = ("Low", "Medium", "High")
+
+WORDS: tuple[str, ...] = (
+    "отчет", "встреча", "клиент", "договор", "релиз", "сервер", "бюджет",
+    "презентация", "звонок", "письмо", "магазин", "ремонт", "врач",
+    "оплата", "проект", "тест", "документы", "план", "анализ", "покупки",
+    "report", "meeting", "deploy", "review", "invoice", "backup",
+    "migration", "design", "support", "release", "budget", "roadmap")
+
+TAGS: tuple[str, ...] = (
+    "работа", "дом", "срочно", "покупки", "здоровье", "финансы", "учеба",
+    "семья", "work", "home", "urgent", "personal", "backend", "frontend",
+    "ops", "docs", "later", "ideas")
+
+
+def generate_tasks(count: int, seed: int = 0) -> Iterator[tuple]:
+    """Генерирует синтетические задачи для add_tasks_bulk.
+
+    Заголовок - 2-4 слова, описание - 5-25 слов, 0-3 тэга через запятую,
+    дедлайн в пределах года от текущей даты (у 15% задач его нет).
+
+    Args:
+        count: Количество задач.
+        seed: Зерно генератора (по умол. 0).
+
+    Returns:
+        Кортежи (title, description, priority, deadline, tags).
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    for _ in range(count):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(2, 4))).capitalize()
+        description = " ".join(rng.choices(WORDS, k=rng.randint(5, 25)))
+        priority = rng.choice(PRIORITIES)
+        deadline = (None if rng.random() < 0.15 else
+                    now + timedelta(minutes=rng.randint(-525600, 525600)))
+        tags = ", ".join(rng.sample(TAGS, rng.randint(0, 3))) or None
+        yield title, description, priority, deadline, tags
+
+
+def create_database(path: str, rows: int, seed: int = 0) -> None:
+    """Создает БД с rows синтетическими задачами; примерно треть задач
+       завершена."""
+    pool = ConnectionPool(path)
+    with pool.session() as db:
+        db.add_tasks_bulk(generate_tasks(rows, seed), batch_size=10000)
+        db.cursor.execute("""
+            UPDATE tasks SET status = 1, completed_at = created_at
+            WHERE id % 3 = 0
+        """)
+    pool.close_all()
+
+
+def summarize(latencies: list[float]) -> dict:
+    """Сводит замеры (в секундах) в пропускную способность и перцентили
+       задержки (в миллисекундах)."""
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        "count": len(values),
+        "total_s": round(total, 6),
+        "ops_per_s": round(len(values) / total, 2) if total else None,
+        "mean_ms": round(total / len(values) * 1000, 4) if values else None,
+        "min_ms": round(values[0] * 1000, 4) if values else None,
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if values else None,
+    }
+
+
+def measure(operation: Callable[[int], object], repeat: int) -> dict:
+    """Выполняет operation(i) repeat раз и возвращает сводку задержек."""
+    latencies: list[float] = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def run_benchmarks(db: Database, rows: int, repeat: int, seed: int) -> dict:
+    """Запускает бенчмарки методов Database на подготовленной БД.
+
+    Args:
+        db: Объект Database.
+        rows: Количество задач в БД.
+        repeat: Количество повторов для запросов чтения.
+        seed: Зерно генератора.
+
+    Returns:
+        Словарь "имя бенчмарка" -> сводка.
+    """
+    rng = random.Random(seed + 1)
+    results: dict = {}
+    new_tasks = list(generate_tasks(max(repeat * 20, 100), seed + 2))
+
+    def add_task(i: int) -> None:
+        db.add_task(*new_tasks[i])
+
+    results["add_task"] = measure(add_task, len(new_tasks))
+
+    for sort_field in (None, *SORT_FIELDS):
+        for sort_order in ("ascending", "descending"):
+            for priority_filter in ("All", "High"):
+                if sort_field is None and sort_order == "descending":
+                    continue
+                name = (f"get_tasks[{sort_field or 'none'},"
+                        f"{sort_order},{priority_filter}]")
+                results[name] = measure(
+                    lambda i: db.get_tasks(
+                        sort_field, sort_order, priority_filter), repeat)
+                results[name.replace("get_tasks", "get_tasks_page")] = (
+                    measure(lambda i: db.get_tasks_page(
+                        sort_field, sort_order, priority_filter, 100),
+                        repeat * 10))
+
+    terms = [rng.choice(WORDS)[:rng.randint(3, 6)] for _ in range(repeat * 10)]
+    results["search_tasks"] = measure(
+        lambda i: db.search_tasks(terms[i]), len(terms))
+    # Поиск вместе с фильтрами и сортировкой - один запрос TaskQuery.
+    query = TaskQuery().where_priority("High").order_by("deadline")
+    results["query_tasks[search,High,deadline]"] = measure(
+        lambda i: db.query_tasks(query.where_text(terms[i])), len(terms))
+
+    ids = [rng.randint(1, rows) for _ in range(repeat * 20)]
+    results["get_task_by_id"] = measure(
+        lambda i: db.get_task_by_id(ids[i]), len(ids))
+    results["update_task"] = measure(
+        lambda i: db.update_task(ids[i], title=f"Обновлено {i}",
+                                 priority=rng.choice(PRIORITIES)), len(ids))
+    results["update_task_status"] = measure(
+        lambda i: db.update_task_status(ids[i], "Completed", datetime.now()),
+        len(ids))
+    return results
+
+
+def measure_cli_startup(db_path: str, repeat: int) -> dict:
+    """Замеряет время запуска `python -m cli list --limit 1` в отдельном
+       процессе (вместе со стартом интерпретатора).
+
+    Первый запуск не учитывается: он записывает байт-код модулей
+    (даже если задан PYTHONDONTWRITEBYTECODE), как у установленного
+    приложения.
+    """
+    command = [sys.executable, "-m", "cli", "--db", db_path,
+               "list", "--limit", "1"]
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    def run(i: int) -> None:
+        subprocess.run(command, cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    run(0)
+    return measure(run, repeat)
+
+
+def command_run(args: argparse.Namespace) -> int:
+    """Создает синтетическую БД, запускает бенчмарки и сохраняет JSON."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = args.db or os.path.join(directory, "benchmark.sqlite")
+        if not os.path.exists(db_path):
+            start = time.perf_counter()
+            create_database(db_path, args.rows, args.seed)
+            print(f"Создана БД на {args.rows} задач за "
+                  f"{time.perf_counter() - start:.1f} с", file=sys.stderr)
+        pool = ConnectionPool(db_path)
+        with pool.session() as db:
+            results = run_benchmarks(db, args.rows, args.repeat, args.seed)
+        pool.close_all()
+        results["cli_startup"] = measure_cli_startup(db_path, args.repeat)
+
+    report = {
+        "meta": {
+            "rows": args.rows,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    for name, stats in results.items():
+        print(f"{name:<50} p50 {stats['p50_ms']:>10.3f} ms  "
+              f"p99 {stats['p99_ms']:>10.3f} ms  "
+              f"{stats['ops_per_s'] or 0:>10.1f} op/s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    return 0
+
+
+def command_compare(args: argparse.Namespace) -> int:
+    """Сравнивает p50 двух отчетов; возвращает 1, если есть регрессия
+       больше порога."""
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    with open(args.current, encoding="utf-8") as file:
+        current = json.load(file)["results"]
+    regressions = 0
+    for name in sorted(baseline.keys() & current.keys()):
+        before = baseline[name]["p50_ms"]
+        after = current[name]["p50_ms"]
+        ratio = after / before if before else float("inf")
+        mark = ""
+        if ratio > 1 + args.threshold:
+            mark = "  РЕГРЕССИЯ"
+            regressions += 1
+        print(f"{name:<50} {before:>10.3f} -> {after:>10.3f} ms "
+              f"(x{ratio:.2f}){mark}")
+    return 1 if regressions else 0
+
+
+class DictTask:
+    """Прежнее представление задачи (обычный класс с __dict__), только
+       для сравнения расхода памяти."""
+
+    def __init__(self, id, title, description, priority, deadline, status,
+                 created_at, completed_at, tags) -> None:
+        self.id = id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.deadline = deadline
+        self.status = status
+        self.created_at = created_at
+        self.completed_at = completed_at
+        self.tags = tags
+
+
+def object_overhead(task: object) -> int:
+    """Размер самого объекта задачи без значений полей (с __dict__,
+       если он есть)."""
+    size = sys.getsizeof(task)
+    if hasattr(task, "__dict__"):
+        size += sys.getsizeof(vars(task))
+    return size
+
+
+def measure_memory(load: Callable[[], list]) -> dict:
+    """Замеряет память, занятую списком задач, и пик во время загрузки.
+
+    Память значений полей (строк) входит в оба показателя, поэтому
+    сравнивать имеет смысл только разные представления одной выборки.
+    """
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    tasks = load()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(tasks)
+    overhead = object_overhead(tasks[0]) if tasks else None
+    del tasks
+    return {
+        "tasks": count,
+        "object_overhead_bytes": overhead,
+        "seconds": round(elapsed, 3),
+        "retained_bytes": current - before,
+        "peak_bytes": peak - before,
+        "retained_bytes_per_task": round((current - before) / count, 1)
+        if count else None,
+        "peak_bytes_per_task": round((peak - before) / count, 1)
+        if count else None,
+    }
+
+
+def command_memory(args: argparse.Namespace) -> int:
+    """Сравнивает расход памяти на список задач: кортежи fetchall() +
+       объекты с __dict__ против Task, создаваемых row_factory."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = args.db or os.path.join(directory, "benchmark.sqlite")
+        if not os.path.exists(db_path):
+            create_database(db_path, args.rows, args.seed)
+        pool = ConnectionPool(db_path)
+        with pool.session() as db:
+            def load_legacy() -> list:
+                db.cursor.execute("SELECT * FROM tasks")
+                rows = db.cursor.fetchall()
+                return [DictTask(*row) for row in rows]
+
+            results = {
+                "tuple_rows_and_dict_objects": measure_memory(load_legacy),
+                "task_row_factory": measure_memory(db.get_tasks),
+            }
+        pool.close_all()
+
+    for name, stats in results.items():
+        print(f"{name:<30} {stats['tasks']:>9} задач  "
+              f"{stats['retained_bytes_per_task']:>8} байт/задачу  "
+              f"пик {stats['peak_bytes_per_task']:>8} байт/задачу  "
+              f"объект {stats['object_overhead_bytes']} байт")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"task_type": Task.__name__, "results": results},
+                      file, ensure_ascii=False, indent=2)
+    return 0
+
+
+def stress_worker(db_path: str,
+                  worker: int,
+                  operations: int,
+                  seed: int,
+                  journal_mode: str = "WAL") -> dict:
+    """Процесс нагрузочного теста: смесь чтений и записей через Database.
+
+    Процесс изменяет только добавленные им задачи и запоминает, какими
+    они должны остаться, а также сколько задач добавил пакетами; ошибкой
+    считается запись, которая вернула None/False (например, "database
+    is locked").
+
+    Args:
+        db_path: Путь к БД.
+        worker: Номер процесса.
+        operations: Количество операций.
+        seed: Зерно генератора.
+        journal_mode: Режим журнала SQLite (по умол. "WAL").
+
+    Returns:
+        Ожидаемое состояние задач процесса, количество задач,
+        добавленных пакетами, количество ошибок и замеры
+        времени чтений и записей (с).
+    """
+    rng = random.Random(seed * 1000 + worker)
+    expected: dict[int, list] = {}
+    bulk_added: int = 0
+    failures: int = 0
+    latencies: dict[str, list[float]] = {"read": [], "write": []}
+    pool = ConnectionPool(db_path, journal_mode)
+    with pool.session() as db:
+        for i in range(operations):
+            choice = rng.random()
+            kind = "write"
+            start = time.perf_counter()
+            if choice < 0.5:
+                kind = "read"
+                if choice < 0.2:
+                    db.get_tasks_page(rng.choice(SORT_FIELDS), "ascending",
+                                      rng.choice(PRIORITIES), 50)
+                elif choice < 0.35:
+                    db.search_tasks(rng.choice(WORDS)[:4])
+                else:
+                    db.get_task_by_id(rng.randint(1, 1000))
+            elif choice < 0.55:
+                rows = [(f"stress bulk {worker} {i} {n}", "", "Low", None,
+                         "stress") for n in range(10)]
+                if db.add_tasks_bulk(rows) is None:
+                    failures += 1
+                else:
+                    bulk_added += len(rows)
+            elif choice < 0.75 or not expected:
+                title = f"stress {worker} {i}"
+                task_id = db.add_task(title, "0", "Low", None, "stress")
+                if task_id is None:
+                    failures += 1
+                else:
+                    expected[task_id] = [title, "0", "Open"]
+            elif choice < 0.95:
+                task_id = rng.choice(list(expected))
+                if db.update_task(task_id, description=str(i)):
+                    expected[task_id][1] = str(i)
+                else:
+                    failures += 1
+            else:
+                task_id = rng.choice(list(expected))
+                outcomes = db.update_tasks_status(
+                    [task_id], "Completed", datetime.now())
+                if outcomes and outcomes[task_id]:
+                    expected[task_id][2] = "Completed"
+                else:
+                    failures += 1
+            latencies[kind].append(time.perf_counter() - start)
+    pool.close_all()
+    return {"expected": expected, "bulk_added": bulk_added,
+            "failures": failures, "latencies": latencies}
+
+
+def check_stress(db_path: str, reports: list[dict]) -> dict[str, int]:
+    """Сверяет БД после нагрузочного теста с отчетами процессов
+       stress_worker.
+
+    Args:
+        db_path: Путь к БД.
+        reports: Отчеты процессов.
+
+    Returns:
+        Количество потерянных задач (подтвержденных, но отсутствующих в
+        БД), лишних (в БД, хотя добавление завершилось ошибкой) и задач
+        с неверными данными.
+    """
+    expected: dict[int, list] = {}
+    bulk_added: int = 0
+    for report in reports:
+        expected.update(report["expected"])
+        bulk_added += report["bulk_added"]
+    pool = ConnectionPool(db_path)
+    with pool.session() as db:
+        db.cursor.execute(
+            "SELECT COUNT(*) FROM tasks WHERE title LIKE 'stress bulk %'")
+        bulk_stored: int = db.cursor.fetchone()[0]
+        db.cursor.execute(
+            "SELECT COUNT(*) FROM tasks WHERE title LIKE 'stress %'")
+        stored: int = db.cursor.fetchone()[0] - bulk_stored
+        found: list[Task] = db.get_tasks_by_ids(expected)
+    pool.close_all()
+    return {
+        "lost": len(expected) - len(found) + max(bulk_added - bulk_stored, 0),
+        "unexpected": stored - len(found) + max(bulk_stored - bulk_added, 0),
+        "mismatched": sum(
+            [task.title, task.description, task.status] != expected[task.id]
+            for task in found),
+    }
+
+
+def command_stress(args: argparse.Namespace) -> int:
+    """Запускает несколько процессов со смешанной нагрузкой на одну БД
+       и проверяет, что ни одна подтвержденная запись не потеряна."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = args.db or os.path.join(directory, "stress.sqlite")
+        if not os.path.exists(db_path):
+            create_database(db_path, args.rows, args.seed)
+        start = time.perf_counter()
+        # Режим журнала хранится в файле БД: переключается заранее,
+        # пока к ней нет других соединений.
+        ConnectionPool(db_path, args.journal_mode).close_all()
+        with ProcessPoolExecutor(args.processes) as executor:
+            reports = list(executor.map(
+                stress_worker, [db_path] * args.processes,
+                range(args.processes), [args.operations] * args.processes,
+                [args.seed] * args.processes,
+                [args.journal_mode] * args.processes))
+        elapsed = time.perf_counter() - start
+
+        check = check_stress(db_path, reports)
+        lost: int = check["lost"]
+        unexpected: int = check["unexpected"]
+        mismatched: int = check["mismatched"]
+
+    failures = sum(report["failures"] for report in reports)
+    operations = args.processes * args.operations
+    print(f"Процессов: {args.processes}, операций: {operations}, "
+          f"{elapsed:.2f} с, {operations / elapsed:.1f} оп/с")
+    results: dict = {}
+    for kind in ("read", "write"):
+        latencies = [value for report in reports
+                     for value in report["latencies"][kind]]
+        results[kind] = summarize(latencies)
+        print(f"{kind:<6} {len(latencies):>7} оп  "
+              f"p50 {results[kind]['p50_ms']:>8.3f} ms  "
+              f"p99 {results[kind]['p99_ms']:>8.3f} ms")
+    print(f"Ошибок записи: {failures}, потеряно: {lost}, "
+          f"с неверными данными: {mismatched}, лишних: {unexpected}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"processes": args.processes,
+                       "operations": operations,
+                       "seconds": round(elapsed, 3),
+                       "ops_per_s": round(operations / elapsed, 1),
+                       "results": results,
+                       "failures": failures,
+                       "lost": lost,
+                       "mismatched": mismatched,
+                       "unexpected": unexpected},
+                      file, ensure_ascii=False, indent=2)
+    return 1 if failures or lost or mismatched or unexpected else 0
+
+
+async def http_request(reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter,
+                       host: str,
+                       method: str,
+                       target: str,
+                       body: bytes = b"") -> tuple[int, bytes]:
+    """Выполняет запрос HTTP/1.1 в постоянном соединении.
+
+    Returns:
+        Код ответа и тело (chunked-ответ собирается целиком).
+    """
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: {host}\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    header = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status = int(header.split(" ", 2)[1])
+    headers = {name.strip().lower(): value.strip()
+               for name, _, value in (line.partition(":")
+                                      for line in header.split("\r\n")[1:])}
+    if headers.get("transfer-encoding") != "chunked":
+        return status, await reader.readexactly(
+            int(headers.get("content-length", 0)))
+    chunks: list[bytes] = []
+    while True:
+        size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+        chunk = await reader.readexactly(size + 2)
+        if not size:
+            return status, b"".join(chunks)
+        chunks.append(chunk[:-2])
+
+
+async def http_load(url: str,
+                    connections: int,
+                    requests: int,
+                    write_ratio: float,
+                    seed: int) -> dict:
+    """Выполняет requests смешанных запросов к API через connections
+       постоянных соединений.
+
+    Returns:
+        Задержки по видам запросов, количество ошибок и время.
+    """
+    address = urlsplit(url)
+    host, port = address.hostname, address.port or 80
+    reader, writer = await asyncio.open_connection(host, port)
+    _, body = await http_request(reader, writer, host, "GET",
+                                 "/tasks?sort_order=descending&limit=1")
+    writer.close()
+    max_id: int = json.loads(body)["tasks"][0]["id"]
+    rng = random.Random(seed)
+    latencies: dict[str, list[float]] = {}
+    errors: list[int] = [0]
+    remaining: list[int] = [requests]
+
+    def next_request() -> tuple[str, str, str, bytes]:
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                record = {"title": f"http {rng.choice(WORDS)}",
+                          "priority": rng.choice(PRIORITIES)}
+                return ("add", "POST", "/tasks",
+                        json.dumps(record).encode())
+            record = {"priority": rng.choice(PRIORITIES)}
+            return ("update", "PATCH", f"/tasks/{rng.randint(1, max_id)}",
+                    json.dumps(record).encode())
+        kind = rng.choice(("get", "list", "search"))
+        if kind == "get":
+            return kind, "GET", f"/tasks/{rng.randint(1, max_id)}", b""
+        if kind == "list":
+            field = rng.choice(SORT_FIELDS)
+            return (kind, "GET",
+                    f"/tasks?sort_field={field}&status=Open&limit=50", b"")
+        return (kind, "GET",
+                f"/tasks?search={quote(rng.choice(WORDS))}&limit=20", b"")
+
+    async def client() -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                kind, method, target, body = next_request()
+                start = time.perf_counter()
+                status, _ = await http_request(reader, writer, host,
+                                               method, target, body)
+                latencies.setdefault(kind, []).append(
+                    time.perf_counter() - start)
+                # 404 - обновление задачи, удаленной другим тестом.
+                if status >= 400 and status != 404:
+                    errors[0] += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    stream_start = time.perf_counter()
+    _, body = await http_request(reader, writer, host, "GET",
+                                 "/tasks/stream")
+    stream_elapsed = time.perf_counter() - stream_start
+    writer.close()
+    return {"seconds": elapsed,
+            "latencies": latencies,
+            "errors": errors[0],
+            "stream": {"tasks": len(json.loads(body)),
+                       "bytes": len(body),
+                       "seconds": round(stream_elapsed, 3)}}
+
+
+def command_http(args: argparse.Namespace) -> int:
+    """Нагрузочный тест HTTP API: запросы в секунду и перцентили
+       задержки по видам запросов. Без --url запускает сервер на
+       синтетической БД в отдельном процессе."""
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        url = args.url
+        if url is None:
+            db_path = args.db or os.path.join(directory, "http.sqlite")
+            if not os.path.exists(db_path):
+                create_database(db_path, args.rows, args.seed)
+            server = subprocess.Popen(
+                [sys.executable, "server.py", "--port", "0",
+                 "--db", db_path, "--workers", str(args.workers)],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stdout=subprocess.PIPE, text=True, encoding="utf-8")
+            url = server.stdout.readline().split()[-1]
+        try:
+            report = asyncio.run(http_load(
+                url, args.connections, args.requests, args.write_ratio,
+                args.seed))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    elapsed = report["seconds"]
+    print(f"Соединений: {args.connections}, запросов: {args.requests}, "
+          f"{elapsed:.2f} с, {args.requests / elapsed:.1f} запр/с")
+    results: dict = {}
+    for kind, latencies in sorted(report["latencies"].items()):
+        results[kind] = summarize(latencies)
+        print(f"{kind:<7} {len(latencies):>7} запр  "
+              f"p50 {results[kind]['p50_ms']:>8.3f} ms  "
+              f"p99 {results[kind]['p99_ms']:>8.3f} ms")
+    stream = report["stream"]
+    print(f"stream: {stream['tasks']} задач, "
+          f"{stream['bytes'] / 1024 / 1024:.1f} МиБ за "
+          f"{stream['seconds']:.2f} с")
+    print(f"Ошибок: {report['errors']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"connections": args.connections,
+                       "requests": args.requests,
+                       "seconds": round(elapsed, 3),
+                       "requests_per_s": round(args.requests / elapsed, 1),
+                       "results": results,
+                       "stream": stream,
+                       "errors": report["errors"]},
+                      file, ensure_ascii=False, indent=2)
+    return 1 if report["errors"] else 0
+
+
+def write_load(db_path: str,
+               stop: threading.Event,
+               pause: float) -> dict:
+    """Добавляет задачи по одной с паузой pause, пока не выставлен stop.
+
+    Returns:
+        Задержки записей (с) и количество неудачных записей.
+    """
+    report: dict = {"latencies": [], "failures": 0}
+    pool = ConnectionPool(db_path)
+    with pool.session() as db:
+        while not stop.is_set():
+            start = time.perf_counter()
+            if db.add_task("backup bench", "", "Low", None, None) is None:
+                report["failures"] += 1
+            else:
+                report["latencies"].append(time.perf_counter() - start)
+            stop.wait(pause)
+    pool.close_all()
+    return report
+
+
+def under_write_load(db_path: str,
+                     pause: float,
+                     action: Callable[[], object]) -> tuple:
+    """Выполняет action, пока другой поток пишет в БД.
+
+    Returns:
+        Результат action, время его выполнения (с) и отчет write_load.
+    """
+    stop = threading.Event()
+    reports: list[dict] = []
+    writer = threading.Thread(target=lambda: reports.append(
+        write_load(db_path, stop, pause)))
+    writer.start()
+    try:
+        start = time.perf_counter()
+        result = action()
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        writer.join()
+    return result, elapsed, reports[0]
+
+
+def command_backup(args: argparse.Namespace) -> int:
+    """Время создания снимка через backup API, его проверки и
+       восстановления и задержка записи во время копирования."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = args.db or os.path.join(directory, "backup.sqlite")
+        if not os.path.exists(db_path):
+            create_database(db_path, args.rows, args.seed)
+        # Режим журнала (WAL) переключается до начала записи.
+        ConnectionPool(db_path).close_all()
+        snapshots = os.path.join(directory, "snapshots")
+
+        _, _, writes = under_write_load(
+            db_path, args.write_pause, lambda: time.sleep(args.baseline))
+        results: dict = {"baseline": {
+            "seconds": args.baseline, "failures": writes["failures"],
+            "writes": summarize(writes["latencies"])}}
+        snapshot = None
+        for pages in args.pages:
+            steps: dict = {"steps": 0, "restarts": 0, "copied": 0}
+
+            def progress(copied: int, total: int) -> None:
+                steps["steps"] += 1
+                steps["restarts"] += copied < steps["copied"]
+                steps["copied"] = copied
+
+            snapshot, elapsed, writes = under_write_load(
+                db_path, args.write_pause,
+                lambda: backup.create_snapshot(db_path, snapshots, pages,
+                                               progress=progress))
+            results[f"snapshot_pages_{pages}"] = {
+                "seconds": round(elapsed, 3),
+                "mib_per_s": round(snapshot.size / 2 ** 20 / elapsed, 1),
+                "steps": steps["steps"], "restarts": steps["restarts"],
+                "failures": writes["failures"],
+                "writes": summarize(writes["latencies"])}
+
+        start = time.perf_counter()
+        problems = backup.verify_snapshot(snapshot.path)
+        results["verify"] = {"seconds": round(time.perf_counter() - start, 3),
+                             "problems": problems}
+        _, elapsed, writes = under_write_load(
+            db_path, args.write_pause,
+            lambda: backup.restore_snapshot(snapshot.path, db_path))
+        results["restore"] = {"seconds": round(elapsed, 3),
+                              "failures": writes["failures"],
+                              "writes": summarize(writes["latencies"])}
+        size: int = snapshot.size
+
+    print(f"Снимок: {size / 2 ** 20:.1f} МиБ")
+    for name, stats in results.items():
+        line = f"{name:<22} {stats['seconds']:>8.3f} с"
+        if "restarts" in stats:
+            line += (f"  {stats['mib_per_s']:>7.1f} МиБ/с  "
+                     f"перезапусков {stats['restarts']}")
+        if "writes" in stats:
+            line += (f"  запись p50 {stats['writes']['p50_ms']:.3f} ms  "
+                     f"p99 {stats['writes']['p99_ms']:.3f} ms  "
+                     f"max {stats['writes']['max_ms']:.3f} ms  "
+                     f"ошибок {stats['failures']}")
+        print(line)
+    if problems:
+        print("Снимок поврежден: " + "; ".join(problems))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"snapshot_bytes": size, "results": results},
+                      file, ensure_ascii=False, indent=2)
+    return 1 if problems else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создает парсер аргументов командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="запустить бенчмарки")
+    run_parser.add_argument("--rows", type=int, default=10000,
+                            help="размер синтетической БД (по умол. 10000)")
+    run_parser.add_argument("--repeat", type=int, default=5,
+                            help="повторы запросов чтения (по умол. 5)")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--db", help="готовая БД (создается, если нет)")
+    run_parser.add_argument("--output", help="файл JSON с результатами")
+    run_parser.set_defaults(handler=command_run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="сравнить два отчета")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="допустимое замедление (по умол. 0.2)")
+    compare_parser.set_defaults(handler=command_compare)
+
+    memory_parser = commands.add_parser(
+        "memory", help="память на список задач (байт на задачу)")
+    memory_parser.add_argument("--rows", type=int, default=1000000)
+    memory_parser.add_argument("--seed", type=int, default=0)
+    memory_parser.add_argument("--db", help="готовая БД (создается, если нет)")
+    memory_parser.add_argument("--output", help="файл JSON с результатами")
+    memory_parser.set_defaults(handler=command_memory)
+
+    stress_parser = commands.add_parser(
+        "stress", help="несколько процессов с чтением и записью в одну БД")
+    stress_parser.add_argument("--processes", type=int, default=8)
+    stress_parser.add_argument("--operations", type=int, default=500,
+                               help="операций на процесс (по умол. 500)")
+    stress_parser.add_argument("--rows", type=int, default=1000,
+                               help="размер исходной БД (по умол. 1000)")
+    stress_parser.add_argument("--journal-mode", default="WAL",
+                               help="режим журнала SQLite (по умол. WAL)")
+    stress_parser.add_argument("--seed", type=int, default=0)
+    stress_parser.add_argument("--db", help="готовая БД (создается, если нет)")
+    stress_parser.add_argument("--output", help="файл JSON с результатами")
+    stress_parser.set_defaults(handler=command_stress)
+
+    http_parser = commands.add_parser(
+        "http", help="нагрузочный тест HTTP API (server.py)")
+    http_parser.add_argument("--url",
+                             help="адрес запущенного сервера (по умол. "
+                                  "запускается на синтетической БД)")
+    http_parser.add_argument("--connections", type=int, default=16)
+    http_parser.add_argument("--requests", type=int, default=5000)
+    http_parser.add_argument("--write-ratio", type=float, default=0.1,
+                             help="доля запросов записи (по умол. 0.1)")
+    http_parser.add_argument("--workers", type=int, default=4,
+                             help="потоков БД сервера (по умол. 4)")
+    http_parser.add_argument("--rows", type=int, default=10000,
+                             help="размер синтетической БД (по умол. 10000)")
+    http_parser.add_argument("--seed", type=int, default=0)
+    http_parser.add_argument("--db", help="готовая БД (создается, если нет)")
+    http_parser.add_argument("--output", help="файл JSON с результатами")
+    http_parser.set_defaults(handler=command_http)
+
+    backup_parser = commands.add_parser(
+        "backup", help="снимок БД под нагрузкой записи")
+    backup_parser.add_argument("--rows", type=int, default=1000000,
+                               help="размер синтетической БД "
+                                    "(по умол. 1000000)")
+    backup_parser.add_argument("--pages", type=int, nargs="+",
+                               default=[backup.STEP_PAGES, -1],
+                               help="страниц за шаг копирования, -1 - "
+                                    "за один шаг (по умол. 1024 -1)")
+    backup_parser.add_argument("--write-pause", type=float, default=0.01,
+                               help="пауза между записями, с "
+                                    "(по умол. 0.01)")
+    backup_parser.add_argument("--baseline", type=float, default=3.0,
+                               help="длительность замера записи без "
+                                    "копирования, с (по умол. 3)")
+    backup_parser.add_argument("--seed", type=int, default=0)
+    backup_parser.add_argument("--db", help="готовая БД (создается, если нет)")
+    backup_parser.add_argument("--output", help="файл JSON с результатами")
+    backup_parser.set_defaults(handler=command_backup)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    sys.exit(arguments.handler(arguments))
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable
+
+# Количество запросов, результаты которых хранятся в кэше.
+CACHE_SIZE: int = 256
+
+
+class QueryCache:
+    """Класс представляет собой кэш результатов запросов с вытеснением
+       давно не использованных (LRU) и ограничением размера.
+
+    Ключ - кортеж, первый элемент которого - вид запроса, а параметры
+    запроса следуют за ним. Для вида "task" второй элемент - id задачи:
+    такие записи можно сбросить выборочно (invalidate).
+
+    Каждый сброс увеличивает поколение кэша. Результат, прочитанный
+    из БД до сброса, не сохраняется (put с устаревшим поколением),
+    поэтому параллельный поток не вернет в кэш старые данные.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE) -> None:
+        """Инициализация объекта QueryCache.
+
+        Args:
+            maxsize: Наибольшее количество записей (по умол. CACHE_SIZE).
+        """
+        self.maxsize: int = maxsize
+        self.generation: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[bool, object]:
+        """Ищет результат запроса.
+
+        Args:
+            key: Ключ запроса.
+
+        Returns:
+            Пара (найден ли результат, результат).
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key: Hashable, value: object, generation: int) -> None:
+        """Сохраняет результат запроса, если с начала его чтения кэш
+           не сбрасывался.
+
+        Args:
+            key: Ключ запроса.
+            value: Результат.
+            generation: Поколение кэша на момент начала чтения.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, task_ids: Iterable[int] | None = None) -> None:
+        """Сбрасывает результаты, которые могли измениться.
+
+        Args:
+            task_ids: id измененных задач: сбрасываются записи этих задач
+                и все списки (по умол. None - весь кэш).
+        """
+        with self._lock:
+            self.generation += 1
+            if task_ids is None:
+                self._entries.clear()
+                return
+            changed = set(task_ids)
+            for key in list(self._entries):
+                if key[0] != "task" or key[1] in changed:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
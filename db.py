@@ -1,40 +1,183 @@
 import sqlite3
-from datetime import datetime, date
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, time
+from itertools import islice
+from time import sleep
+from typing import Callable, Iterable, Iterator, TypeVar
+from migrations import migrate
+from models import (PRIORITY_NAMES, STATUS_CODES, STATUS_NAMES, Task,
+                    TaskChange, encode_field, task_row_factory)
+from profiling import cursor_class, profiled
+from query import SORT_FIELDS, TASK_COLUMNS, TaskQuery, build_fts_query
+from tags import replace_task_tags
+
+DB_NAME: str = "graduation_project.sqlite"
+
+T = TypeVar("T")
+
+DEFAULT_PRAGMAS: dict[str, str | int] = {
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -8000,
+}
+
+# Сколько соединение ждет, пока другое соединение (в том числе другой
+# процесс) снимет блокировку, прежде чем запрос завершится ошибкой
+# "database is locked" (с).
+BUSY_TIMEOUT: float = 5.0
+
+# Сколько раз повторяется попытка начать транзакцию записи, если БД
+# заблокирована дольше BUSY_TIMEOUT, и пауза перед первым повтором (с);
+# пауза удваивается с каждой попыткой.
+WRITE_RETRIES: int = 3
+RETRY_DELAY: float = 0.05
+
+# Ожидание блокировки и количество повторов для записей из потока GUI
+# (ConnectionPool.limit_thread_writes): пока БД пишет другой процесс,
+# окно зависает не дольше ~1 с, а запись завершается ошибкой.
+INTERACTIVE_BUSY_TIMEOUT: float = 0.5
+INTERACTIVE_WRITE_RETRIES: int = 1
+
+# Сколько id подставляется в одно условие id IN (...): SQLite
+# ограничивает количество параметров запроса.
+MAX_IN_PARAMETERS: int = 500
+
+
+def adapt_datetime(value: datetime) -> int:
+    """Адаптер sqlite3: datetime -> секунды эпохи (naive - местное
+       время)."""
+    return int(value.timestamp())
+
+
+def adapt_date(value: date) -> int:
+    """Адаптер sqlite3: date -> секунды эпохи начала дня."""
+    return adapt_datetime(datetime.combine(value, time()))
+
+
+def convert_epoch(value: bytes) -> datetime:
+    """Конвертер sqlite3 для столбцов типа EPOCH: секунды эпохи ->
+       datetime в местном времени."""
+    return datetime.fromtimestamp(int(value))
+
+
+def convert_priority(value: bytes) -> str:
+    """Конвертер sqlite3 для столбцов типа PRIORITY: код -> имя."""
+    return PRIORITY_NAMES[int(value)]
+
+
+def convert_status(value: bytes) -> str:
+    """Конвертер sqlite3 для столбцов типа STATUS: код -> имя."""
+    return STATUS_NAMES[int(value)]
+
+
+sqlite3.register_adapter(datetime, adapt_datetime)
+sqlite3.register_adapter(date, adapt_date)
+sqlite3.register_converter("EPOCH", convert_epoch)
+sqlite3.register_converter("PRIORITY", convert_priority)
+sqlite3.register_converter("STATUS", convert_status)
+
+
+def connect(db_name: str, **kwargs) -> sqlite3.Connection:
+    """Открывает соединение, в котором столбцы EPOCH читаются как
+       datetime, PRIORITY и STATUS - как имена, а заблокированная БД
+       ожидается до BUSY_TIMEOUT.
+
+    Args:
+        db_name: Название БД.
+        kwargs: Дополнительные аргументы sqlite3.connect.
+
+    Returns:
+        Соединение с БД.
+    """
+    kwargs.setdefault("timeout", BUSY_TIMEOUT)
+    return sqlite3.connect(
+        db_name, detect_types=sqlite3.PARSE_DECLTYPES, **kwargs)
+
+
+def to_datetime(value: str | date | None) -> datetime | date | None:
+    """Приводит строку ISO 8601 к datetime, остальное возвращает как
+       есть."""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def is_busy(error: sqlite3.Error) -> bool:
+    """Проверяет, что ошибка вызвана блокировкой БД другим соединением
+       (SQLITE_BUSY или SQLITE_LOCKED)."""
+    code: int | None = getattr(error, "sqlite_errorcode", None)
+    if code is None:
+        return "locked" in str(error)
+    return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def retry_busy(operation: Callable[[], T], retries: int | None = None) -> T:
+    """Выполняет операцию, повторяя ее, пока БД заблокирована другим
+       соединением: до retries повторов с удваивающейся паузой
+       (со случайным разбросом, чтобы процессы не повторяли попытки
+       одновременно).
+
+    Args:
+        operation: Операция над БД.
+        retries: Количество повторов (по умол. None - WRITE_RETRIES).
+
+    Returns:
+        Результат операции.
+    """
+    if retries is None:
+        retries = WRITE_RETRIES
+    delay: float = RETRY_DELAY
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except sqlite3.OperationalError as e:
+            if attempt == retries or not is_busy(e):
+                raise
+        # random нужен только при повторе: не замедляет запуск CLI.
+        import random
+        sleep(delay * random.uniform(0.5, 1.5))
+        delay *= 2
+
+
+def chunked(values: Iterable, size: int = MAX_IN_PARAMETERS
+            ) -> Iterator[list]:
+    """Разбивает значения на списки длиной не больше size."""
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 class Database:
     """Класс для работы с базой данных SQLite."""
 
-    def __init__(self, db_name: str = "graduation_project.sqlite") -> None:
+    def __init__(self,
+                 db_name: str = DB_NAME,
+                 conn: sqlite3.Connection | None = None) -> None:
         """Инициализация объекта Database.
 
+        Если передано готовое соединение (например, из ConnectionPool),
+        схема не пересоздается, а close() не закрывает соединение.
+
         Args:
             db_name: Название БД (по умол. "graduation_project.sqlite").
+            conn: Открытое соединение (по умол. None).
         """
-        self.conn = sqlite3.connect(db_name)
-        self.cursor = self.conn.cursor()
-        self.create_tables()
+        self._owns_connection: bool = conn is None
+        self.conn = connect(db_name) if conn is None else conn
+        self.cursor = self.conn.cursor(cursor_class())
+        # Курсор для запросов SELECT * FROM tasks: строки сразу
+        # создаются как Task.
+        self.tasks_cursor = self.conn.cursor(cursor_class())
+        self.tasks_cursor.row_factory = task_row_factory
+        # Количество повторов начала транзакции записи (_begin).
+        self.write_retries: int = WRITE_RETRIES
+        if self._owns_connection:
+            self.create_tables()
 
     def create_tables(self) -> None:
-        """Создает таблицу tasks в базе данных."""
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                priority TEXT NOT NULL
-                    CHECK (priority IN ('Low', 'Medium', 'High')),
-                deadline DATETIME,
-                status TEXT NOT NULL DEFAULT 'Open' CHECK
-                    (status IN ('Open', 'Completed')),
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                completed_at DATETIME,
-                tags TEXT
-            )
-        """)
-
-        self.conn.commit()
+        """Создает таблицы БД и применяет недостающие миграции схемы."""
+        migrate(self.conn)
 
+    @profiled
     def add_task(self,
                  title: str,
                  description: str,
@@ -51,92 +194,453 @@ class Database:
             tags: Тэги (по умол. None).
         """
         try:
-            deadline_obj = datetime.fromisoformat(
-                deadline) if isinstance(deadline, str) else deadline
+            deadline_obj = to_datetime(deadline)
+            self._begin()
             self.cursor.execute("""
                 INSERT INTO Tasks
                     (title, description, priority, deadline, tags)
                 VALUES (?, ?, ?, ?, ?)
-            """, (title, description, priority, deadline_obj, tags))
+            """, (title, description, encode_field("priority", priority),
+                  deadline_obj, tags))
+            task_id = self.cursor.lastrowid
+            replace_task_tags(self.cursor, [(task_id, tags)])
             self.conn.commit()
-            return self.cursor.lastrowid
+            return task_id
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"Ошибка при добавлении задачи: {e}")
             return None
 
+    @profiled
+    def add_tasks_bulk(self,
+                       rows: Iterable[tuple],
+                       batch_size: int = 1000) -> int | None:
+        """Добавляет задачи пакетами в одной транзакции.
+
+        Строки читаются из итератора порциями по batch_size и вставляются
+        через executemany; фиксация выполняется один раз в конце.
+        При ошибке транзакция откатывается целиком.
+
+        Args:
+            rows: Кортежи (title, description, priority, deadline, tags).
+            batch_size: Размер пакета (по умол. 1000).
+
+        Returns:
+            Количество добавленных задач.
+        """
+        query: str = """
+            INSERT INTO tasks
+                (title, description, priority, deadline, tags)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        iterator = ((title, description, encode_field("priority", priority),
+                     deadline, tags)
+                    for title, description, priority, deadline, tags in rows)
+        count: int = 0
+        try:
+            self._begin()
+            self.cursor.execute("SELECT IFNULL(MAX(id), 0) FROM tasks")
+            last_id: int = self.cursor.fetchone()[0]
+            while batch := list(islice(iterator, batch_size)):
+                self.cursor.executemany(query, batch)
+                count += len(batch)
+            reader = self.conn.cursor(cursor_class())
+            reader.execute("""
+                SELECT id, tags FROM tasks
+                WHERE id > ? AND tags IS NOT NULL AND tags != ''
+            """, (last_id,))
+            replace_task_tags(self.cursor, reader)
+            reader.close()
+            self.conn.commit()
+            return count
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Ошибка при импорте задач: {e}")
+            return None
+
+    def iter_tasks(self,
+                   sort_field: str = None,
+                   sort_order: str = None,
+                   priority_filter: str = None,
+                   batch_size: int = 1000,
+                   tags_all: list[str] | None = None,
+                   tags_any: list[str] | None = None,
+                   include_archive: bool = False,
+                   query: TaskQuery | None = None) -> Iterator[Task]:
+        """Построчно выдает задачи из курсора, не загружая весь результат
+           в память.
+
+        Args:
+            sort_field: Поле сортировки (по умол. None).
+            sort_order: "ascending" или "descending" (по умол. None).
+            priority_filter: Приоритет, "All" или None - без фильтра.
+            batch_size: Количество строк за одно обращение к курсору
+                (по умол. 1000).
+            tags_all: Задача должна иметь все эти тэги (по умол. None).
+            tags_any: Задача должна иметь хотя бы один из этих тэгов
+                (по умол. None).
+            include_archive: Учитывать архив (по умол. False).
+            query: Составной запрос вместо параметров выше
+                (по умол. None).
+
+        Returns:
+            Итератор задач.
+        """
+        if query is None:
+            query = TaskQuery.create(sort_field, sort_order, priority_filter,
+                                     tags_all, tags_any, include_archive)
+        cursor = self.conn.cursor(cursor_class())
+        cursor.row_factory = task_row_factory
+        try:
+            cursor.execute(*query.compile())
+            while batch := cursor.fetchmany(batch_size):
+                yield from batch
+        finally:
+            cursor.close()
+
+    @profiled
+    def query_tasks(self,
+                    query: TaskQuery,
+                    limit: int | None = None) -> list[Task]:
+        """Возвращает задачи по составному запросу (все условия,
+           поиск и сортировка - одним запросом SQL).
+
+        Args:
+            query: Составной запрос.
+            limit: Наибольшее количество задач (по умол. None - все).
+
+        Returns:
+            Список задач.
+        """
+        self.tasks_cursor.execute(*query.compile(limit=limit))
+        return self.tasks_cursor.fetchall()
+
+    @profiled
     def get_tasks(self,
                   sort_field: str = None,
                   sort_order: str = None,
-                  priority_filter: str = None) -> list:
+                  priority_filter: str = None,
+                  tags_all: list[str] | None = None,
+                  tags_any: list[str] | None = None,
+                  include_archive: bool = False) -> list[Task]:
         """Возвращает список задач, подходящих под фильтр.
 
         Args:
-            filter_criteria: Критерии фильтра (по умол. None).
-            query: Запрос.
+            sort_field: Поле сортировки (по умол. None).
+            sort_order: "ascending" или "descending" (по умол. None).
+            priority_filter: Приоритет, "All" или None - без фильтра.
+            tags_all: Задача должна иметь все эти тэги (по умол. None).
+            tags_any: Задача должна иметь хотя бы один из этих тэгов
+                (по умол. None).
+            include_archive: Учитывать архив (по умол. False).
 
         Returns:
             Список задач.
         """
-        query: str = "SELECT * FROM tasks"
-        where_clause = []
-        parameters = []
+        return self.query_tasks(TaskQuery.create(
+            sort_field, sort_order, priority_filter, tags_all, tags_any,
+            include_archive))
+
+    @profiled
+    def get_tasks_page(self,
+                       sort_field: str = None,
+                       sort_order: str = None,
+                       priority_filter: str = None,
+                       limit: int = 100,
+                       after: tuple | None = None,
+                       tags_all: list[str] | None = None,
+                       tags_any: list[str] | None = None,
+                       include_archive: bool = False
+                       ) -> tuple[list[Task], tuple | None]:
+        """Возвращает страницу задач с постраничной навигацией по ключу
+           (keyset), без OFFSET (см. query_tasks_page).
+
+        Args:
+            sort_field: Поле сортировки (по умол. None - по id).
+            sort_order: "ascending" или "descending" (по умол. None).
+            priority_filter: Приоритет, "All" или None - без фильтра.
+            limit: Размер страницы (по умол. 100).
+            after: Ключ последней задачи предыдущей страницы
+                (по умол. None - первая страница).
+            tags_all: Задача должна иметь все эти тэги (по умол. None).
+            tags_any: Задача должна иметь хотя бы один из этих тэгов
+                (по умол. None).
+            include_archive: Учитывать архив (по умол. False).
+
+        Returns:
+            Список задач и ключ для следующей страницы (None, если
+            страница последняя).
+        """
+        if sort_field is not None and sort_field not in SORT_FIELDS:
+            raise ValueError(f"Недопустимое поле сортировки: {sort_field}")
+        query = TaskQuery.create(None, None, priority_filter, tags_all,
+                                 tags_any, include_archive)
+        query = query.order_by(
+            sort_field or "id",
+            "ascending" if sort_order == "ascending" else "descending")
+        return self.query_tasks_page(query, limit, after)
+
+    @profiled
+    def query_tasks_page(self,
+                         query: TaskQuery,
+                         limit: int = 100,
+                         after: tuple | None = None
+                         ) -> tuple[list[Task], tuple | None]:
+        """Возвращает страницу задач составного запроса с постраничной
+           навигацией по ключу (keyset), без OFFSET.
+
+        Ключ страницы - пара (значение первого поля сортировки, id)
+        последней выданной задачи; следующая страница начинается строго
+        после него, поэтому стоимость запроса не зависит от номера
+        страницы. Значения NULL (например, пустой дедлайн) SQLite ставит
+        первыми при сортировке по возрастанию и последними по убыванию;
+        такие задачи выбираются отдельным диапазоном того же индекса.
+
+        Страницы строятся по одному полю сортировки (и id): без
+        сортировки - по возрастанию id, по релевантности поиска - нельзя.
+
+        Args:
+            query: Составной запрос.
+            limit: Размер страницы (по умол. 100).
+            after: Ключ последней задачи предыдущей страницы
+                (по умол. None - первая страница).
+
+        Returns:
+            Список задач и ключ для следующей страницы (None, если
+            страница последняя).
+        """
+        if not query.sort:
+            query = query.order_by("id")
+        keys = query.sort_keys()
+        field, sort_order = keys[0]
+        if field == "rank" or keys[1:] not in ([], [("id", sort_order)]):
+            raise ValueError(
+                "Постраничная выдача поддерживает одно поле сортировки.")
+        ascending: bool = sort_order == "ascending"
+        compare: str = ">" if ascending else "<"
+        column: str = f"tasks.{field}"
+        if after is not None:
+            after = (encode_field(field, after[0]), after[1])
+
+        # Диапазоны ключей, которые просматриваются по порядку, пока
+        # страница не заполнится.
+        ranges: list[tuple[str | None, tuple]] = []
+        if after is None:
+            ranges.append((None, ()))
+        elif field == "id":
+            ranges.append((f"tasks.id {compare} ?", (after[1],)))
+        elif after[0] is None:
+            ranges.append((f"{column} IS NULL AND tasks.id {compare} ?",
+                           (after[1],)))
+            if ascending:
+                ranges.append((f"{column} IS NOT NULL", ()))
+        else:
+            ranges.append((f"({column}, tasks.id) {compare} (?, ?)", after))
+            if not ascending:
+                ranges.append((f"{column} IS NULL", ()))
+
+        rows: list = []
+        for condition, range_parameters in ranges:
+            self.tasks_cursor.execute(*query.compile(
+                conditions=[condition] if condition else None,
+                parameters=list(range_parameters),
+                limit=limit + 1 - len(rows)))
+            rows.extend(self.tasks_cursor.fetchall())
+            if len(rows) > limit:
+                break
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last: Task = rows[-1]
+        return rows, (getattr(last, field), last.id)
+
+    def data_version(self) -> int:
+        """Возвращает PRAGMA data_version: значение меняется, когда
+           изменения в БД фиксирует другое соединение (в том числе
+           из другого процесса)."""
+        self.cursor.execute("PRAGMA data_version")
+        return self.cursor.fetchone()[0]
+
+    def explain(self, query: str, parameters: tuple | list = ()) -> list:
+        """Возвращает план выполнения запроса (EXPLAIN QUERY PLAN).
+
+        Args:
+            query: Запрос.
+            parameters: Параметры запроса.
+
+        Returns:
+            Список строк плана (поле detail).
+        """
+        self.cursor.execute("EXPLAIN QUERY PLAN " + query, parameters)
+        return [row[3] for row in self.cursor.fetchall()]
 
-        if priority_filter != "All":
-            where_clause.append("priority = ?")
-            parameters.append(priority_filter)
+    def explain_get_tasks(self,
+                          sort_field: str = None,
+                          sort_order: str = None,
+                          priority_filter: str = None,
+                          tags_all: list[str] | None = None,
+                          tags_any: list[str] | None = None,
+                          include_archive: bool = False) -> list:
+        """Возвращает план выполнения запроса get_tasks с теми же
+           аргументами.
 
-        if where_clause:
-            query += " WHERE " + " AND ".join(where_clause)
+        Returns:
+            Список строк плана.
+        """
+        return self.explain(*TaskQuery.create(
+            sort_field, sort_order, priority_filter, tags_all, tags_any,
+            include_archive).compile())
 
-        if sort_field:
-            order = "ASC" if sort_order == "ascending" else "DESC"
-            query += f" ORDER BY {sort_field} {order}"
+    @profiled
+    def get_tag_counts(self) -> list:
+        """Возвращает тэги с количеством задач у каждого.
 
-        self.cursor.execute(query, parameters)
+        Returns:
+            Список пар (тэг, количество задач), по убыванию количества.
+        """
+        self.cursor.execute("""
+            SELECT tags.name, COUNT(*) AS task_count FROM tags
+            JOIN task_tags ON task_tags.tag_id = tags.id
+            GROUP BY tags.id
+            ORDER BY task_count DESC, tags.name
+        """)
         return self.cursor.fetchall()
 
-    def get_task_by_id(self, task_id: int) -> tuple | None:
+    @profiled
+    def get_tasks_due(self,
+                      before: datetime | date,
+                      after: datetime | date | None = None,
+                      status: str | None = "Open") -> list[Task]:
+        """Возвращает задачи с дедлайном в диапазоне [after, before),
+           по возрастанию дедлайна (индекс status + deadline).
+
+        Args:
+            before: Верхняя граница дедлайна (не включается).
+            after: Нижняя граница дедлайна (по умол. None - без границы).
+            status: Статус задач, None - любой (по умол. "Open").
+
+        Returns:
+            Список задач.
+        """
+        query = TaskQuery().where_deadline(after, before).order_by("deadline")
+        if status is not None:
+            query = query.where_status(status)
+        return self.query_tasks(query)
+
+    @profiled
+    def get_tasks_completed_between(self,
+                                    start: datetime | date | None = None,
+                                    end: datetime | date | None = None,
+                                    include_archive: bool = False
+                                    ) -> list[Task]:
+        """Возвращает задачи, завершенные в диапазоне [start, end),
+           по возрастанию даты завершения.
+
+        Args:
+            start: Начало диапазона, None - без ограничения
+                (по умол. None).
+            end: Конец диапазона (не включается), None - без ограничения
+                (по умол. None).
+            include_archive: Учитывать и архив завершенных задач
+                (по умол. False).
+
+        Returns:
+            Список задач.
+        """
+        conditions: list[str] = ["completed_at IS NOT NULL"]
+        parameters: list = []
+        if start is not None:
+            conditions.append("completed_at >= ?")
+            parameters.append(start)
+        if end is not None:
+            conditions.append("completed_at < ?")
+            parameters.append(end)
+        where: str = " AND ".join(conditions)
+        query = f"SELECT * FROM tasks WHERE {where}"
+        if include_archive:
+            query += f" UNION ALL SELECT * FROM tasks_archive WHERE {where}"
+            parameters += parameters
+        self.tasks_cursor.execute(
+            f"{query} ORDER BY completed_at, id", parameters)
+        return self.tasks_cursor.fetchall()
+
+    @profiled
+    def get_task_by_id(self,
+                       task_id: int,
+                       include_archive: bool = False) -> Task | None:
         """Получает задачу по ID.
 
         Args:
             task_id: id задачи.
+            include_archive: Искать и в архиве (по умол. False).
 
         Returns:
             Задача с указанным id.
         """
         query = "SELECT * FROM tasks WHERE id = ?"
-        self.cursor.execute(query, (task_id,))
-        result = self.cursor.fetchone()
+        parameters: tuple = (task_id,)
+        if include_archive:
+            query += " UNION ALL SELECT * FROM tasks_archive WHERE id = ?"
+            parameters = (task_id, task_id)
+        self.tasks_cursor.execute(query, parameters)
+        result = self.tasks_cursor.fetchone()
         return result
 
-    def search_tasks(self, search_criteria: str) -> list:
-        """Ищет задачи по заданным критериям.
+    @profiled
+    def search_tasks(self,
+                     search_criteria: str,
+                     include_archive: bool = False) -> list[Task]:
+        """Ищет задачи по заданным критериям через индекс FTS5.
+
+        Слова ищутся по префиксу во всех текстовых полях задачи,
+        результаты упорядочены по релевантности (bm25).
 
         Args:
             search_criteria: Критерии поиска.
-            query: Запрос.
-            search_pattern: Отформатированные критерии поиска.
-            parameters: Параметры.
+            include_archive: Искать и в архиве (по умол. False).
 
         Returns:
             Список задач.
         """
-        query: str = """
-            SELECT * FROM tasks
-            WHERE
-                title LIKE ? OR
-                description LIKE ? OR
-                priority LIKE ? OR
-                status LIKE ? OR
-                tags LIKE ?
-        """
-        search_pattern: str = "%" + search_criteria + "%"
-        parameters: tuple = (search_pattern, search_pattern,
-                             search_pattern, search_pattern,
-                             search_pattern)
-        self.cursor.execute(query, parameters)
-        return self.cursor.fetchall()
+        if build_fts_query(search_criteria) is None:
+            return []
+        query = TaskQuery().where_text(search_criteria)
+        return self.query_tasks(query.with_archive(include_archive))
+
+    def _set_clause(self,
+                    title: str = None,
+                    description: str = None,
+                    priority: str = None,
+                    deadline: str | date | None = None,
+                    tags: str = None) -> tuple[list, list]:
+        """Строит присваивания SET для переданных (не None) полей задачи.
 
+        Returns:
+            Список присваиваний и список параметров.
+        """
+        set_clause: list = []
+        parameters: list = []
+
+        if title is not None:
+            set_clause.append("title = ?")
+            parameters.append(title)
+        if description is not None:
+            set_clause.append("description = ?")
+            parameters.append(description)
+        if priority is not None:
+            set_clause.append("priority = ?")
+            parameters.append(encode_field("priority", priority))
+        if deadline is not None:
+            set_clause.append("deadline = ?")
+            parameters.append(to_datetime(deadline))
+        if tags is not None:
+            set_clause.append("tags = ?")
+            parameters.append(tags)
+
+        return set_clause, parameters
+
+    @profiled
     def update_task(self,
                     task_id: int,
                     title: str = None,
@@ -160,26 +664,8 @@ class Database:
             bool значение в зависимости от выполнения.
         """
         try:
-            set_clause: list = []
-            parameters: list = []
-
-            if title is not None:
-                set_clause.append("title = ?")
-                parameters.append(title)
-            if description is not None:
-                set_clause.append("description = ?")
-                parameters.append(description)
-            if priority is not None:
-                set_clause.append("priority = ?")
-                parameters.append(priority)
-            if deadline is not None:
-                deadline_obj = datetime.fromisoformat(
-                    deadline) if isinstance(deadline, str) else deadline
-                set_clause.append("deadline = ?")
-                parameters.append(deadline_obj)
-            if tags is not None:
-                set_clause.append("tags = ?")
-                parameters.append(tags)
+            set_clause, parameters = self._set_clause(
+                title, description, priority, deadline, tags)
 
             if not set_clause:
                 return True
@@ -188,13 +674,18 @@ class Database:
             query = f"UPDATE Tasks SET {set_str} WHERE id = ?"
             parameters.append(task_id)
 
+            self._begin()
             self.cursor.execute(query, parameters)
+            if tags is not None and self.cursor.rowcount > 0:
+                replace_task_tags(self.cursor, [(task_id, tags)])
             self.conn.commit()
             return True
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"Ошибка обновления задачи: {e}")
             return False
 
+    @profiled
     def update_task_status(self,
                            task_id: int,
                            status: str,
@@ -210,18 +701,444 @@ class Database:
             bool значение в зависимости от выполнения.
         """
         try:
-            completed_at_obj = datetime.fromisoformat(
-                completed_at) if isinstance(
-                completed_at, str) else completed_at
+            completed_at_obj = to_datetime(completed_at)
+            self._begin()
             self.cursor.execute("""
                 UPDATE Tasks SET status = ?, completed_at = ? WHERE id = ?
-            """, (status, completed_at_obj, task_id))
+            """, (encode_field("status", status), completed_at_obj, task_id))
             self.conn.commit()
             return True
         except sqlite3.Error as e:
-            print(f"Ошибка при добавлении задачи: {e}")
+            self.conn.rollback()
+            print(f"Ошибка при обновлении статуса задачи: {e}")
             return False
 
+    def _begin(self) -> None:
+        """Начинает транзакцию записи, если она еще не начата.
+
+        BEGIN IMMEDIATE берет блокировку записи сразу, а не при первом
+        изменении: чтение и изменение строк выполняются под одной
+        блокировкой, а транзакция не может завершиться ошибкой при
+        переходе от чтения к записи, пока пишет другой процесс. Если БД
+        заблокирована дольше BUSY_TIMEOUT, попытка повторяется
+        (retry_busy) до write_retries раз.
+        """
+        if not self.conn.in_transaction:
+            retry_busy(lambda: self.cursor.execute("BEGIN IMMEDIATE"),
+                       self.write_retries)
+
+    def _matching_ids(self,
+                      task_ids: list[int] | None,
+                      priority_filter: str = None,
+                      tags_all: list[str] | None = None,
+                      tags_any: list[str] | None = None) -> list[int]:
+        """Выбирает id существующих задач, подходящих под фильтры.
+
+        Args:
+            task_ids: Список id (None - все задачи).
+            priority_filter: Приоритет, "All" или None - без фильтра.
+            tags_all: Задача должна иметь все эти тэги (по умол. None).
+            tags_any: Задача должна иметь хотя бы один из этих тэгов
+                (по умол. None).
+
+        Returns:
+            Список id.
+        """
+        query = TaskQuery.create(None, None, priority_filter, tags_all,
+                                 tags_any)
+        if task_ids is None:
+            self.cursor.execute(*query.compile("tasks.id"))
+            return [row[0] for row in self.cursor.fetchall()]
+
+        matched: list[int] = []
+        for chunk in chunked(task_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            self.cursor.execute(*query.compile(
+                "tasks.id", [f"tasks.id IN ({placeholders})"], chunk))
+            matched.extend(row[0] for row in self.cursor.fetchall())
+        return matched
+
+    def _execute_for_ids(self,
+                         query: str,
+                         parameters: list | tuple,
+                         task_ids: list[int]) -> None:
+        """Выполняет запрос с условием id IN ({}) порциями id.
+
+        Args:
+            query: Запрос, {} заменяется списком параметров id.
+            parameters: Параметры, предшествующие id.
+            task_ids: Список id.
+        """
+        for chunk in chunked(task_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            self.cursor.execute(query.format(placeholders),
+                                [*parameters, *chunk])
+
+    @staticmethod
+    def _outcomes(task_ids: list[int] | None,
+                  matched: list[int]) -> dict[int, bool]:
+        """Возвращает результат пакетной операции для каждого id."""
+        if task_ids is None:
+            return dict.fromkeys(matched, True)
+        matched_ids = set(matched)
+        return {task_id: task_id in matched_ids for task_id in task_ids}
+
+    @profiled
+    def get_tasks_by_ids(self, task_ids: Iterable[int]) -> list[Task]:
+        """Получает задачи по списку id (отсутствующие пропускаются).
+
+        Args:
+            task_ids: id задач.
+
+        Returns:
+            Список задач.
+        """
+        tasks: list[Task] = []
+        for chunk in chunked(task_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            self.tasks_cursor.execute(
+                f"SELECT * FROM tasks WHERE id IN ({placeholders})", chunk)
+            tasks.extend(self.tasks_cursor.fetchall())
+        return tasks
+
+    @profiled
+    def update_tasks_status(self,
+                            task_ids: Iterable[int],
+                            status: str,
+                            completed_at: str | datetime | None
+                            ) -> dict[int, bool] | None:
+        """Обновляет статус нескольких задач в одной транзакции.
+
+        Args:
+            task_ids: id задач.
+            status: Статус.
+            completed_at: Дата выполнения.
+
+        Returns:
+            Для каждого id - True, если задача найдена и обновлена;
+            None при ошибке (изменения отменены).
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        try:
+            self._begin()
+            matched = self._matching_ids(task_ids)
+            self._execute_for_ids("""
+                UPDATE tasks SET status = ?, completed_at = ?
+                WHERE id IN ({})
+            """, (encode_field("status", status), to_datetime(completed_at)),
+                matched)
+            self.conn.commit()
+            return self._outcomes(task_ids, matched)
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Ошибка при обновлении статуса задач: {e}")
+            return None
+
+    @profiled
+    def update_tasks(self,
+                     task_ids: Iterable[int] | None,
+                     title: str = None,
+                     description: str = None,
+                     priority: str = None,
+                     deadline: str | date | None = None,
+                     tags: str = None,
+                     priority_filter: str = None,
+                     tags_all: list[str] | None = None,
+                     tags_any: list[str] | None = None
+                     ) -> dict[int, bool] | None:
+        """Присваивает одни и те же значения полей нескольким задачам
+           в одной транзакции.
+
+        Args:
+            task_ids: id задач (None - все задачи, подходящие под
+                фильтры).
+            title: Название (по умол. None).
+            description: Описание (по умол. None).
+            priority: Приоритет (по умол. None).
+            deadline: Дедлайн (по умол. None).
+            tags: Тэги (по умол. None).
+            priority_filter: Изменять только задачи с этим приоритетом
+                (по умол. None - без фильтра).
+            tags_all: Изменять только задачи со всеми этими тэгами
+                (по умол. None).
+            tags_any: Изменять только задачи хотя бы с одним из этих
+                тэгов (по умол. None).
+
+        Returns:
+            Для каждого id - True, если задача найдена и подошла под
+            фильтры; None при ошибке (изменения отменены).
+        """
+        if task_ids is not None:
+            task_ids = list(dict.fromkeys(task_ids))
+        try:
+            set_clause, parameters = self._set_clause(
+                title, description, priority, deadline, tags)
+            self._begin()
+            matched = self._matching_ids(
+                task_ids, priority_filter, tags_all, tags_any)
+            if set_clause:
+                set_str = ", ".join(set_clause)
+                self._execute_for_ids(
+                    f"UPDATE tasks SET {set_str} WHERE id IN ({{}})",
+                    parameters, matched)
+            if tags is not None:
+                replace_task_tags(
+                    self.cursor, ((task_id, tags) for task_id in matched))
+            self.conn.commit()
+            return self._outcomes(task_ids, matched)
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Ошибка обновления задач: {e}")
+            return None
+
+    @profiled
+    def delete_tasks(self,
+                     task_ids: Iterable[int]) -> dict[int, bool] | None:
+        """Удаляет несколько задач в одной транзакции (индекс поиска и
+           связи с тэгами очищаются триггерами).
+
+        Args:
+            task_ids: id задач.
+
+        Returns:
+            Для каждого id - True, если задача найдена и удалена;
+            None при ошибке (изменения отменены).
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        try:
+            self._begin()
+            matched = self._matching_ids(task_ids)
+            self._execute_for_ids(
+                "DELETE FROM tasks WHERE id IN ({})", (), matched)
+            self.conn.commit()
+            return self._outcomes(task_ids, matched)
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Ошибка при удалении задач: {e}")
+            return None
+
+    @profiled
+    def archive_completed(self, older_than: datetime) -> int | None:
+        """Переносит в архив задачи, завершенные раньше older_than.
+
+        Строки задач и их связи с тэгами копируются в tasks_archive и
+        archive_task_tags и удаляются из tasks (индексы поиска обновляются
+        триггерами) одной транзакцией.
+
+        Args:
+            older_than: Граница даты завершения.
+
+        Returns:
+            Количество перенесенных задач; None при ошибке (изменения
+            отменены).
+        """
+        condition: str = (f"status = {STATUS_CODES['Completed']} "
+                          "AND completed_at < ?")
+        try:
+            self._begin()
+            self.cursor.execute(f"""
+                INSERT INTO tasks_archive ({TASK_COLUMNS})
+                SELECT {TASK_COLUMNS} FROM tasks WHERE {condition}
+            """, (older_than,))
+            count: int = self.cursor.rowcount
+            self.cursor.execute(f"""
+                INSERT INTO archive_task_tags (task_id, tag_id)
+                SELECT task_id, tag_id FROM task_tags
+                WHERE task_id IN (SELECT id FROM tasks WHERE {condition})
+            """, (older_than,))
+            self.cursor.execute(
+                f"DELETE FROM tasks WHERE {condition}", (older_than,))
+            self.conn.commit()
+            return count
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Ошибка при архивации задач: {e}")
+            return None
+
+    @profiled
+    def get_changes(self,
+                    since: int = 0,
+                    limit: int = 1000) -> list[TaskChange]:
+        """Возвращает записи журнала изменений с номером больше since
+           вместе с текущим состоянием задач (одним запросом).
+
+        Args:
+            since: Номер последней полученной записи (по умол. 0 -
+                с начала журнала).
+            limit: Наибольшее количество записей (по умол. 1000).
+
+        Returns:
+            Записи журнала по возрастанию номера.
+        """
+        self.cursor.execute("""
+            SELECT task_changes.seq, task_changes.task_id,
+                   task_changes.operation, task_changes.changed_at, tasks.*
+            FROM task_changes
+            LEFT JOIN tasks ON tasks.id = task_changes.task_id
+            WHERE task_changes.seq > ?
+            ORDER BY task_changes.seq
+            LIMIT ?
+        """, (since, limit))
+        return [TaskChange(seq, task_id, operation, changed_at,
+                           None if task[0] is None
+                           else tuple.__new__(Task, task))
+                for seq, task_id, operation, changed_at, *task
+                in self.cursor]
+
+    def get_last_change(self) -> int:
+        """Возвращает номер последней записи журнала изменений
+           (0 - журнал пуст)."""
+        self.cursor.execute("SELECT IFNULL(MAX(seq), 0) FROM task_changes")
+        return self.cursor.fetchone()[0]
+
+    @profiled
+    def compact_changes(self) -> int | None:
+        """Сжимает журнал изменений: для каждой задачи остается только
+           последняя запись.
+
+        Последняя запись новее любой более ранней записи той же задачи,
+        поэтому синхронизация с любого номера по-прежнему получает все
+        изменения. Записи об удалении тоже остаются: иначе тот, кто
+        синхронизировался раньше, не узнал бы об удалении. Размер журнала
+        после сжатия не больше количества когда-либо созданных задач.
+
+        Returns:
+            Количество удаленных записей; None при ошибке БД.
+        """
+        try:
+            self._begin()
+            self.cursor.execute("""
+                DELETE FROM task_changes WHERE seq NOT IN (
+                    SELECT MAX(seq) FROM task_changes GROUP BY task_id)
+            """)
+            removed: int = self.cursor.rowcount
+            self.conn.commit()
+            return removed
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Ошибка при сжатии журнала изменений: {e}")
+            return None
+
     def close(self) -> None:
-        """Закрывает соединение с БД."""
-        self.conn.close()
+        """Закрывает соединение с БД (соединение из пула остается
+           открытым)."""
+        self.cursor.close()
+        self.tasks_cursor.close()
+        if self._owns_connection:
+            self.conn.close()
+
+
+class ConnectionPool:
+    """Пул соединений с БД SQLite: по одному долгоживущему соединению
+       на поток, схема создается один раз."""
+
+    def __init__(self,
+                 db_name: str = DB_NAME,
+                 journal_mode: str | None = "WAL",
+                 pragmas: dict[str, str | int] | None = None) -> None:
+        """Инициализация объекта ConnectionPool.
+
+        Args:
+            db_name: Название БД (по умол. "graduation_project.sqlite").
+            journal_mode: Режим журнала, None - не менять (по умол. "WAL").
+            pragmas: PRAGMA для каждого соединения
+                (по умол. DEFAULT_PRAGMAS).
+        """
+        self.db_name: str = db_name
+        self.journal_mode: str | None = journal_mode
+        self.pragmas: dict[str, str | int] = dict(
+            DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._bootstrapped: bool = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открывает новое соединение и применяет к нему настройки."""
+        conn = connect(self.db_name, check_same_thread=False)
+        if self.journal_mode:
+            # Режим журнала хранится в файле БД. Смена режима требует
+            # монопольного доступа и сразу завершается ошибкой, если БД
+            # открыта другим процессом, поэтому режим меняется, только
+            # если он другой.
+            mode: str = retry_busy(lambda: conn.execute(
+                "PRAGMA journal_mode").fetchone()[0])
+            if mode.lower() != self.journal_mode.lower():
+                retry_busy(lambda: conn.execute(
+                    f"PRAGMA journal_mode = {self.journal_mode}"))
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока, открывая его при
+           первом обращении.
+
+        Returns:
+            Соединение с БД.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            with self._lock:
+                self._connections.append(conn)
+                if not self._bootstrapped:
+                    Database(conn=conn).create_tables()
+                    self._bootstrapped = True
+            self._local.conn = conn
+        return conn
+
+    def bootstrap(self) -> None:
+        """Создает схему БД (выполняется один раз на пул)."""
+        self.connection()
+
+    def limit_thread_writes(self,
+                            busy_timeout: float = INTERACTIVE_BUSY_TIMEOUT,
+                            retries: int = INTERACTIVE_WRITE_RETRIES
+                            ) -> None:
+        """Сокращает ожидание блокировки для соединения текущего потока.
+
+        Нужно потоку GUI: с BUSY_TIMEOUT и WRITE_RETRIES запись, пока
+        БД пишет другой процесс, блокирует окно на 15-20 с. Фоновые
+        потоки сохраняют обычные ожидание и повторы.
+
+        Args:
+            busy_timeout: Ожидание блокировки (с)
+                (по умол. INTERACTIVE_BUSY_TIMEOUT).
+            retries: Количество повторов начала транзакции записи
+                (по умол. INTERACTIVE_WRITE_RETRIES).
+        """
+        conn = self.connection()
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+        self._local.write_retries = retries
+
+    @contextmanager
+    def session(self) -> Iterator[Database]:
+        """Контекстный менеджер, выдающий Database поверх соединения
+           текущего потока. При исключении транзакция откатывается.
+
+        Returns:
+            Объект Database.
+        """
+        conn = self.connection()
+        db = Database(conn=conn)
+        db.write_retries = getattr(
+            self._local, "write_retries", WRITE_RETRIES)
+        try:
+            yield db
+        except Exception:
+            conn.rollback()
+            raise
+        else:
+            if conn.in_transaction:
+                conn.commit()
+        finally:
+            db.close()
+
+    def close_all(self) -> None:
+        """Закрывает все соединения пула."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._local = threading.local()
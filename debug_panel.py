@@ -0,0 +1,107 @@
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import (QCheckBox, QDialog, QHBoxLayout, QLabel,
+                             QPushButton, QTableWidget, QTableWidgetItem,
+                             QVBoxLayout, QWidget)
+from profiling import profiler
+
+# Период обновления статистики в открытом окне (мс).
+REFRESH_INTERVAL_MS: int = 1000
+
+METHOD_COLUMNS: tuple[str, ...] = (
+    "Method", "Count", "Total ms", "p50 ms", "p95 ms", "p99 ms")
+SLOW_QUERY_COLUMNS: tuple[str, ...] = (
+    "Method", "ms", "Rows", "SQL", "Plan")
+
+
+class DebugPanel(QDialog):
+    """Окно отладки со статистикой запросов к БД (наследуется от QDialog).
+
+    Показывает перцентили времени методов Database и журнал медленных
+    запросов с планами выполнения. При открытии окна профилирование
+    включается.
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Debug: Query Statistics")
+
+        self.enabled_check: QCheckBox = QCheckBox("Profiling enabled")
+        self.enabled_check.toggled.connect(self.set_profiling)
+        refresh_button: QPushButton = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        reset_button: QPushButton = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset)
+
+        self.methods_table: QTableWidget = QTableWidget(
+            0, len(METHOD_COLUMNS))
+        self.methods_table.setHorizontalHeaderLabels(METHOD_COLUMNS)
+        self.slow_table: QTableWidget = QTableWidget(
+            0, len(SLOW_QUERY_COLUMNS))
+        self.slow_table.setHorizontalHeaderLabels(SLOW_QUERY_COLUMNS)
+
+        buttons_layout: QHBoxLayout = QHBoxLayout()
+        buttons_layout.addWidget(self.enabled_check)
+        buttons_layout.addWidget(refresh_button)
+        buttons_layout.addWidget(reset_button)
+
+        layout: QVBoxLayout = QVBoxLayout()
+        layout.addLayout(buttons_layout)
+        layout.addWidget(QLabel("Database methods:"))
+        layout.addWidget(self.methods_table)
+        layout.addWidget(QLabel(
+            f"Slow queries (> {profiler.slow_threshold * 1000:g} ms):"))
+        layout.addWidget(self.slow_table)
+        self.setLayout(layout)
+        self.resize(800, 600)
+
+        self.refresh_timer: QTimer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event) -> None:
+        """Включает профилирование и периодическое обновление."""
+        self.enabled_check.setChecked(True)
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        """Останавливает обновление закрытого окна."""
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Включает или выключает профилирование."""
+        if enabled:
+            profiler.enable()
+        else:
+            profiler.disable()
+
+    def reset(self) -> None:
+        """Очищает собранную статистику."""
+        profiler.reset()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Перечитывает статистику профилировщика в таблицы."""
+        methods = profiler.method_stats()
+        self.methods_table.setRowCount(len(methods))
+        for row, (name, stats) in enumerate(methods.items()):
+            values = (name, stats["count"], stats["total_ms"],
+                      stats["p50_ms"], stats["p95_ms"], stats["p99_ms"])
+            for column, value in enumerate(values):
+                self.methods_table.setItem(
+                    row, column, QTableWidgetItem(str(value)))
+
+        slow_queries = list(reversed(profiler.slow_queries()))
+        self.slow_table.setRowCount(len(slow_queries))
+        for row, query in enumerate(slow_queries):
+            values = (query.method or "-",
+                      round(query.duration * 1000, 3),
+                      query.rows,
+                      query.sql,
+                      "; ".join(query.plan))
+            for column, value in enumerate(values):
+                self.slow_table.setItem(
+                    row, column, QTableWidgetItem(str(value)))
+        self.methods_table.resizeColumnsToContents()
@@ -0,0 +1,119 @@
+import re
+import unicodedata
+from typing import Hashable
+from models import Task
+
+# Сколько найденных задач хранится для сужения поиска в памяти.
+NARROW_LIMIT: int = 5000
+
+# Слова так же, как их выделяет токенизатор unicode61 (без "_").
+WORD = re.compile(r"[^\W_]+")
+
+
+def fold(text: str) -> str:
+    """Приводит текст к нижнему регистру и убирает диакритические знаки,
+       как при индексации FTS5 (remove_diacritics)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed
+                   if not unicodedata.combining(char))
+
+
+def search_terms(search_criteria: str) -> list[str]:
+    """Разбивает строку поиска на нормализованные слова."""
+    return WORD.findall(fold(search_criteria))
+
+
+def task_matches(task: Task, terms: list[str]) -> bool:
+    """Проверяет, что каждое слово поиска - префикс какого-либо слова
+       в текстовых полях задачи (условие не строже запроса FTS5).
+
+    Args:
+        task: Задача.
+        terms: Нормализованные слова поиска.
+
+    Returns:
+        True, если задача подходит.
+    """
+    text = " ".join(value for value in (
+        task.title, task.description, task.priority, task.status,
+        task.tags) if value)
+    words: list[str] = search_terms(text)
+    return all(any(word.startswith(term) for word in words)
+               for term in terms)
+
+
+class LiveSearch:
+    """Класс представляет собой состояние поиска по мере ввода.
+
+    Хранит последнюю строку поиска и найденные по ней задачи. Если новая
+    строка продолжает прежнюю, ее результат - подмножество прежнего, и
+    он получается фильтрацией в памяти без запроса к БД. Результаты
+    больше limit задач не сохраняются. Сужать можно только результат с
+    той же областью поиска (scope - например, фильтры и сортировка без
+    строки поиска). reset увеличивает поколение:
+    результат запроса, начатого до сброса, не сохраняется.
+    """
+
+    def __init__(self, limit: int = NARROW_LIMIT) -> None:
+        """Инициализация объекта LiveSearch.
+
+        Args:
+            limit: Наибольшее количество сохраняемых задач
+                (по умол. NARROW_LIMIT).
+        """
+        self.limit: int = limit
+        self.generation: int = 0
+        # (строка поиска, область поиска, найденные задачи);
+        # кортеж заменяется целиком, поэтому его можно записывать из
+        # фонового потока.
+        self._last: tuple[str, Hashable, list[Task]] | None = None
+
+    def remember(self,
+                 search_criteria: str,
+                 scope: Hashable,
+                 tasks: list[Task],
+                 generation: int) -> None:
+        """Сохраняет результат поиска из БД, если он помещается в лимит.
+
+        Args:
+            search_criteria: Строка поиска.
+            scope: Область поиска.
+            tasks: Найденные задачи.
+            generation: Поколение на момент начала запроса.
+        """
+        if generation != self.generation:
+            return
+        if len(tasks) <= self.limit and search_terms(search_criteria):
+            self._last = (search_criteria, scope, list(tasks))
+        else:
+            self._last = None
+
+    def narrow(self,
+               search_criteria: str,
+               scope: Hashable) -> list[Task] | None:
+        """Сужает прежний результат под новую строку поиска.
+
+        Args:
+            search_criteria: Новая строка поиска.
+            scope: Область поиска.
+
+        Returns:
+            Задачи в порядке прежнего результата или None, если новая
+            строка не продолжает прежнюю и нужен запрос к БД.
+        """
+        last = self._last
+        if last is None:
+            return None
+        previous, previous_scope, tasks = last
+        if (previous_scope != scope
+                or not search_criteria.startswith(previous)):
+            return None
+        terms: list[str] = search_terms(search_criteria)
+        narrowed = [task for task in tasks if task_matches(task, terms)]
+        self._last = (search_criteria, scope, narrowed)
+        return narrowed
+
+    def reset(self) -> None:
+        """Забывает прежний результат (например, после изменения задач)."""
+        self.generation += 1
+        self._last = None
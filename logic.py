@@ -1,6 +1,164 @@
-from db import Database
-from models import Task
-from datetime import date, datetime
+import base64
+import json
+import threading
+from contextlib import closing
+from typing import (TYPE_CHECKING, Any, Callable, Hashable, Iterable,
+                    Iterator)
+from cache import QueryCache
+from db import DB_NAME, ConnectionPool, Database, adapt_datetime
+from models import Task, TaskChange, TaskEvent
+from query import TaskQuery
+from tags import normalize_tag
+from datetime import date, datetime, timedelta
+
+if TYPE_CHECKING:
+    from backup import Snapshot
+    from transfer import ImportResult
+
+PAGE_SIZE: int = 100
+
+# Через сколько после завершения задача переносится в архив.
+ARCHIVE_AFTER: timedelta = timedelta(days=30)
+
+# Сколько записей журнала изменений читается за один запрос.
+CHANGES_BATCH: int = 1000
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+_listeners: list[Callable[[TaskEvent], None]] = []
+
+# Кэш результатов запросов на чтение. Функции изменения задач сбрасывают
+# его сами, а изменения из других соединений (другой процесс или поток)
+# обнаруживаются по PRAGMA data_version соединения текущего потока.
+_cache = QueryCache()
+_seen_versions = threading.local()
+
+
+def init_db(db_name: str = DB_NAME,
+            journal_mode: str | None = "WAL",
+            pragmas: dict[str, str | int] | None = None) -> ConnectionPool:
+    """Настраивает пул соединений логического слоя и создает схему БД.
+
+    Вызывается один раз при старте приложения; повторный вызов
+    закрывает прежний пул.
+
+    Args:
+        db_name: Название БД (по умол. "graduation_project.sqlite").
+        journal_mode: Режим журнала SQLite (по умол. "WAL").
+        pragmas: Дополнительные PRAGMA (по умол. DEFAULT_PRAGMAS).
+
+    Returns:
+        Пул соединений.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _cache.invalidate()
+        _pool = ConnectionPool(db_name, journal_mode, pragmas)
+        _pool.bootstrap()
+        return _pool
+
+
+def get_pool() -> ConnectionPool:
+    """Возвращает пул соединений, создавая его с настройками по
+       умолчанию, если init_db() еще не вызывался."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def close_db() -> None:
+    """Закрывает все соединения пула."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+        _cache.invalidate()
+
+
+def get_cache() -> QueryCache:
+    """Возвращает кэш запросов логического слоя."""
+    return _cache
+
+
+def _check_external_changes(db: Database) -> None:
+    """Сбрасывает кэш, если БД изменило другое соединение с момента
+       прошлой проверки в этом потоке."""
+    version = (db.conn, db.data_version())
+    if getattr(_seen_versions, "version", None) != version:
+        _seen_versions.version = version
+        _cache.invalidate()
+
+
+def _cached(key: tuple[Hashable, ...], load: Callable[[Database], Any]
+            ) -> Any:
+    """Возвращает результат запроса из кэша или читает его из БД.
+
+    Args:
+        key: Вид запроса и его параметры.
+        load: Чтение результата через Database.
+
+    Returns:
+        Результат запроса (общий для всех вызовов с тем же ключом).
+    """
+    with get_pool().session() as db:
+        _check_external_changes(db)
+        found, value = _cache.get(key)
+        if found:
+            return value
+        generation: int = _cache.generation
+        value = load(db)
+    _cache.put(key, value, generation)
+    return value
+
+
+def subscribe(listener: Callable[[TaskEvent], None]) -> None:
+    """Подписывает обработчик на события изменения задач.
+
+    Обработчик вызывается в том потоке, где выполнилось изменение,
+    после фиксации транзакции.
+
+    Args:
+        listener: Обработчик события.
+    """
+    _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[TaskEvent], None]) -> None:
+    """Отписывает обработчик от событий изменения задач."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _changed_task(db: Database, task_id: int) -> Task | None:
+    """Читает измененную задачу для события, если есть подписчики."""
+    if not _listeners:
+        return None
+    return db.get_task_by_id(task_id)
+
+
+def _changed_tasks(db: Database,
+                   outcomes: dict[int, bool] | None) -> list[Task]:
+    """Читает задачи, измененные пакетной операцией, если есть
+       подписчики."""
+    if not _listeners or not outcomes:
+        return []
+    return db.get_tasks_by_ids(
+        task_id for task_id, changed in outcomes.items() if changed)
+
+
+def _notify(kind: str, task: Task | None) -> None:
+    """Рассылает событие изменения задачи подписчикам."""
+    if task is None:
+        return
+    event = TaskEvent(kind, task)
+    for listener in list(_listeners):
+        listener(event)
 
 
 def add_new_task(title: str,
@@ -20,72 +178,303 @@ def add_new_task(title: str,
     Returns:
         id добавлненной задачи.
     """
-    db = Database()
-    task_id = db.add_task(title, description, priority, deadline, tags)
-    db.close()
+    with get_pool().session() as db:
+        task_id = db.add_task(title, description, priority, deadline, tags)
+        task = None if task_id is None else _changed_task(db, task_id)
+    if task_id is not None:
+        _cache.invalidate([task_id])
+    _notify(TaskEvent.INSERTED, task)
     return task_id
 
 
 def get_all_tasks(sort_field: str = None,
                   sort_order: str = None,
-                  priority_filter: str = None) -> list:
+                  priority_filter: str = None,
+                  tags_all: list[str] | None = None,
+                  tags_any: list[str] | None = None,
+                  include_archive: bool = False) -> list:
     """Возвращает список всех задач.
 
     Args:
-        filter_criteria: Критерии фильтра (по умол. None).
+        sort_field: Поле сортировки (по умол. None).
+        sort_order: Порядок сортировки (по умол. None).
+        priority_filter: Фильтр по приоритету (по умол. None).
+        tags_all: Задача должна иметь все эти тэги (по умол. None).
+        tags_any: Задача должна иметь хотя бы один из этих тэгов
+            (по умол. None).
+        include_archive: Учитывать архив завершенных задач
+            (по умол. False).
 
     Returns:
         Список всех задач.
     """
-    db = Database()
-    tasks_tuples = db.get_tasks(sort_field, sort_order, priority_filter)
-    tasks = [Task.from_tuple(task_tuple) for task_tuple in tasks_tuples]
-    db.close()
-    return tasks
-
-
-def get_task_by_id(task_id: int) -> Task | None:
-    """Возвращает задачу по id."""
-    db = Database()
-    task_tuple = db.get_task_by_id(task_id)
-    db.close()
-    if task_tuple:
-        return Task.from_tuple(task_tuple)
-    else:
+    tasks = _cached(
+        ("tasks", sort_field, sort_order, priority_filter,
+         _tags_key(tags_all), _tags_key(tags_any), include_archive),
+        lambda db: db.get_tasks(sort_field, sort_order, priority_filter,
+                                tags_all, tags_any, include_archive))
+    return list(tasks)
+
+
+def _tags_key(tags: list[str] | None) -> tuple[str, ...] | None:
+    """Приводит список тэгов фильтра к виду ключа кэша: порядок,
+       регистр и повторы имен не влияют на результат запроса."""
+    if not tags:
         return None
+    return tuple(sorted({normalize_tag(name) for name in tags}))
+
+
+def _encode_page_token(sort_field: str | None,
+                       sort_order: str | None,
+                       key: tuple) -> str:
+    """Упаковывает ключ последней задачи страницы в строковый токен."""
+    # Даты в ключе хранятся так же, как в БД - секундами эпохи.
+    payload = json.dumps([sort_field, sort_order, *key],
+                         default=adapt_datetime)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_page_token(page_token: str,
+                       sort_field: str | None,
+                       sort_order: str | None) -> tuple:
+    """Распаковывает токен страницы и проверяет, что он выдан для той же
+       сортировки."""
+    try:
+        field, order, value, task_id = json.loads(
+            base64.urlsafe_b64decode(page_token.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Некорректный токен страницы: {e}") from e
+    # Ключ - значение поля сортировки (строка, число или NULL) и id.
+    if (not isinstance(value, (str, int, float, type(None)))
+            or not isinstance(task_id, int) or isinstance(task_id, bool)):
+        raise ValueError("Некорректный токен страницы: неверный ключ.")
+    if (field, order) != (sort_field, sort_order):
+        raise ValueError("Токен страницы выдан для другой сортировки.")
+    return value, task_id
+
+
+def get_tasks_page(sort_field: str = None,
+                   sort_order: str = None,
+                   priority_filter: str = None,
+                   limit: int = PAGE_SIZE,
+                   page_token: str | None = None,
+                   tags_all: list[str] | None = None,
+                   tags_any: list[str] | None = None,
+                   include_archive: bool = False
+                   ) -> tuple[list[Task], str | None]:
+    """Возвращает страницу задач с теми же параметрами сортировки и
+       фильтра, что и get_all_tasks.
+
+    Args:
+        sort_field: Поле сортировки (по умол. None).
+        sort_order: Порядок сортировки (по умол. None).
+        priority_filter: Фильтр по приоритету (по умол. None).
+        limit: Размер страницы (по умол. PAGE_SIZE).
+        page_token: Токен продолжения из предыдущего вызова
+            (по умол. None - первая страница).
+        tags_all: Задача должна иметь все эти тэги (по умол. None).
+        tags_any: Задача должна иметь хотя бы один из этих тэгов
+            (по умол. None).
+        include_archive: Учитывать архив завершенных задач
+            (по умол. False).
+
+    Returns:
+        Список задач страницы и токен следующей страницы (None, если
+        задач больше нет).
+    """
+    after = (None if page_token is None else
+             _decode_page_token(page_token, sort_field, sort_order))
+    tasks, next_key = _cached(
+        ("page", sort_field, sort_order, priority_filter, limit, after,
+         _tags_key(tags_all), _tags_key(tags_any), include_archive),
+        lambda db: db.get_tasks_page(
+            sort_field, sort_order, priority_filter, limit, after,
+            tags_all, tags_any, include_archive))
+    tasks = list(tasks)
+    if next_key is None:
+        return tasks, None
+    return tasks, _encode_page_token(sort_field, sort_order, next_key)
+
+
+def find_tasks(query: TaskQuery) -> list[Task]:
+    """Возвращает задачи по составному запросу: фильтры, поиск и
+       сортировка выполняются одним запросом к БД.
+
+    Args:
+        query: Составной запрос.
+
+    Returns:
+        Список задач.
+    """
+    return list(_cached(("query", query), lambda db: db.query_tasks(query)))
+
+
+def find_tasks_page(query: TaskQuery,
+                    limit: int = PAGE_SIZE,
+                    page_token: str | None = None
+                    ) -> tuple[list[Task], str | None]:
+    """Возвращает страницу задач составного запроса (см.
+       Database.query_tasks_page).
+
+    Args:
+        query: Составной запрос.
+        limit: Размер страницы (по умол. PAGE_SIZE).
+        page_token: Токен продолжения из предыдущего вызова
+            (по умол. None - первая страница).
+
+    Returns:
+        Список задач страницы и токен следующей страницы (None, если
+        задач больше нет).
+    """
+    sort_field, sort_order = query.sort[0] if query.sort else ("id", None)
+    after = (None if page_token is None else
+             _decode_page_token(page_token, sort_field, sort_order))
+    tasks, next_key = _cached(
+        ("query_page", query, limit, after),
+        lambda db: db.query_tasks_page(query, limit, after))
+    tasks = list(tasks)
+    if next_key is None:
+        return tasks, None
+    return tasks, _encode_page_token(sort_field, sort_order, next_key)
+
+
+def iter_tasks(query: TaskQuery, batch_size: int = 1000) -> Iterator[Task]:
+    """Построчно выдает задачи составного запроса, не загружая весь
+       результат в память (без кэша).
+
+    Итератор читает соединение того потока, в котором выбрана первая
+    задача, поэтому выбирать его нужно целиком в одном потоке.
+
+    Args:
+        query: Составной запрос.
+        batch_size: Количество строк за одно обращение к курсору
+            (по умол. 1000).
+
+    Returns:
+        Итератор задач.
+    """
+    with get_pool().session() as db:
+        yield from db.iter_tasks(batch_size=batch_size, query=query)
+
+
+def get_task_by_id(task_id: int,
+                   include_archive: bool = False) -> Task | None:
+    """Возвращает задачу по id (с include_archive - и из архива)."""
+    return _cached(("task", task_id, include_archive),
+                   lambda db: db.get_task_by_id(task_id, include_archive))
+
+
+def get_tag_counts() -> list[tuple[str, int]]:
+    """Возвращает тэги с количеством задач у каждого.
+
+    Returns:
+        Список пар (тэг, количество задач), по убыванию количества.
+    """
+    return list(_cached(("tag_counts",), lambda db: db.get_tag_counts()))
+
+
+def get_tasks_due_before(moment: datetime | date,
+                         include_completed: bool = False) -> list[Task]:
+    """Возвращает задачи с дедлайном раньше moment (по возрастанию
+       дедлайна).
+
+    Args:
+        moment: Граница дедлайна.
+        include_completed: Учитывать и завершенные задачи
+            (по умол. False).
+
+    Returns:
+        Список задач.
+    """
+    with get_pool().session() as db:
+        return db.get_tasks_due(
+            moment, status=None if include_completed else "Open")
+
 
+def get_overdue_tasks() -> list[Task]:
+    """Возвращает незавершенные задачи с истекшим дедлайном."""
+    return get_tasks_due_before(datetime.now())
 
-def search_tasks(search_criteria: str) -> list:
+
+def get_upcoming_deadlines(moment: datetime,
+                           limit: int = PAGE_SIZE,
+                           after: tuple | None = None
+                           ) -> tuple[list[Task], tuple | None]:
+    """Возвращает страницу незавершенных задач с дедлайном не раньше
+       moment, по возрастанию дедлайна (индекс status + deadline).
+
+    Args:
+        moment: Нижняя граница дедлайна.
+        limit: Размер страницы (по умол. PAGE_SIZE).
+        after: Ключ последней задачи предыдущей страницы
+            (по умол. None - первая страница).
+
+    Returns:
+        Список задач и ключ следующей страницы (None, если страница
+        последняя).
+    """
+    query = (TaskQuery().where_status("Open").where_deadline(after=moment)
+             .order_by("deadline"))
+    with get_pool().session() as db:
+        return db.query_tasks_page(query, limit, after)
+
+
+def get_tasks_completed_between(start: datetime | date | None = None,
+                                end: datetime | date | None = None,
+                                include_archive: bool = False
+                                ) -> list[Task]:
+    """Возвращает задачи, завершенные в диапазоне [start, end).
+
+    Args:
+        start: Начало диапазона, None - без ограничения (по умол. None).
+        end: Конец диапазона (не включается), None - без ограничения
+            (по умол. None).
+        include_archive: Учитывать и архив завершенных задач
+            (по умол. False).
+
+    Returns:
+        Список задач.
+    """
+    with get_pool().session() as db:
+        return db.get_tasks_completed_between(start, end, include_archive)
+
+
+def search_tasks(search_criteria: str,
+                 include_archive: bool = False) -> list:
     """Ищет задачи по критериям.
 
     Args:
         search_criteria: Критерии поиска.
+        include_archive: Искать и в архиве завершенных задач
+            (по умол. False).
 
     Returns:
         Список задач.
     """
-    db = Database()
-    tasks_tuples = db.search_tasks(search_criteria)
-    tasks = [Task.from_tuple(task_tuple) for task_tuple in tasks_tuples]
-    db.close()
-    return tasks
+    return list(_cached(
+        ("search", search_criteria, include_archive),
+        lambda db: db.search_tasks(search_criteria, include_archive)))
 
 
 def complete_task(task_id: int,
-                  completed_at: str | datetime | None = datetime.now()
-                  ) -> bool:
+                  completed_at: str | datetime | None = None) -> bool:
     """Завершает задачу, обновляя её статус и дату завершения.
 
     Args:
         task_id: id задачи.
-        completed_at: Дата завершения (по умол. datetime.now()).
+        completed_at: Дата завершения (по умол. None - текущее время).
 
     Returns:
         bool значение в зависимости от выполнения.
     """
-    db = Database()
-    success = db.update_task_status(task_id, "Completed", completed_at)
-    db.close()
+    if completed_at is None:
+        completed_at = datetime.now()
+    with get_pool().session() as db:
+        success = db.update_task_status(task_id, "Completed", completed_at)
+        task = _changed_task(db, task_id) if success else None
+    if success:
+        _cache.invalidate([task_id])
+    _notify(TaskEvent.COMPLETED, task)
     return success
 
 
@@ -108,8 +497,312 @@ def update_task(task_id: int,
     Returns:
         bool значение в зависимости от выполнения.
     """
-    db = Database()
-    success = db.update_task(
-        task_id, title, description, priority, deadline, tags)
-    db.close()
+    with get_pool().session() as db:
+        success = db.update_task(
+            task_id, title, description, priority, deadline, tags)
+        task = _changed_task(db, task_id) if success else None
+    if success:
+        _cache.invalidate([task_id])
+    _notify(TaskEvent.UPDATED, task)
     return success
+
+
+def complete_tasks(task_ids: Iterable[int],
+                   completed_at: str | datetime | None = None
+                   ) -> dict[int, bool] | None:
+    """Завершает несколько задач в одной транзакции.
+
+    Args:
+        task_ids: id задач.
+        completed_at: Дата завершения (по умол. None - текущее время).
+
+    Returns:
+        Для каждого id - True, если задача найдена и завершена;
+        None при ошибке БД (изменения отменены).
+    """
+    if completed_at is None:
+        completed_at = datetime.now()
+    with get_pool().session() as db:
+        outcomes = db.update_tasks_status(task_ids, "Completed", completed_at)
+        tasks = _changed_tasks(db, outcomes)
+    if outcomes is not None:
+        _cache.invalidate(outcomes)
+    for task in tasks:
+        _notify(TaskEvent.COMPLETED, task)
+    return outcomes
+
+
+def update_tasks(task_ids: Iterable[int] | None,
+                 title: str = None,
+                 description: str = None,
+                 priority: str = None,
+                 deadline: str | date | None = None,
+                 tags: str = None,
+                 priority_filter: str = None,
+                 tags_all: list[str] | None = None,
+                 tags_any: list[str] | None = None) -> dict[int, bool] | None:
+    """Присваивает одни и те же значения полей нескольким задачам
+       в одной транзакции.
+
+    Args:
+        task_ids: id задач (None - все задачи, подходящие под фильтры).
+        title: Заголовок (по умол. None).
+        description: Описание (по умол. None).
+        priority: Приоритет (по умол. None).
+        deadline: Дедлайн (по умол. None).
+        tags: Тэги (по умол. None).
+        priority_filter: Изменять только задачи с этим приоритетом
+            (по умол. None - без фильтра).
+        tags_all: Изменять только задачи со всеми этими тэгами
+            (по умол. None).
+        tags_any: Изменять только задачи хотя бы с одним из этих тэгов
+            (по умол. None).
+
+    Returns:
+        Для каждого id - True, если задача найдена и изменена;
+        None при ошибке БД (изменения отменены).
+    """
+    with get_pool().session() as db:
+        outcomes = db.update_tasks(
+            task_ids, title, description, priority, deadline, tags,
+            priority_filter, tags_all, tags_any)
+        tasks = _changed_tasks(db, outcomes)
+    if outcomes is not None:
+        _cache.invalidate(outcomes)
+    for task in tasks:
+        _notify(TaskEvent.UPDATED, task)
+    return outcomes
+
+
+def delete_tasks(task_ids: Iterable[int]) -> dict[int, bool] | None:
+    """Удаляет несколько задач в одной транзакции.
+
+    Args:
+        task_ids: id задач.
+
+    Returns:
+        Для каждого id - True, если задача найдена и удалена;
+        None при ошибке БД (изменения отменены).
+    """
+    task_ids = list(task_ids)
+    with get_pool().session() as db:
+        tasks = db.get_tasks_by_ids(task_ids) if _listeners else []
+        outcomes = db.delete_tasks(task_ids)
+    if outcomes is None:
+        return None
+    _cache.invalidate(outcomes)
+    for task in tasks:
+        _notify(TaskEvent.DELETED, task)
+    return outcomes
+
+
+def archive_completed(older_than: timedelta | datetime = ARCHIVE_AFTER
+                      ) -> int | None:
+    """Переносит в архив задачи, завершенные раньше заданного момента.
+
+    Архивные задачи не попадают в списки и поиск по умолчанию, пока
+    не передан include_archive=True.
+
+    Args:
+        older_than: Возраст завершенной задачи (по умол. ARCHIVE_AFTER)
+            или граница даты завершения.
+
+    Returns:
+        Количество перенесенных задач; None при ошибке БД.
+    """
+    if isinstance(older_than, timedelta):
+        older_than = datetime.now() - older_than
+    with get_pool().session() as db:
+        count = db.archive_completed(older_than)
+    if count:
+        _cache.invalidate()
+    return count
+
+
+def get_changes_since(since: int = 0,
+                      limit: int = CHANGES_BATCH
+                      ) -> tuple[list[TaskChange], int]:
+    """Возвращает изменения задач после записи since журнала изменений
+       (для инкрементальной синхронизации и выгрузки изменений).
+
+    Стоимость зависит от количества изменений, а не от размера списка.
+    В пакете каждая задача встречается один раз, с последней записью:
+    task - текущее состояние задачи, поэтому более ранние записи ничего
+    не добавляют. Синхронизация с since = 0 получает все задачи.
+
+    Args:
+        since: Номер, возвращенный предыдущим вызовом
+            (по умол. 0 - с начала журнала).
+        limit: Наибольшее количество записей журнала за вызов
+            (по умол. CHANGES_BATCH).
+
+    Returns:
+        Изменения по возрастанию номера и номер для следующего вызова
+        (равен since, если изменений нет).
+    """
+    with get_pool().session() as db:
+        changes = db.get_changes(since, limit)
+    if not changes:
+        return [], since
+    latest: dict[int, TaskChange] = {}
+    for change in changes:
+        latest.pop(change.task_id, None)
+        latest[change.task_id] = change
+    return list(latest.values()), changes[-1].seq
+
+
+def compact_changes() -> int | None:
+    """Сжимает журнал изменений (см. Database.compact_changes).
+
+    Returns:
+        Количество удаленных записей; None при ошибке БД.
+    """
+    with get_pool().session() as db:
+        return db.compact_changes()
+
+
+def create_snapshot(directory: str | None = None,
+                    keep: int | None = None) -> "Snapshot":
+    """Создает проверенный снимок БД, не останавливая работу с ней
+       (см. backup.create_snapshot).
+
+    Args:
+        directory: Каталог снимков (по умол. backups рядом с БД).
+        keep: Сколько последних снимков оставить, None - не удалять
+            старые (по умол. None).
+
+    Returns:
+        Созданный снимок.
+    """
+    import backup
+    db_name: str = get_pool().db_name
+    snapshot = backup.create_snapshot(db_name, directory)
+    if keep is not None:
+        backup.prune_snapshots(db_name, directory, keep)
+    return snapshot
+
+
+def restore_snapshot(path: str,
+                     directory: str | None = None) -> "Snapshot":
+    """Восстанавливает БД из снимка, предварительно сохранив снимок
+       текущего состояния (см. backup.restore_snapshot).
+
+    Кэш запросов сбрасывается, а подписчики получают события для
+    каждой задачи, которую восстановление добавило, изменило или
+    удалило.
+
+    Args:
+        path: Путь к файлу снимка.
+        directory: Каталог для снимка текущего состояния
+            (по умол. backups рядом с БД).
+
+    Returns:
+        Снимок состояния БД до восстановления.
+    """
+    import backup
+    pool = get_pool()
+    current = backup.create_snapshot(pool.db_name, directory)
+    with pool.session() as db:
+        since: int = db.get_last_change()
+    backup.restore_snapshot(path, pool.db_name)
+    _cache.invalidate()
+    if _listeners:
+        _notify_restored(since, current.path)
+    return current
+
+
+def _notify_restored(since: int, previous_path: str) -> None:
+    """Рассылает события для задач, измененных восстановлением: записей
+       журнала после since. Удаленные задачи читаются из снимка
+       previous_path (состояние до восстановления)."""
+    import backup
+    while True:
+        changes, since_next = get_changes_since(since)
+        if since_next == since:
+            return
+        since = since_next
+        deleted: list[int] = []
+        for change in changes:
+            if change.task is None:
+                deleted.append(change.task_id)
+            elif change.operation == "insert":
+                _notify(TaskEvent.INSERTED, change.task)
+            else:
+                _notify(TaskEvent.UPDATED, change.task)
+        if deleted:
+            with closing(backup.open_snapshot(previous_path)) as conn:
+                tasks = Database(conn=conn).get_tasks_by_ids(deleted)
+            for task in tasks:
+                _notify(TaskEvent.DELETED, task)
+
+
+def import_tasks(path: str,
+                 file_format: str | None = None,
+                 batch_size: int = 1000) -> "ImportResult":
+    """Импортирует задачи из файла CSV или JSON Lines.
+
+    Файл читается потоково, корректные строки добавляются пакетами в
+    одной транзакции, ошибки отдельных строк попадают в итог и не
+    прерывают импорт.
+
+    Args:
+        path: Путь к файлу.
+        file_format: "csv" или "jsonl" (по умол. по расширению файла).
+        batch_size: Размер пакета (по умол. 1000).
+
+    Returns:
+        Итог импорта.
+    """
+    # transfer (csv, json) нужен только для импорта/экспорта, поэтому
+    # импортируется здесь, а не при загрузке модуля.
+    from transfer import ImportResult, READERS, detect_format, valid_rows
+    read = READERS[file_format or detect_format(path)]
+    result = ImportResult()
+    with open(path, encoding="utf-8", newline="") as file:
+        with get_pool().session() as db:
+            imported = db.add_tasks_bulk(
+                valid_rows(read(file), result), batch_size)
+    _cache.invalidate()
+    if imported is None:
+        raise RuntimeError("Импорт отменен из-за ошибки БД.")
+    result.imported = imported
+    return result
+
+
+def export_tasks(path: str,
+                 file_format: str | None = None,
+                 sort_field: str = None,
+                 sort_order: str = None,
+                 priority_filter: str = None,
+                 tags_all: list[str] | None = None,
+                 tags_any: list[str] | None = None,
+                 include_archive: bool = False,
+                 query: TaskQuery | None = None) -> int:
+    """Экспортирует задачи в файл CSV или JSON Lines, записывая строки
+       по мере чтения из БД.
+
+    Args:
+        path: Путь к файлу.
+        file_format: "csv" или "jsonl" (по умол. по расширению файла).
+        sort_field: Поле сортировки (по умол. None).
+        sort_order: Порядок сортировки (по умол. None).
+        priority_filter: Фильтр по приоритету (по умол. None).
+        tags_all: Задача должна иметь все эти тэги (по умол. None).
+        tags_any: Задача должна иметь хотя бы один из этих тэгов
+            (по умол. None).
+        include_archive: Выгружать и архив завершенных задач
+            (по умол. False).
+        query: Составной запрос вместо параметров сортировки и фильтров
+            (по умол. None).
+
+    Returns:
+        Количество выгруженных задач.
+    """
+    from transfer import WRITERS, detect_format
+    write = WRITERS[file_format or detect_format(path)]
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        with get_pool().session() as db:
+            return write(db.iter_tasks(
+                sort_field, sort_order, priority_filter,
+                tags_all=tags_all, tags_any=tags_any,
+                include_archive=include_archive, query=query), file)
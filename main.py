@@ -1,9 +1,15 @@
 import sys
 from PyQt6.QtWidgets import QApplication
+from logic import init_db, close_db
+from profiling import profiler
 from ui import TaskManagerUI
 
 if __name__ == "__main__":
+    if "--profile" in sys.argv:
+        profiler.enable()
+    init_db()
     app: QApplication = QApplication(sys.argv)
     ui: TaskManagerUI = TaskManagerUI()
     ui.show()
     app.exec()
+    close_db()
@@ -0,0 +1,532 @@
+import sqlite3
+from typing import Callable
+from models import FIELD_CODES, name_sql
+from tags import replace_task_tags
+
+
+def create_tasks_table(cursor: sqlite3.Cursor) -> None:
+    """Создает таблицу tasks."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            priority TEXT NOT NULL
+                CHECK (priority IN ('Low', 'Medium', 'High')),
+            deadline DATETIME,
+            status TEXT NOT NULL DEFAULT 'Open' CHECK
+                (status IN ('Open', 'Completed')),
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            completed_at DATETIME,
+            tags TEXT
+        )
+    """)
+
+
+def create_fts_index(cursor: sqlite3.Cursor) -> None:
+    """Создает полнотекстовый индекс FTS5 по текстовым полям задач,
+       триггеры синхронизации и заполняет индекс существующими задачами."""
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description, priority, status, tags,
+            content='tasks',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks
+        BEGIN
+            INSERT INTO tasks_fts
+                (rowid, title, description, priority, status, tags)
+            VALUES (new.id, new.title, new.description,
+                    new.priority, new.status, new.tags);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks
+        BEGIN
+            INSERT INTO tasks_fts
+                (tasks_fts, rowid, title, description, priority, status,
+                 tags)
+            VALUES ('delete', old.id, old.title, old.description,
+                    old.priority, old.status, old.tags);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au
+        AFTER UPDATE OF title, description, priority, status, tags
+        ON tasks
+        BEGIN
+            INSERT INTO tasks_fts
+                (tasks_fts, rowid, title, description, priority, status,
+                 tags)
+            VALUES ('delete', old.id, old.title, old.description,
+                    old.priority, old.status, old.tags);
+            INSERT INTO tasks_fts
+                (rowid, title, description, priority, status, tags)
+            VALUES (new.id, new.title, new.description,
+                    new.priority, new.status, new.tags);
+        END
+    """)
+    cursor.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+# Индексы под комбинации фильтра и сортировки, доступные в UI:
+# сортировка без фильтра, сортировка внутри фильтра по приоритету и
+# открытые задачи по дедлайну. id в ORDER BY берется из самого индекса
+# (rowid), поэтому временная сортировка не нужна.
+TASK_INDEXES: dict[str, str] = {
+    "idx_tasks_title": "title",
+    "idx_tasks_status": "status",
+    "idx_tasks_priority": "priority",
+    "idx_tasks_deadline": "deadline",
+    "idx_tasks_priority_title": "priority, title",
+    "idx_tasks_priority_status": "priority, status",
+    "idx_tasks_priority_deadline": "priority, deadline",
+    "idx_tasks_status_deadline": "status, deadline",
+}
+
+
+def create_task_indexes(cursor: sqlite3.Cursor) -> None:
+    """Создает вторичные индексы таблицы tasks."""
+    for name, columns in TASK_INDEXES.items():
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON tasks ({columns})")
+
+
+def create_tag_tables(cursor: sqlite3.Cursor) -> None:
+    """Создает нормализованное хранение тэгов (tags, task_tags) и
+       заполняет его разбором строк tasks.tags."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_tags (
+            task_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY (task_id, tag_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_tags_tag
+        ON task_tags (tag_id, task_id)
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_tags_ad AFTER DELETE ON tasks
+        BEGIN
+            DELETE FROM task_tags WHERE task_id = old.id;
+        END
+    """)
+    reader = cursor.connection.execute(
+        "SELECT id, tags FROM tasks WHERE tags IS NOT NULL AND tags != ''")
+    try:
+        replace_task_tags(cursor, reader)
+    finally:
+        reader.close()
+
+
+def rebuild_tasks_table(cursor: sqlite3.Cursor,
+                        create_sql: str,
+                        select_sql: str,
+                        table: str = "tasks") -> None:
+    """Пересоздает таблицу задач с новым определением столбцов.
+
+    Данные копируются запросом select_sql из старой таблицы, индексы и
+    триггеры таблицы пересоздаются по их исходному SQL, значение
+    AUTOINCREMENT сохраняется.
+
+    Args:
+        cursor: Курсор (внутри транзакции миграции).
+        create_sql: CREATE TABLE {table}_new (...).
+        select_sql: SELECT из table в порядке столбцов {table}_new.
+        table: Таблица (по умол. tasks).
+    """
+    cursor.execute("""
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name = ? AND type IN ('index', 'trigger')
+            AND sql IS NOT NULL
+    """, (table,))
+    dependents: list[str] = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?",
+                   (table,))
+    row = cursor.fetchone()
+    sequence: int = row[0] if row else 0
+
+    cursor.execute(create_sql)
+    cursor.execute(f"INSERT INTO {table}_new {select_sql}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    for sql in dependents:
+        cursor.execute(sql)
+    cursor.execute("""
+        UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?
+    """, (sequence, table))
+
+
+def epoch_sql(column: str, local: bool) -> str:
+    """SQL-выражение, переводящее дату-строку столбца в секунды эпохи.
+
+    Args:
+        column: Имя столбца.
+        local: True, если строка хранит местное время (а не UTC).
+    """
+    modifier = ", 'utc'" if local else ""
+    return f"""CASE
+        WHEN {column} IS NULL OR {column} = '' THEN NULL
+        WHEN typeof({column}) IN ('integer', 'real')
+            THEN CAST({column} AS INTEGER)
+        ELSE CAST(strftime('%s', {column}{modifier}) AS INTEGER)
+    END"""
+
+
+def convert_dates_to_epoch(cursor: sqlite3.Cursor) -> None:
+    """Переводит deadline, created_at и completed_at в целые секунды эпохи
+       (тип EPOCH) и добавляет индекс по дате завершения.
+
+    created_at заполнялся CURRENT_TIMESTAMP (UTC), deadline и
+    completed_at - местным временем приложения.
+    """
+    rebuild_tasks_table(cursor, """
+        CREATE TABLE tasks_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            priority TEXT NOT NULL
+                CHECK (priority IN ('Low', 'Medium', 'High')),
+            deadline EPOCH,
+            status TEXT NOT NULL DEFAULT 'Open' CHECK
+                (status IN ('Open', 'Completed')),
+            created_at EPOCH
+                DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            completed_at EPOCH,
+            tags TEXT
+        )
+    """, f"""
+        SELECT id, title, description, priority,
+            {epoch_sql("deadline", local=True)},
+            status,
+            {epoch_sql("created_at", local=False)},
+            {epoch_sql("completed_at", local=True)},
+            tags
+        FROM tasks
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed_at
+        ON tasks (completed_at)
+    """)
+
+
+def create_archive_tables(cursor: sqlite3.Cursor) -> None:
+    """Создает архив завершенных задач: таблицу tasks_archive с теми же
+       столбцами, что у tasks, связи архивных задач с тэгами и
+       полнотекстовый индекс архива.
+
+    id задач сохраняется при переносе в архив (AUTOINCREMENT в tasks не
+    выдает id повторно), поэтому id не пересекаются.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            priority TEXT NOT NULL,
+            deadline EPOCH,
+            status TEXT NOT NULL,
+            created_at EPOCH,
+            completed_at EPOCH,
+            tags TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_archive_completed_at
+        ON tasks_archive (completed_at)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS archive_task_tags (
+            task_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY (task_id, tag_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_archive_task_tags_tag
+        ON archive_task_tags (tag_id, task_id)
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS archive_task_tags_ad
+        AFTER DELETE ON tasks_archive
+        BEGIN
+            DELETE FROM archive_task_tags WHERE task_id = old.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_archive_fts USING fts5(
+            title, description, priority, status, tags,
+            content='tasks_archive',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_ai
+        AFTER INSERT ON tasks_archive
+        BEGIN
+            INSERT INTO tasks_archive_fts
+                (rowid, title, description, priority, status, tags)
+            VALUES (new.id, new.title, new.description,
+                    new.priority, new.status, new.tags);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_ad
+        AFTER DELETE ON tasks_archive
+        BEGIN
+            INSERT INTO tasks_archive_fts
+                (tasks_archive_fts, rowid, title, description, priority,
+                 status, tags)
+            VALUES ('delete', old.id, old.title, old.description,
+                    old.priority, old.status, old.tags);
+        END
+    """)
+
+
+def code_sql(field: str, column: str) -> str:
+    """SQL-выражение CASE, переводящее имя приоритета или статуса в
+       столбце column в код."""
+    cases: str = " ".join(f"WHEN '{name}' THEN {code}"
+                          for name, code in FIELD_CODES[field].items())
+    return f"CASE {column} {cases} ELSE {column} END"
+
+
+def recreate_fts_index(cursor: sqlite3.Cursor, table: str) -> None:
+    """Создает индекс FTS5 таблицы задач по представлению
+       {table}_fts_source, где приоритет и статус - имена, и триггеры
+       синхронизации индекса, затем заполняет индекс.
+
+    Args:
+        cursor: Курсор (внутри транзакции миграции).
+        table: tasks или tasks_archive.
+    """
+    fts: str = f"{table}_fts"
+
+    def values(row: str) -> str:
+        return (f"{row}.id, {row}.title, {row}.description, "
+                f"{name_sql('priority', row + '.priority')}, "
+                f"{name_sql('status', row + '.status')}, {row}.tags")
+
+    cursor.execute(f"""
+        CREATE VIEW {fts}_source AS
+        SELECT id, title, description,
+            {name_sql("priority", "priority")} AS priority,
+            {name_sql("status", "status")} AS status,
+            tags
+        FROM {table}
+    """)
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            title, description, priority, status, tags,
+            content='{fts}_source',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    insert: str = f"""
+            INSERT INTO {fts}
+                (rowid, title, description, priority, status, tags)
+            VALUES ({values("new")});"""
+    delete: str = f"""
+            INSERT INTO {fts}
+                ({fts}, rowid, title, description, priority, status, tags)
+            VALUES ('delete', {values("old")});"""
+    cursor.execute(f"""
+        CREATE TRIGGER {fts}_ai AFTER INSERT ON {table}
+        BEGIN{insert}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {fts}_ad AFTER DELETE ON {table}
+        BEGIN{delete}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {fts}_au
+        AFTER UPDATE OF title, description, priority, status, tags
+        ON {table}
+        BEGIN{delete}{insert}
+        END
+    """)
+    cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def encode_priority_and_status(cursor: sqlite3.Cursor) -> None:
+    """Переводит priority и status задач и архива из строк в целые коды
+       (models.PRIORITY_CODES, STATUS_CODES) с типами PRIORITY и STATUS,
+       которые при чтении превращаются обратно в имена.
+
+    Индексы FTS5 пересоздаются поверх представлений, где коды заменены
+    именами: поиск по "High" или "Completed" продолжает работать.
+    """
+    for table in ("tasks", "tasks_archive"):
+        fts: str = f"{table}_fts"
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    rebuild_tasks_table(cursor, """
+        CREATE TABLE tasks_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            priority PRIORITY NOT NULL CHECK (priority IN (1, 2, 3)),
+            deadline EPOCH,
+            status STATUS NOT NULL DEFAULT 0 CHECK (status IN (0, 1)),
+            created_at EPOCH
+                DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            completed_at EPOCH,
+            tags TEXT
+        )
+    """, f"""
+        SELECT id, title, description, {code_sql("priority", "priority")},
+            deadline, {code_sql("status", "status")}, created_at,
+            completed_at, tags
+        FROM tasks
+    """)
+    rebuild_tasks_table(cursor, """
+        CREATE TABLE tasks_archive_new (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            priority PRIORITY NOT NULL,
+            deadline EPOCH,
+            status STATUS NOT NULL,
+            created_at EPOCH,
+            completed_at EPOCH,
+            tags TEXT
+        )
+    """, f"""
+        SELECT id, title, description, {code_sql("priority", "priority")},
+            deadline, {code_sql("status", "status")}, created_at,
+            completed_at, tags
+        FROM tasks_archive
+    """, "tasks_archive")
+
+    for table in ("tasks", "tasks_archive"):
+        recreate_fts_index(cursor, table)
+
+
+def create_change_journal(cursor: sqlite3.Cursor) -> None:
+    """Создает журнал изменений задач task_changes, который ведут
+       триггеры tasks, и записывает в него существующие задачи.
+
+    Каждое добавление, изменение и удаление задачи добавляет в журнал
+    запись с возрастающим номером seq (AUTOINCREMENT не выдает номера
+    повторно и после сжатия журнала). Удаление при переносе в архив
+    записывается как "archive": к этому моменту задача уже есть в
+    tasks_archive.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            operation TEXT NOT NULL
+                CHECK (operation IN ('insert', 'update', 'delete',
+                                     'archive')),
+            changed_at EPOCH NOT NULL
+                DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_changes_task
+        ON task_changes (task_id, seq)
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_journal_ai
+        AFTER INSERT ON tasks
+        BEGIN
+            INSERT INTO task_changes (task_id, operation)
+            VALUES (new.id, 'insert');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_journal_au
+        AFTER UPDATE ON tasks
+        BEGIN
+            INSERT INTO task_changes (task_id, operation)
+            VALUES (new.id, 'update');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_journal_ad
+        AFTER DELETE ON tasks
+        BEGIN
+            INSERT INTO task_changes (task_id, operation)
+            VALUES (old.id, CASE WHEN EXISTS (
+                SELECT 1 FROM tasks_archive WHERE id = old.id)
+                THEN 'archive' ELSE 'delete' END);
+        END
+    """)
+    # Существующие задачи попадают в журнал как добавленные: синхронизация
+    # с нуля получает все задачи.
+    cursor.execute("""
+        INSERT INTO task_changes (task_id, operation, changed_at)
+        SELECT id, 'insert',
+               COALESCE(created_at, CAST(strftime('%s', 'now') AS INTEGER))
+        FROM tasks ORDER BY id
+    """)
+
+
+# Порядковый номер миграции (начиная с 1) хранится в PRAGMA user_version.
+# Новые миграции добавляются только в конец списка.
+MIGRATIONS: list[Callable[[sqlite3.Cursor], None]] = [
+    create_tasks_table,
+    create_fts_index,
+    create_task_indexes,
+    create_tag_tables,
+    convert_dates_to_epoch,
+    create_archive_tables,
+    encode_priority_and_status,
+    create_change_journal,
+]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Применяет к БД недостающие миграции.
+
+    Каждая миграция выполняется в своей транзакции вместе с обновлением
+    PRAGMA user_version, поэтому прерванная миграция не оставляет схему
+    в промежуточном состоянии.
+
+    Args:
+        conn: Соединение с БД.
+
+    Returns:
+        Версия схемы после миграции.
+    """
+    cursor = conn.cursor()
+    try:
+        version: int = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(MIGRATIONS):
+            return version
+        while True:
+            cursor.execute("BEGIN IMMEDIATE")
+            version: int = cursor.execute(
+                "PRAGMA user_version").fetchone()[0]
+            if version >= len(MIGRATIONS):
+                cursor.execute("COMMIT")
+                return version
+            try:
+                MIGRATIONS[version](cursor)
+                cursor.execute(f"PRAGMA user_version = {version + 1}")
+                cursor.execute("COMMIT")
+            except sqlite3.Error:
+                cursor.execute("ROLLBACK")
+                raise
+    finally:
+        cursor.close()
@@ -1,41 +1,74 @@
+import sqlite3
 from datetime import datetime
+from typing import NamedTuple
 
 
-class Task:
-    """Класс представляет собой задачу."""
+# Коды приоритетов и статусов, которыми они хранятся в БД. Коды
+# приоритетов возрастают вместе с важностью, поэтому сортировка по коду -
+# сортировка по важности, а открытые задачи идут раньше завершенных.
+PRIORITY_CODES: dict[str, int] = {"Low": 1, "Medium": 2, "High": 3}
+STATUS_CODES: dict[str, int] = {"Open": 0, "Completed": 1}
 
-    def __init__(self,
-                 id: int,
-                 title: str,
-                 description: str,
-                 priority: str,
-                 deadline: datetime | None,
-                 status: str,
-                 created_at: datetime,
-                 completed_at: datetime | None,
-                 tags: str | None) -> None:
-        """Инициализация объекта Task.
+PRIORITY_NAMES: dict[int, str] = {
+    code: name for name, code in PRIORITY_CODES.items()}
+STATUS_NAMES: dict[int, str] = {
+    code: name for name, code in STATUS_CODES.items()}
 
-        Args:
-            id: id задачи.
-            title: Заголовок.
-            description : Описание.
-            priority: Приоритет.
-            deadline: Дедлайн.
-            status : Статус.
-            created_at: Дата создания.
-            completed_at: Дата завершения.
-            tags: Тэги.
-        """
-        self.id = id
-        self.title = title
-        self.description = description
-        self.priority = priority
-        self.deadline = deadline
-        self.status = status
-        self.created_at = created_at
-        self.completed_at = completed_at
-        self.tags = tags
+# Коды значений по полю задачи.
+FIELD_CODES: dict[str, dict[str, int]] = {
+    "priority": PRIORITY_CODES,
+    "status": STATUS_CODES,
+}
+
+
+def encode_field(field: str, value):
+    """Переводит значение поля задачи в вид, в котором оно хранится в БД:
+       имя приоритета или статуса - в код, остальное - как есть.
+
+    Неизвестное имя возвращается без изменений, и его отклоняет
+    ограничение CHECK таблицы.
+    """
+    codes: dict[str, int] | None = FIELD_CODES.get(field)
+    return value if codes is None else codes.get(value, value)
+
+
+def name_sql(field: str, column: str) -> str:
+    """SQL-выражение CASE, переводящее код поля field в столбце column
+       в имя (например, для индекса поиска)."""
+    cases: str = " ".join(f"WHEN {code} THEN '{name}'"
+                          for name, code in FIELD_CODES[field].items())
+    return f"CASE {column} {cases} END"
+
+
+class Task(NamedTuple):
+    """Класс представляет собой задачу.
+
+    Задача - неизменяемый именованный кортеж: у объектов нет __dict__,
+    а строка результата запроса превращается в Task без промежуточных
+    копий (см. task_row_factory). Приоритет и статус хранятся в БД
+    кодами (PRIORITY_CODES, STATUS_CODES), а в Task - именами.
+
+    Attributes:
+        id: id задачи.
+        title: Заголовок.
+        description : Описание.
+        priority: Приоритет.
+        deadline: Дедлайн.
+        status : Статус.
+        created_at: Дата создания.
+        completed_at: Дата завершения.
+        tags: Тэги.
+    """
+
+    id: int
+    title: str
+    description: str
+    priority: str
+    deadline: datetime | None
+    status: str
+    created_at: datetime
+    completed_at: datetime | None
+    tags: str | None
 
     @classmethod
     def from_tuple(cls, task_tuple: tuple) -> "Task":
@@ -47,4 +80,49 @@ class Task:
         Returns:
             Объект Task из кортежа данных.
         """
-        return cls(*task_tuple)
+        return cls._make(task_tuple)
+
+
+def task_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Task:
+    """row_factory для курсоров, выбирающих строки tasks (SELECT *):
+       строка сразу создается как Task."""
+    return tuple.__new__(Task, row)
+
+
+class TaskEvent:
+    """Класс представляет собой событие изменения задачи."""
+
+    INSERTED: str = "inserted"
+    UPDATED: str = "updated"
+    COMPLETED: str = "completed"
+    DELETED: str = "deleted"
+
+    def __init__(self, kind: str, task: Task) -> None:
+        """Инициализация объекта TaskEvent.
+
+        Args:
+            kind: Вид события (INSERTED, UPDATED, COMPLETED или DELETED).
+            task: Задача после изменения (для DELETED - до удаления).
+        """
+        self.kind = kind
+        self.task = task
+
+
+class TaskChange(NamedTuple):
+    """Класс представляет собой запись журнала изменений задач.
+
+    Attributes:
+        seq: Номер записи (возрастает с каждым изменением).
+        task_id: id задачи.
+        operation: "insert", "update", "delete" или "archive" (задача
+            перенесена в архив).
+        changed_at: Время изменения.
+        task: Текущее состояние задачи в tasks (None, если задача удалена
+            или перенесена в архив).
+    """
+
+    seq: int
+    task_id: int
+    operation: str
+    changed_at: datetime
+    task: Task | None
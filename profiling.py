@@ -0,0 +1,363 @@
+import functools
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, TypeVar
+
+# Запросы дольше этого порога (в секундах) попадают в журнал медленных
+# запросов вместе с планом выполнения.
+SLOW_QUERY_THRESHOLD: float = 0.05
+
+# Сколько последних замеров хранится для каждого метода и сколько
+# медленных запросов - в журнале.
+MAX_SAMPLES: int = 1000
+MAX_SLOW_QUERIES: int = 100
+
+# Запросы, для которых можно получить EXPLAIN QUERY PLAN.
+EXPLAINABLE: tuple[str, ...] = ("SELECT", "WITH", "INSERT", "UPDATE",
+                                "DELETE", "REPLACE")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Перцентиль по методу ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class SlowQuery:
+    """Класс представляет собой запись журнала медленных запросов."""
+
+    def __init__(self,
+                 method: str | None,
+                 sql: str,
+                 duration: float,
+                 rows: int,
+                 plan: list[str]) -> None:
+        """Инициализация объекта SlowQuery.
+
+        Args:
+            method: Метод Database, выполнивший запрос.
+            sql: Текст запроса.
+            duration: Время выполнения с чтением строк (с).
+            rows: Количество прочитанных строк.
+            plan: План выполнения (EXPLAIN QUERY PLAN).
+        """
+        self.method = method
+        self.sql = sql
+        self.duration = duration
+        self.rows = rows
+        self.plan = plan
+
+
+class Profiler:
+    """Класс представляет собой сборщик статистики запросов к БД.
+
+    Пока профилирование выключено (enabled = False), декоратор profiled
+    только проверяет флаг, а Database создает обычные курсоры.
+    Включенный профилировщик учитывает время вызовов методов Database и
+    каждого SQL-запроса (выполнение и чтение строк), количество строк и
+    медленные запросы.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация объекта Profiler."""
+        self.enabled: bool = False
+        self.slow_threshold: float = SLOW_QUERY_THRESHOLD
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods: dict[str, deque[float]] = {}
+        self._method_totals: dict[str, list] = {}
+        self._statements: dict[str, list] = {}
+        self._slow: deque[SlowQuery] = deque(maxlen=MAX_SLOW_QUERIES)
+
+    def enable(self, slow_threshold: float | None = None) -> None:
+        """Включает профилирование.
+
+        Args:
+            slow_threshold: Порог медленного запроса в секундах
+                (по умол. None - прежний).
+        """
+        if slow_threshold is not None:
+            self.slow_threshold = slow_threshold
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Выключает профилирование (собранная статистика остается)."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Очищает собранную статистику."""
+        with self._lock:
+            self._methods.clear()
+            self._method_totals.clear()
+            self._statements.clear()
+            self._slow.clear()
+
+    def current_method(self) -> str | None:
+        """Возвращает метод Database, выполняющийся в текущем потоке."""
+        stack: list[str] = getattr(self._local, "stack", [])
+        return stack[-1] if stack else None
+
+    def enter_method(self, name: str) -> None:
+        """Отмечает начало вызова метода в текущем потоке."""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        self._local.stack.append(name)
+
+    def exit_method(self, name: str, duration: float) -> None:
+        """Учитывает завершенный вызов метода.
+
+        Args:
+            name: Имя метода.
+            duration: Время вызова (с).
+        """
+        self._local.stack.pop()
+        with self._lock:
+            samples = self._methods.get(name)
+            if samples is None:
+                samples = self._methods[name] = deque(maxlen=MAX_SAMPLES)
+            samples.append(duration)
+            totals = self._method_totals.setdefault(name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += duration
+
+    def record_statement(self,
+                         conn: sqlite3.Connection,
+                         sql: str,
+                         parameters: Any,
+                         duration: float,
+                         rows: int) -> None:
+        """Учитывает выполненный SQL-запрос; медленный запрос попадает
+           в журнал с планом выполнения.
+
+        Args:
+            conn: Соединение, выполнившее запрос.
+            sql: Текст запроса.
+            parameters: Параметры запроса.
+            duration: Время выполнения с чтением строк (с).
+            rows: Количество прочитанных (или измененных) строк.
+        """
+        sql = " ".join(sql.split())
+        with self._lock:
+            stats = self._statements.get(sql)
+            if stats is None:
+                stats = self._statements[sql] = [0, 0.0, 0, 0.0]
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] += rows
+            stats[3] = max(stats[3], duration)
+        if duration < self.slow_threshold:
+            return
+        query = SlowQuery(self.current_method(), sql, duration, rows,
+                          self.explain(conn, sql, parameters))
+        with self._lock:
+            self._slow.append(query)
+
+    @staticmethod
+    def explain(conn: sqlite3.Connection,
+                sql: str,
+                parameters: Any) -> list[str]:
+        """Возвращает план выполнения запроса (пустой, если запрос нельзя
+           объяснить)."""
+        if not sql.lstrip().upper().startswith(EXPLAINABLE):
+            return []
+        try:
+            rows = conn.execute(
+                "EXPLAIN QUERY PLAN " + sql, parameters or ()).fetchall()
+        except (sqlite3.Error, ValueError):
+            return []
+        return [row[3] for row in rows]
+
+    def method_stats(self) -> dict[str, dict]:
+        """Сводная статистика по методам Database.
+
+        Returns:
+            Для каждого метода: количество вызовов, суммарное время и
+            перцентили p50/p95/p99 последних MAX_SAMPLES вызовов (мс).
+        """
+        with self._lock:
+            snapshot = {name: (*self._method_totals[name], sorted(samples))
+                        for name, samples in self._methods.items()}
+        return {
+            name: {
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            }
+            for name, (count, total, samples) in sorted(snapshot.items())
+        }
+
+    def statement_stats(self) -> list[dict]:
+        """Сводная статистика по SQL-запросам, по убыванию суммарного
+           времени.
+
+        Returns:
+            Для каждого запроса: текст, количество выполнений, суммарное
+            и наибольшее время (мс), количество строк.
+        """
+        with self._lock:
+            items = [(sql, *stats) for sql, stats in self._statements.items()]
+        items.sort(key=lambda item: item[2], reverse=True)
+        return [{"sql": sql,
+                 "count": count,
+                 "total_ms": round(total * 1000, 3),
+                 "max_ms": round(longest * 1000, 3),
+                 "rows": rows}
+                for sql, count, total, rows, longest in items]
+
+    def slow_queries(self) -> list[SlowQuery]:
+        """Возвращает журнал медленных запросов (от старых к новым)."""
+        with self._lock:
+            return list(self._slow)
+
+    def snapshot(self) -> dict:
+        """Возвращает всю собранную статистику (например, для JSON).
+
+        Returns:
+            Словарь со статистикой методов, запросов и журналом
+            медленных запросов.
+        """
+        return {
+            "methods": self.method_stats(),
+            "statements": self.statement_stats(),
+            "slow_queries": [
+                {"method": query.method,
+                 "sql": query.sql,
+                 "duration_ms": round(query.duration * 1000, 3),
+                 "rows": query.rows,
+                 "plan": query.plan}
+                for query in self.slow_queries()],
+        }
+
+
+profiler = Profiler()
+
+
+def profiled(method: F) -> F:
+    """Декоратор метода Database: учитывает время вызова в статистике
+       профилировщика, если профилирование включено."""
+    name: str = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not profiler.enabled:
+            return method(*args, **kwargs)
+        profiler.enter_method(name)
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            profiler.exit_method(name, time.perf_counter() - started)
+
+    return wrapper
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Курсор, измеряющий время запросов для профилировщика.
+
+    Курсор создается только при включенном профилировании (cursor_class):
+    переопределенные методы чтения строк замедляют выборки. Время запроса
+    складывается из выполнения и чтения строк; запрос учитывается, когда
+    строки прочитаны до конца, выполнен следующий запрос или курсор
+    закрыт.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # [текст, параметры, время, строки] незавершенного запроса.
+        self._pending: list | None = None
+
+    def _finish(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            profiler.record_statement(self.connection, *pending)
+
+    def _track(self, started: float, rows: int, exhausted: bool) -> None:
+        pending = self._pending
+        if pending is None:
+            return
+        pending[2] += time.perf_counter() - started
+        pending[3] += rows
+        if exhausted:
+            self._finish()
+
+    def execute(self, sql: str, parameters: Any = ()) -> "InstrumentedCursor":
+        if self._pending is not None:
+            self._finish()
+        if not profiler.enabled:
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        rows: int = max(self.rowcount, 0)
+        self._pending = [sql, parameters, time.perf_counter() - started,
+                         rows]
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any
+                    ) -> "InstrumentedCursor":
+        if self._pending is not None:
+            self._finish()
+        if not profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        profiler.record_statement(self.connection, sql, None,
+                                  time.perf_counter() - started,
+                                  max(self.rowcount, 0))
+        return self
+
+    def __next__(self) -> Any:
+        if self._pending is None:
+            return super().__next__()
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._track(started, 0, True)
+            raise
+        self._track(started, 1, False)
+        return row
+
+    def fetchone(self) -> Any:
+        if self._pending is None:
+            return super().fetchone()
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._track(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list:
+        if self._pending is None:
+            return super().fetchmany(size or self.arraysize)
+        size = size or self.arraysize
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._track(started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self) -> list:
+        if self._pending is None:
+            return super().fetchall()
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._track(started, len(rows), True)
+        return rows
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+
+def cursor_class() -> type[sqlite3.Cursor]:
+    """Класс курсора для новых курсоров Database: InstrumentedCursor при
+       включенном профилировании, иначе обычный sqlite3.Cursor."""
+    return InstrumentedCursor if profiler.enabled else sqlite3.Cursor
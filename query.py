@@ -0,0 +1,349 @@
+import re
+from datetime import date, datetime
+from typing import NamedTuple
+from models import Task, encode_field
+from tags import normalize_tag
+
+# Поля, по которым разрешена сортировка списка задач.
+SORT_FIELDS: tuple[str, ...] = ("title", "status", "priority", "deadline")
+
+# Все ключи сортировки TaskQuery: имена подставляются в текст запроса,
+# поэтому принимаются только значения из этого списка. "rank" -
+# релевантность поиска (bm25), допустима только вместе с текстом.
+ORDER_FIELDS: tuple[str, ...] = (
+    *SORT_FIELDS, "id", "created_at", "completed_at", "rank")
+
+# Направления сортировки и соответствующие ключевые слова SQL.
+SORT_ORDERS: dict[str, str] = {"ascending": "ASC", "descending": "DESC"}
+
+# Веса столбцов tasks_fts для bm25: title, description, priority, status,
+# tags. Совпадение в заголовке важнее совпадения в описании.
+FTS_WEIGHTS: tuple[float, ...] = (10.0, 5.0, 1.0, 1.0, 3.0)
+
+# Столбцы tasks и tasks_archive в порядке полей Task.
+TASK_COLUMNS: str = ", ".join(Task._fields)
+
+# Для таблицы задач: таблица связей с тэгами и индекс FTS5.
+SOURCES: dict[str, tuple[str, str]] = {
+    "tasks": ("task_tags", "tasks_fts"),
+    "tasks_archive": ("archive_task_tags", "tasks_archive_fts"),
+}
+
+
+def build_fts_query(search_criteria: str) -> str | None:
+    """Преобразует строку поиска в запрос FTS5 с поиском по префиксу.
+
+    Каждое слово берется в кавычки (чтобы операторы FTS5 в тексте не
+    интерпретировались) и ищется как префикс, все слова должны
+    присутствовать в задаче.
+
+    Args:
+        search_criteria: Строка поиска.
+
+    Returns:
+        Запрос для MATCH или None, если в строке нет слов.
+    """
+    # Слова выделяются как токенизатором unicode61: "_" - разделитель,
+    # иначе "foo_bar" стал бы фразой, а не двумя независимыми словами.
+    terms: list[str] = re.findall(r"[^\W_]+", search_criteria)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _values(values) -> tuple:
+    """Приводит набор значений фильтра к отсортированному кортежу без
+       повторов: одинаковые фильтры дают одинаковые TaskQuery."""
+    return tuple(sorted(set(values)))
+
+
+class TaskQuery(NamedTuple):
+    """Класс представляет собой составной запрос списка задач.
+
+    Запрос неизменяем: методы where_*, order_by и with_archive
+    возвращают новый TaskQuery, поэтому условия можно комбинировать
+    в любом порядке, а сам запрос - использовать как ключ кэша. compile
+    собирает все условия в один параметризованный запрос SQL; значения
+    передаются параметрами, а имена полей сортировки проверяются по
+    ORDER_FIELDS.
+
+    Attributes:
+        statuses: Допустимые статусы (пусто - любой).
+        priorities: Допустимые приоритеты (пусто - любой).
+        tags_all: Задача должна иметь все эти тэги.
+        tags_any: Задача должна иметь хотя бы один из этих тэгов.
+        deadline_after: Нижняя граница дедлайна (включается).
+        deadline_before: Верхняя граница дедлайна (не включается).
+        text: Строка полнотекстового поиска.
+        sort: Ключи сортировки: пары (поле, "ascending"/"descending").
+        include_archive: Учитывать архив завершенных задач.
+    """
+
+    statuses: tuple[str, ...] = ()
+    priorities: tuple[str, ...] = ()
+    tags_all: tuple[str, ...] = ()
+    tags_any: tuple[str, ...] = ()
+    deadline_after: datetime | date | None = None
+    deadline_before: datetime | date | None = None
+    text: str | None = None
+    sort: tuple[tuple[str, str], ...] = ()
+    include_archive: bool = False
+
+    @classmethod
+    def create(cls,
+               sort_field: str = None,
+               sort_order: str = None,
+               priority_filter: str = None,
+               tags_all: list[str] | None = None,
+               tags_any: list[str] | None = None,
+               include_archive: bool = False) -> "TaskQuery":
+        """Создает запрос из параметров get_tasks.
+
+        Args:
+            sort_field: Поле сортировки (по умол. None).
+            sort_order: "ascending" или "descending" (по умол. None -
+                по убыванию, как в get_tasks).
+            priority_filter: Приоритет, "All" или None - без фильтра.
+            tags_all: Задача должна иметь все эти тэги (по умол. None).
+            tags_any: Задача должна иметь хотя бы один из этих тэгов
+                (по умол. None).
+            include_archive: Учитывать архив (по умол. False).
+
+        Returns:
+            Объект TaskQuery.
+        """
+        query = cls().with_archive(include_archive)
+        if priority_filter not in (None, "All"):
+            query = query.where_priority(priority_filter)
+        if tags_all:
+            query = query.where_all_tags(*tags_all)
+        if tags_any:
+            query = query.where_any_tag(*tags_any)
+        if sort_field:
+            query = query.order_by(
+                sort_field,
+                "ascending" if sort_order == "ascending" else "descending")
+        return query
+
+    def where_status(self, *statuses: str) -> "TaskQuery":
+        """Оставляет задачи с одним из статусов."""
+        return self._replace(statuses=_values(statuses))
+
+    def where_priority(self, *priorities: str) -> "TaskQuery":
+        """Оставляет задачи с одним из приоритетов."""
+        return self._replace(priorities=_values(priorities))
+
+    def where_all_tags(self, *names: str) -> "TaskQuery":
+        """Оставляет задачи, у которых есть все эти тэги."""
+        return self._replace(tags_all=_values(
+            normalize_tag(name) for name in names))
+
+    def where_any_tag(self, *names: str) -> "TaskQuery":
+        """Оставляет задачи хотя бы с одним из этих тэгов."""
+        return self._replace(tags_any=_values(
+            normalize_tag(name) for name in names))
+
+    def where_deadline(self,
+                       after: datetime | date | None = None,
+                       before: datetime | date | None = None
+                       ) -> "TaskQuery":
+        """Оставляет задачи с дедлайном в диапазоне [after, before).
+
+        Args:
+            after: Нижняя граница (по умол. None - без границы).
+            before: Верхняя граница (по умол. None - без границы).
+        """
+        return self._replace(deadline_after=after, deadline_before=before)
+
+    def where_text(self, search_criteria: str | None) -> "TaskQuery":
+        """Оставляет задачи, найденные полнотекстовым поиском (строка
+           без слов не ограничивает список)."""
+        return self._replace(text=search_criteria or None)
+
+    def order_by(self,
+                 field: str,
+                 sort_order: str = "ascending") -> "TaskQuery":
+        """Добавляет ключ сортировки после уже заданных.
+
+        Args:
+            field: Поле из ORDER_FIELDS.
+            sort_order: "ascending" или "descending"
+                (по умол. "ascending").
+
+        Returns:
+            Объект TaskQuery.
+        """
+        if field not in ORDER_FIELDS:
+            raise ValueError(f"Недопустимое поле сортировки: {field}")
+        if sort_order not in SORT_ORDERS:
+            raise ValueError(
+                f"Недопустимое направление сортировки: {sort_order}")
+        return self._replace(sort=(*self.sort, (field, sort_order)))
+
+    def with_archive(self, include_archive: bool = True) -> "TaskQuery":
+        """Включает (или выключает) архив завершенных задач."""
+        return self._replace(include_archive=include_archive)
+
+    def fts_query(self) -> str | None:
+        """Запрос MATCH для строки поиска (None - без поиска)."""
+        return None if self.text is None else build_fts_query(self.text)
+
+    def sort_keys(self) -> list[tuple[str, str]]:
+        """Возвращает ключи сортировки с учетом умолчаний.
+
+        Без заданной сортировки результаты поиска упорядочены по
+        релевантности, а объединение с архивом - по id. Если последний
+        ключ не id, id добавляется в том же направлении: порядок
+        становится детерминированным и совпадает с порядком индекса.
+
+        Returns:
+            Список пар (поле, направление).
+        """
+        keys: list[tuple[str, str]] = list(self.sort)
+        ranked: bool = self.fts_query() is not None
+        if any(field == "rank" for field, _ in keys) and not ranked:
+            raise ValueError("Сортировка по релевантности требует поиска.")
+        if not keys:
+            if ranked:
+                keys.append(("rank", "ascending"))
+            elif self.include_archive:
+                keys.append(("id", "ascending"))
+        if keys and keys[-1][0] != "id":
+            keys.append(("id", keys[-1][1]))
+        return keys
+
+    def _conditions(self, table: str) -> tuple[list, list]:
+        """Строит условия WHERE для одной таблицы задач.
+
+        Фильтры по тэгам разрешаются через индекс таблицы связей: "все
+        тэги" - задачи, у которых нашлось столько связей, сколько тэгов
+        задано, "любой тэг" - задачи хотя бы с одной связью.
+
+        Args:
+            table: tasks или tasks_archive.
+
+        Returns:
+            Список условий и список параметров.
+        """
+        links, fts = SOURCES[table]
+        where_clause: list = []
+        parameters: list = []
+
+        match: str | None = self.fts_query()
+        if match is not None:
+            where_clause.append(f"{fts} MATCH ?")
+            parameters.append(match)
+
+        for field, names in (("status", self.statuses),
+                             ("priority", self.priorities)):
+            values = [encode_field(field, name) for name in names]
+            if len(values) == 1:
+                where_clause.append(f"{table}.{field} = ?")
+            elif values:
+                placeholders = ", ".join("?" for _ in values)
+                where_clause.append(f"{table}.{field} IN ({placeholders})")
+            parameters.extend(values)
+
+        if self.deadline_after is not None:
+            where_clause.append(f"{table}.deadline >= ?")
+            parameters.append(self.deadline_after)
+        if self.deadline_before is not None:
+            where_clause.append(f"{table}.deadline < ?")
+            parameters.append(self.deadline_before)
+
+        for names, match_all in ((self.tags_all, True),
+                                 (self.tags_any, False)):
+            if not names:
+                continue
+            placeholders = ", ".join("?" for _ in names)
+            condition = f"""{table}.id IN (
+                SELECT {links}.task_id FROM tags
+                JOIN {links} ON {links}.tag_id = tags.id
+                WHERE tags.name IN ({placeholders})"""
+            if match_all:
+                condition += f"""
+                GROUP BY {links}.task_id HAVING COUNT(*) = ?"""
+            where_clause.append(condition + ")")
+            parameters.extend(names)
+            if match_all:
+                parameters.append(len(names))
+
+        return where_clause, parameters
+
+    def compile(self,
+                columns: str | None = None,
+                conditions: list[str] | None = None,
+                parameters: list | None = None,
+                limit: int | None = None) -> tuple[str, list]:
+        """Собирает запрос в один параметризованный SELECT.
+
+        Без архива фильтры применяются к tasks (с поиском - к tasks_fts,
+        соединенной с tasks). С архивом - к каждой таблице отдельно, а
+        объединение UNION ALL получает имя tasks, так что внешние условия
+        и сортировка одинаковы в обоих случаях.
+
+        Args:
+            columns: Выбираемые столбцы (по умол. None - все поля Task).
+            conditions: Дополнительные условия над tasks, например
+                ключ страницы (по умол. None).
+            parameters: Параметры дополнительных условий (по умол. None).
+            limit: Наибольшее количество строк (по умол. None - все).
+
+        Returns:
+            Текст запроса и его параметры.
+        """
+        keys: list[tuple[str, str]] = self.sort_keys()
+        ranked: bool = any(field == "rank" for field, _ in keys)
+        weights: str = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        searching: bool = self.fts_query() is not None
+        outer: list[str] = list(conditions or ())
+        query_parameters: list = []
+
+        def source(table: str) -> str:
+            # CROSS JOIN закрепляет порядок соединения: сначала поиск по
+            # индексу FTS5, затем строки задач по rowid. Иначе SQLite
+            # может выбрать обход индекса фильтра и проверку MATCH для
+            # каждой строки.
+            fts: str = SOURCES[table][1]
+            if searching:
+                return (f"{fts} CROSS JOIN {table} "
+                        f"ON {table}.id = {fts}.rowid")
+            return table
+
+        if self.include_archive:
+            parts: list[str] = []
+            for table in SOURCES:
+                where_clause, table_parameters = self._conditions(table)
+                selected = ", ".join(
+                    f"{table}.{field}" for field in Task._fields)
+                if ranked:
+                    fts: str = SOURCES[table][1]
+                    selected += f", bm25({fts}, {weights}) AS rank"
+                part = f"SELECT {selected} FROM {source(table)}"
+                if where_clause:
+                    part += " WHERE " + " AND ".join(where_clause)
+                parts.append(part)
+                query_parameters.extend(table_parameters)
+            from_clause = f"({' UNION ALL '.join(parts)}) AS tasks"
+            rank: str = "rank"
+        else:
+            where_clause, query_parameters = self._conditions("tasks")
+            outer = where_clause + outer
+            from_clause = source("tasks")
+            rank = f"bm25(tasks_fts, {weights})"
+
+        if columns is None:
+            columns = ", ".join(f"tasks.{field}" for field in Task._fields)
+        query: str = f"SELECT {columns} FROM {from_clause}"
+        if outer:
+            query += " WHERE " + " AND ".join(outer)
+        if keys:
+            query += " ORDER BY " + ", ".join(
+                f"{rank if field == 'rank' else 'tasks.' + field} "
+                f"{SORT_ORDERS[order]}"
+                for field, order in keys)
+        query_parameters.extend(parameters or ())
+        if limit is not None:
+            query += " LIMIT ?"
+            query_parameters.append(limit)
+        return query, query_parameters
@@ -0,0 +1,325 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+from logic import get_upcoming_deadlines, subscribe, unsubscribe
+from models import Task, TaskEvent
+
+# Сколько ближайших дедлайнов загружается в очередь одним запросом.
+LOAD_LIMIT: int = 500
+
+# Как часто очередь перечитывается из БД, чтобы учесть изменения задач
+# из других процессов (с).
+RELOAD_INTERVAL: float = 300.0
+
+
+class ReminderQueue:
+    """Класс представляет собой очередь напоминаний о дедлайнах.
+
+    Куча упорядочена по дедлайну и id задачи. Задача с измененным
+    дедлайном добавляется в кучу заново, а прежняя запись остается и
+    пропускается при извлечении (ленивое удаление): актуальна только
+    запись с дедлайном задачи из словаря задач.
+
+    В очереди хранятся только загруженные страницы ближайших дедлайнов.
+    horizon - ключ (дедлайн, id) последней загруженной задачи, если в БД
+    есть более поздние (None - загружены все). Задачи за горизонтом
+    в очередь не добавляются: они придут со следующей страницей, когда
+    очередь опустеет (exhausted).
+    """
+
+    def __init__(self, lead: timedelta = timedelta(0)) -> None:
+        """Инициализация объекта ReminderQueue.
+
+        Args:
+            lead: За сколько до дедлайна напоминать (по умол. 0).
+        """
+        self.lead: timedelta = lead
+        self.horizon: tuple | None = None
+        self._heap: list[tuple[datetime, int]] = []
+        self._tasks: dict[int, Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def exhausted(self) -> bool:
+        """True, если очередь пуста, а в БД есть более поздние дедлайны."""
+        return not self._tasks and self.horizon is not None
+
+    def clear(self) -> None:
+        """Очищает очередь перед загрузкой первой страницы."""
+        self.horizon = None
+        self._heap = []
+        self._tasks = {}
+
+    def extend(self, tasks: list[Task], horizon: tuple | None) -> None:
+        """Добавляет загруженную страницу задач.
+
+        Args:
+            tasks: Задачи по возрастанию дедлайна.
+            horizon: Ключ следующей страницы (None - страница последняя).
+        """
+        for task in tasks:
+            self._put(task)
+        self.horizon = horizon
+
+    def apply(self, event: TaskEvent, now: datetime) -> None:
+        """Учитывает изменение задачи без обращения к БД.
+
+        Args:
+            event: Событие изменения задачи.
+            now: Текущее время: прошедшие дедлайны не добавляются.
+        """
+        task: Task = event.task
+        previous: Task | None = self._tasks.pop(task.id, None)
+        if (event.kind == TaskEvent.DELETED or task.status != "Open"
+                or task.deadline is None or task.deadline < now):
+            return
+        if (self.horizon is not None
+                and (task.deadline, task.id) > self.horizon):
+            return
+        if previous is not None and previous.deadline == task.deadline:
+            self._tasks[task.id] = task
+        else:
+            self._put(task)
+
+    def next_time(self) -> datetime | None:
+        """Время ближайшего напоминания (None - очередь пуста)."""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        return self._heap[0][0] - self.lead
+
+    def pop_due(self, now: datetime) -> list[Task]:
+        """Извлекает задачи, время напоминания которых наступило.
+
+        Args:
+            now: Текущее время.
+
+        Returns:
+            Задачи по возрастанию дедлайна.
+        """
+        due: list[Task] = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] - self.lead > now:
+                return due
+            _, task_id = heapq.heappop(self._heap)
+            due.append(self._tasks.pop(task_id))
+
+    def _put(self, task: Task) -> None:
+        self._tasks[task.id] = task
+        heapq.heappush(self._heap, (task.deadline, task.id))
+        # Устаревшие записи не копятся дольше, чем нужно: при избытке
+        # куча строится заново из актуальных задач.
+        if len(self._heap) > 2 * len(self._tasks) + 64:
+            self._heap = [(item.deadline, item.id)
+                          for item in self._tasks.values()]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap:
+            deadline, task_id = heap[0]
+            task = self._tasks.get(task_id)
+            if task is not None and task.deadline == deadline:
+                return
+            heapq.heappop(heap)
+
+
+class ReminderScheduler:
+    """Класс представляет собой планировщик напоминаний о дедлайнах.
+
+    Загружает ближайшие дедлайны незавершенных задач индексным запросом
+    (по limit задач) и обновляет очередь по событиям логического слоя,
+    не перечитывая БД. Изменения из других процессов учитываются
+    перечитыванием раз в reload_interval. Сам планировщик не ждет:
+    оболочка (ReminderThread или ReminderTimer в интерфейсе) вызывает
+    tick через wait_time секунд и заново, когда вызван on_change.
+    """
+
+    def __init__(self,
+                 on_due: Callable[[list[Task]], None],
+                 lead: timedelta = timedelta(0),
+                 limit: int = LOAD_LIMIT,
+                 reload_interval: float = RELOAD_INTERVAL,
+                 on_change: Callable[[], None] | None = None) -> None:
+        """Инициализация объекта ReminderScheduler.
+
+        Args:
+            on_due: Обработчик задач, время напоминания которых наступило.
+            lead: За сколько до дедлайна напоминать (по умол. 0).
+            limit: Размер загружаемой страницы (по умол. LOAD_LIMIT).
+            reload_interval: Период перечитывания из БД, с
+                (по умол. RELOAD_INTERVAL).
+            on_change: Вызывается при изменении очереди из любого потока
+                (по умол. None).
+        """
+        self.on_due = on_due
+        self.limit: int = limit
+        self.reload_interval: float = reload_interval
+        self.on_change = on_change
+        self.queue: ReminderQueue = ReminderQueue(lead)
+        self._lock = threading.Lock()
+        # Счетчик событий: страница, прочитанная до события, устарела.
+        self._changes: int = 0
+        # Нижняя граница дедлайнов в БД: о более ранних уже напомнили
+        # (или они прошли до запуска).
+        self._since: datetime = datetime.now()
+        self._reloaded: float = time.monotonic()
+
+    def start(self) -> None:
+        """Подписывается на события изменения задач и загружает очередь."""
+        subscribe(self._on_event)
+        self.reload()
+
+    def stop(self) -> None:
+        """Отписывается от событий изменения задач."""
+        unsubscribe(self._on_event)
+
+    def reload(self) -> None:
+        """Перечитывает очередь с первой страницы ближайших дедлайнов."""
+        while True:
+            with self._lock:
+                changes: int = self._changes
+                since: datetime = self._since
+            tasks, horizon = get_upcoming_deadlines(since, self.limit)
+            with self._lock:
+                if changes == self._changes:
+                    self.queue.clear()
+                    self.queue.extend(tasks, horizon)
+                    self._reloaded = time.monotonic()
+                    break
+        self._changed()
+
+    def tick(self) -> list[Task]:
+        """Перечитывает очередь, если подошел срок, и передает on_due
+           задачи, время напоминания которых наступило.
+
+        Returns:
+            Задачи, о которых напомнили.
+        """
+        if time.monotonic() - self._reloaded >= self.reload_interval:
+            self.reload()
+        now: datetime = datetime.now()
+        with self._lock:
+            due: list[Task] = self.queue.pop_due(now)
+        while self._load_next_page():
+            with self._lock:
+                due.extend(self.queue.pop_due(now))
+        # Дедлайны хранятся с точностью до секунды: все дедлайны не позже
+        # now + lead уже напомнены, следующий возможный - через секунду.
+        handled: datetime = ((now + self.queue.lead).replace(microsecond=0)
+                             + timedelta(seconds=1))
+        with self._lock:
+            self._since = max(self._since, handled)
+        if due:
+            self.on_due(due)
+        return due
+
+    def next_time(self) -> datetime | None:
+        """Время ближайшего напоминания (None - напоминаний нет)."""
+        with self._lock:
+            return self.queue.next_time()
+
+    def wait_time(self) -> float:
+        """Через сколько секунд нужно вызвать tick."""
+        timeout: float = (self.reload_interval
+                          - (time.monotonic() - self._reloaded))
+        next_time = self.next_time()
+        if next_time is not None:
+            timeout = min(timeout,
+                          (next_time - datetime.now()).total_seconds())
+        return max(timeout, 0.0)
+
+    def _load_next_page(self) -> bool:
+        """Загружает следующую страницу, если очередь опустела.
+
+        Returns:
+            True, если страница загружена.
+        """
+        while True:
+            with self._lock:
+                if not self.queue.exhausted:
+                    return False
+                changes: int = self._changes
+                horizon: tuple = self.queue.horizon
+            tasks, next_horizon = get_upcoming_deadlines(
+                self._since, self.limit, horizon)
+            with self._lock:
+                if (changes == self._changes
+                        and self.queue.horizon == horizon):
+                    self.queue.extend(tasks, next_horizon)
+                    return True
+
+    def _on_event(self, event: TaskEvent) -> None:
+        with self._lock:
+            self._changes += 1
+            self.queue.apply(event, datetime.now())
+        self._changed()
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+
+class ReminderThread(ReminderScheduler):
+    """Планировщик напоминаний в фоновом потоке (без интерфейса).
+
+    Поток загружает очередь, спит до ближайшего напоминания и
+    просыпается раньше, если очередь изменилась. Все запросы к БД и
+    on_due выполняются в этом потоке.
+    """
+
+    def __init__(self,
+                 on_due: Callable[[list[Task]], None],
+                 lead: timedelta = timedelta(0),
+                 limit: int = LOAD_LIMIT,
+                 reload_interval: float = RELOAD_INTERVAL) -> None:
+        """Инициализация объекта ReminderThread.
+
+        Args:
+            on_due: Обработчик задач, время напоминания которых наступило.
+            lead: За сколько до дедлайна напоминать (по умол. 0).
+            limit: Размер загружаемой страницы (по умол. LOAD_LIMIT).
+            reload_interval: Период перечитывания из БД, с
+                (по умол. RELOAD_INTERVAL).
+        """
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        super().__init__(on_due, lead, limit, reload_interval,
+                         self._wakeup.set)
+
+    def start(self) -> None:
+        """Запускает поток; очередь загружается уже в нем, поэтому
+           вызывающий поток (например, поток GUI) не ждет БД."""
+        subscribe(self._on_event)
+        self._thread = threading.Thread(target=self._run,
+                                        name="reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает поток и дожидается его завершения."""
+        super().stop()
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def join(self, timeout: float | None = None) -> None:
+        """Ожидает завершения потока."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        self.reload()
+        while not self._stopped.is_set():
+            self.tick()
+            # Сигнал, пришедший после clear, не теряется: очередь уже
+            # изменена, и wait_time ее учитывает.
+            self._wakeup.clear()
+            self._wakeup.wait(self.wait_time())
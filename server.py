@@ -0,0 +1,643 @@
+"""Локальный HTTP/JSON API над логическим слоем.
+
+Примеры:
+    python server.py --port 8080
+    curl "http://127.0.0.1:8080/tasks?sort_field=deadline&limit=50"
+    curl "http://127.0.0.1:8080/search?q=отчет&priority=High"
+    curl -X POST -d '{"title": "Отчет", "priority": "High"}' \\
+        http://127.0.0.1:8080/tasks
+
+Маршруты:
+    GET   /tasks                  страница задач (limit, page_token)
+    GET   /tasks/stream           все задачи одним потоковым JSON-массивом
+    GET   /search?q=...           поиск (по релевантности или sort_field)
+    GET   /tasks/{id}             задача по id
+    POST  /tasks                  добавить задачу
+    PATCH /tasks/{id}             изменить задачу
+    POST  /tasks/{id}/complete    завершить задачу
+    GET   /changes?since=N        изменения после записи N журнала
+
+Фильтры списков: sort_field, sort_order, priority, status, tag, any_tag
+(повторяются), due_after, due_before (ISO), search, archive=1.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, suppress
+from datetime import datetime
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+import logic
+from query import SORT_FIELDS, TaskQuery
+from transfer import validate_record
+
+HOST: str = "127.0.0.1"
+PORT: int = 8080
+
+# Потоков для запросов к БД и сколько запросов на поток может ждать
+# в очереди: остальные ждут в цикле событий, не занимая память пула.
+WORKERS: int = 4
+PENDING_PER_WORKER: int = 4
+
+MAX_HEADER_SIZE: int = 64 * 1024
+MAX_BODY_SIZE: int = 1024 * 1024
+MAX_PAGE_SIZE: int = 1000
+
+# Задач в одном фрагменте потоковой выдачи и фрагментов, которые
+# поток чтения может опередить отправку клиенту.
+STREAM_BATCH: int = 500
+STREAM_QUEUE: int = 4
+
+PRIORITIES: tuple[str, ...] = ("Low", "Medium", "High")
+# Приоритет новой задачи, если он не указан (как в CLI).
+DEFAULT_PRIORITY: str = "Low"
+STATUSES: tuple[str, ...] = ("Open", "Completed")
+UPDATE_FIELDS: tuple[str, ...] = (
+    "title", "description", "priority", "deadline", "tags")
+
+REASONS: dict[int, str] = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """Ошибка запроса, которая возвращается клиенту с кодом status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status: int = status
+
+
+class Request:
+    """Класс представляет собой разобранный HTTP-запрос."""
+
+    def __init__(self,
+                 method: str,
+                 path: str,
+                 params: dict[str, list[str]],
+                 body: bytes) -> None:
+        """Инициализация объекта Request.
+
+        Args:
+            method: Метод (GET, POST, ...).
+            path: Путь без строки запроса.
+            params: Параметры строки запроса.
+            body: Тело запроса.
+        """
+        self.method = method
+        self.path = path
+        self.params = params
+        self.body = body
+
+    def param(self, name: str, default: str | None = None) -> str | None:
+        """Последнее значение параметра строки запроса."""
+        values = self.params.get(name)
+        return values[-1] if values else default
+
+    def flag(self, name: str) -> bool:
+        """Параметр-флаг: 1, true или yes."""
+        return (self.param(name) or "").lower() in ("1", "true", "yes")
+
+    def json(self) -> dict:
+        """Тело запроса как JSON-объект."""
+        try:
+            record = json.loads(self.body or b"{}")
+        except ValueError as e:
+            raise HttpError(400, f"Некорректный JSON: {e}") from None
+        if not isinstance(record, dict):
+            raise HttpError(400, "Тело запроса должно быть JSON-объектом.")
+        return record
+
+
+def json_default(value: Any) -> Any:
+    """Сериализует даты для json.dumps."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    raise TypeError(f"{type(value).__name__} не сериализуется в JSON")
+
+
+def dump_tasks(tasks) -> str:
+    """Задачи как элементы JSON-массива через запятую."""
+    return ",".join(json.dumps(task._asdict(), ensure_ascii=False,
+                               default=json_default) for task in tasks)
+
+
+def parse_datetime(request: Request, name: str) -> datetime | None:
+    """Параметр-дата в формате ISO."""
+    value = request.param(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HttpError(400, f"Некорректная дата {name}: {value}") from None
+
+
+def choices(request: Request, name: str, allowed: tuple[str, ...]
+            ) -> list[str]:
+    """Значения повторяющегося параметра из допустимого набора."""
+    values = request.params.get(name, [])
+    for value in values:
+        if value not in allowed:
+            raise HttpError(400, f"Недопустимое значение {name}: {value}")
+    return values
+
+
+def build_query(request: Request) -> TaskQuery:
+    """Строит составной запрос из параметров строки запроса."""
+    sort_field = request.param("sort_field")
+    if sort_field is not None and sort_field not in SORT_FIELDS:
+        raise HttpError(400, f"Недопустимое поле сортировки: {sort_field}")
+    sort_order = request.param("sort_order", "ascending")
+    if sort_order not in ("ascending", "descending"):
+        raise HttpError(400, f"Недопустимый порядок: {sort_order}")
+    query = TaskQuery.create(sort_field, sort_order, None,
+                             request.params.get("tag"),
+                             request.params.get("any_tag"),
+                             request.flag("archive"))
+    priorities = choices(request, "priority", PRIORITIES)
+    if priorities:
+        query = query.where_priority(*priorities)
+    statuses = choices(request, "status", STATUSES)
+    if statuses:
+        query = query.where_status(*statuses)
+    due_after = parse_datetime(request, "due_after")
+    due_before = parse_datetime(request, "due_before")
+    if due_after or due_before:
+        query = query.where_deadline(due_after, due_before)
+    return query.where_text(request.param("search"))
+
+
+def parse_limit(request: Request) -> int:
+    """Размер страницы (1..MAX_PAGE_SIZE, по умол. PAGE_SIZE)."""
+    value = request.param("limit")
+    if value is None:
+        return logic.PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HttpError(400, f"limit должен быть от 1 до {MAX_PAGE_SIZE}.")
+    return limit
+
+
+def existing_task(request: Request, task_id: int):
+    """Задача по id или ошибка 404."""
+    task = logic.get_task_by_id(task_id, request.flag("archive"))
+    if task is None:
+        raise HttpError(404, f"Задача {task_id} не найдена.")
+    return task
+
+
+def list_tasks(request: Request) -> tuple[int, dict]:
+    """GET /tasks: страница задач с токеном следующей страницы."""
+    query = build_query(request)
+    if not query.sort:
+        query = query.order_by("id", request.param("sort_order",
+                                                   "ascending"))
+    try:
+        tasks, page_token = logic.find_tasks_page(
+            query, parse_limit(request), request.param("page_token"))
+    except ValueError as e:
+        raise HttpError(400, str(e)) from None
+    return 200, {"tasks": tasks, "next_page_token": page_token}
+
+
+def search_tasks(request: Request) -> tuple[int, dict]:
+    """GET /search: задачи, найденные полнотекстовым поиском."""
+    search_criteria = request.param("q")
+    if not search_criteria:
+        raise HttpError(400, "Не указана строка поиска q.")
+    query = build_query(request).where_text(search_criteria)
+    return 200, {"tasks": logic.find_tasks(query)}
+
+
+def list_changes(request: Request) -> tuple[int, dict]:
+    """GET /changes: изменения после записи since журнала изменений и
+       номер для следующего запроса."""
+    try:
+        since = int(request.param("since", "0"))
+    except ValueError:
+        since = -1
+    if since < 0:
+        raise HttpError(400, "since должен быть неотрицательным числом.")
+    changes, next_since = logic.get_changes_since(since,
+                                                  parse_limit(request))
+    records: list[dict] = []
+    for change in changes:
+        record = change._asdict()
+        if change.task is not None:
+            record["task"] = change.task._asdict()
+        records.append(record)
+    return 200, {"changes": records, "next_since": next_since}
+
+
+def get_task(request: Request, task_id: int) -> tuple[int, Any]:
+    """GET /tasks/{id}."""
+    return 200, existing_task(request, task_id)
+
+
+def add_task(request: Request) -> tuple[int, Any]:
+    """POST /tasks: добавляет задачу (поля как при импорте, приоритет
+       по умол. DEFAULT_PRIORITY)."""
+    record = request.json()
+    record.setdefault("priority", DEFAULT_PRIORITY)
+    try:
+        title, description, priority, deadline, tags = validate_record(
+            record)
+    except ValueError as e:
+        raise HttpError(400, str(e)) from None
+    task_id = logic.add_new_task(title, description, priority, deadline,
+                                 tags)
+    if task_id is None:
+        raise HttpError(500, "Ошибка при добавлении задачи.")
+    return 201, logic.get_task_by_id(task_id)
+
+
+def update_task(request: Request, task_id: int) -> tuple[int, Any]:
+    """PATCH /tasks/{id}: изменяет переданные поля задачи."""
+    record = request.json()
+    unknown = set(record) - set(UPDATE_FIELDS)
+    if unknown:
+        raise HttpError(400, f"Неизвестные поля: {', '.join(sorted(unknown))}")
+    for field, value in record.items():
+        if not isinstance(value, str):
+            raise HttpError(400, f"Поле {field} должно быть строкой.")
+    if "priority" in record and record["priority"] not in PRIORITIES:
+        raise HttpError(400, f"Недопустимый приоритет: {record['priority']}")
+    if record.get("title") == "":
+        raise HttpError(400, "Заголовок не может быть пустым.")
+    if "deadline" in record:
+        try:
+            record["deadline"] = datetime.fromisoformat(record["deadline"])
+        except ValueError:
+            raise HttpError(
+                400, f"Некорректный дедлайн: {record['deadline']}") from None
+    existing_task(request, task_id)
+    if not logic.update_task(task_id, **record):
+        raise HttpError(500, "Ошибка обновления задачи.")
+    return 200, logic.get_task_by_id(task_id)
+
+
+def complete_task(request: Request, task_id: int) -> tuple[int, Any]:
+    """POST /tasks/{id}/complete: завершает задачу (completed_at -
+       необязательная дата завершения)."""
+    completed_at = request.json().get("completed_at")
+    if completed_at is not None:
+        try:
+            completed_at = datetime.fromisoformat(completed_at)
+        except (TypeError, ValueError):
+            raise HttpError(
+                400, f"Некорректная дата завершения: {completed_at}") from None
+    existing_task(request, task_id)
+    if not logic.complete_task(task_id, completed_at):
+        raise HttpError(500, "Ошибка завершения задачи.")
+    return 200, logic.get_task_by_id(task_id)
+
+
+# Маршруты: метод, шаблон пути, обработчик. Группы шаблона передаются
+# обработчику как целые числа. Обработчик None - потоковая выдача.
+ROUTES: tuple[tuple[str, re.Pattern, Callable | None], ...] = (
+    ("GET", re.compile(r"/tasks"), list_tasks),
+    ("POST", re.compile(r"/tasks"), add_task),
+    ("GET", re.compile(r"/tasks/stream"), None),
+    ("GET", re.compile(r"/search"), search_tasks),
+    ("GET", re.compile(r"/tasks/(\d+)"), get_task),
+    ("PATCH", re.compile(r"/tasks/(\d+)"), update_task),
+    ("POST", re.compile(r"/tasks/(\d+)/complete"), complete_task),
+    ("GET", re.compile(r"/changes"), list_changes),
+)
+
+
+def route(request: Request) -> tuple[Callable | None, tuple[int, ...]]:
+    """Находит обработчик запроса.
+
+    Returns:
+        Обработчик и аргументы из пути.
+
+    Raises:
+        HttpError: 404 для неизвестного пути, 405 для неверного метода.
+    """
+    path_found: bool = False
+    for method, pattern, handler in ROUTES:
+        match = pattern.fullmatch(request.path)
+        if match is None:
+            continue
+        path_found = True
+        if method == request.method:
+            return handler, tuple(int(group) for group in match.groups())
+    if path_found:
+        raise HttpError(405, f"Метод {request.method} не поддерживается.")
+    raise HttpError(404, f"Путь не найден: {request.path}")
+
+
+def respond(handler: Callable, request: Request, *args: int
+            ) -> tuple[int, bytes]:
+    """Выполняет обработчик и сериализует ответ (в потоке пула, чтобы
+       не занимать цикл событий)."""
+    status, payload = handler(request, *args)
+    if hasattr(payload, "_asdict"):
+        payload = payload._asdict()
+    elif isinstance(payload, dict) and "tasks" in payload:
+        payload = {**payload, "tasks": [task._asdict()
+                                        for task in payload["tasks"]]}
+    return status, json.dumps(payload, ensure_ascii=False,
+                              default=json_default).encode()
+
+
+def head(status: int, headers: dict[str, str]) -> bytes:
+    """Строка статуса и заголовки ответа."""
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class TaskApiServer:
+    """Класс представляет собой HTTP-сервер API задач на asyncio.
+
+    Соединения и разбор HTTP обслуживает цикл событий, а вызовы
+    логического слоя выполняются в пуле из workers потоков, каждый со
+    своим соединением общего пула БД. Очередь пула ограничена: если
+    заняты все места, запросы ждут в цикле событий. Поддерживаются
+    постоянные соединения HTTP/1.1 (keep-alive).
+    """
+
+    def __init__(self,
+                 host: str = HOST,
+                 port: int = PORT,
+                 workers: int = WORKERS) -> None:
+        """Инициализация объекта TaskApiServer.
+
+        Args:
+            host: Адрес (по умол. HOST).
+            port: Порт, 0 - любой свободный (по умол. PORT).
+            workers: Потоков для запросов к БД (по умол. WORKERS).
+        """
+        self.host: str = host
+        self.port: int = port
+        self.executor = ThreadPoolExecutor(workers,
+                                           thread_name_prefix="api")
+        self._slots = asyncio.Semaphore(workers * PENDING_PER_WORKER)
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        """Начинает принимать соединения (port обновляется, если был 0)."""
+        self._server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port,
+            limit=MAX_HEADER_SIZE)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Обслуживает соединения до отмены."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self) -> None:
+        """Закрывает сервер и пул потоков."""
+        if self._server is not None:
+            self._server.close()
+        self.executor.shutdown(wait=True)
+
+    async def call(self, fn: Callable, *args: Any) -> Any:
+        """Выполняет fn(*args) в пуле потоков, ожидая свободного места."""
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, fn, *args)
+
+    async def handle_connection(self,
+                                reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Обслуживает запросы одного соединения."""
+        try:
+            keep_alive: bool = True
+            while keep_alive:
+                request, keep_alive = await self.read_request(reader, writer)
+                if request is None:
+                    break
+                await self.dispatch(request, writer, keep_alive)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def read_request(self,
+                           reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter
+                           ) -> tuple[Request | None, bool]:
+        """Читает запрос соединения.
+
+        Returns:
+            Запрос (None - соединение закрыто или запрос отклонен) и
+            признак постоянного соединения.
+        """
+        try:
+            header = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None, False
+        except asyncio.LimitOverrunError:
+            await self.send_error(writer, 431, "Слишком большой заголовок.",
+                                  False)
+            return None, False
+        request_line, *header_lines = (
+            header.decode("latin-1").rstrip("\r\n").split("\r\n"))
+        headers: dict[str, str] = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            method, target, version = request_line.split(" ")
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            await self.send_error(writer, 400, "Некорректный запрос.", False)
+            return None, False
+        if "transfer-encoding" in headers or length < 0:
+            await self.send_error(writer, 400,
+                                  "Нужен заголовок Content-Length.", False)
+            return None, False
+        if length > MAX_BODY_SIZE:
+            await self.send_error(writer, 413, "Слишком большое тело.", False)
+            return None, False
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = (connection == "keep-alive" if version == "HTTP/1.0"
+                      else connection != "close")
+        url = urlsplit(target)
+        request = Request(method, url.path, parse_qs(url.query), body)
+        return request, keep_alive
+
+    async def dispatch(self,
+                       request: Request,
+                       writer: asyncio.StreamWriter,
+                       keep_alive: bool) -> None:
+        """Выполняет запрос и отправляет ответ."""
+        try:
+            handler, args = route(request)
+            if handler is None:
+                await self.stream_tasks(request, writer, keep_alive)
+                return
+            status, body = await self.call(respond, handler, request, *args)
+        except HttpError as e:
+            await self.send_error(writer, e.status, str(e), keep_alive)
+            return
+        except ConnectionError:
+            # Клиент отключился или потоковый ответ оборван.
+            raise
+        except Exception as e:
+            print(f"Ошибка обработки запроса {request.method} "
+                  f"{request.path}: {e}", file=sys.stderr)
+            await self.send_error(writer, 500, "Внутренняя ошибка сервера.",
+                                  keep_alive)
+            return
+        await self.send(writer, status, body, keep_alive)
+
+    async def send(self,
+                   writer: asyncio.StreamWriter,
+                   status: int,
+                   body: bytes,
+                   keep_alive: bool) -> None:
+        """Отправляет ответ JSON."""
+        writer.write(head(status, {
+            "Content-Type": "application/json; charset=utf-8",
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+        }) + body)
+        await writer.drain()
+
+    async def send_error(self,
+                         writer: asyncio.StreamWriter,
+                         status: int,
+                         message: str,
+                         keep_alive: bool) -> None:
+        """Отправляет ошибку в виде {"error": сообщение}."""
+        body = json.dumps({"error": message}, ensure_ascii=False).encode()
+        await self.send(writer, status, body, keep_alive)
+
+    async def stream_tasks(self,
+                           request: Request,
+                           writer: asyncio.StreamWriter,
+                           keep_alive: bool) -> None:
+        """GET /tasks/stream: все задачи запроса одним JSON-массивом.
+
+        Поток пула читает курсор фрагментами по STREAM_BATCH задач и
+        передает их через ограниченную очередь, поэтому в памяти
+        находятся только несколько фрагментов, а медленный клиент
+        притормаживает чтение. Ответ отправляется с
+        Transfer-Encoding: chunked.
+        """
+        query = build_query(request)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue(STREAM_QUEUE)
+        stopped = threading.Event()
+
+        def put(item: bytes | Exception | None) -> None:
+            asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+        def produce() -> None:
+            try:
+                prefix: str = "["
+                batch: list = []
+                with closing(logic.iter_tasks(query, STREAM_BATCH)) as tasks:
+                    for task in tasks:
+                        batch.append(task)
+                        if len(batch) < STREAM_BATCH:
+                            continue
+                        put((prefix + dump_tasks(batch)).encode())
+                        prefix, batch = ",", []
+                        if stopped.is_set():
+                            return
+                put((prefix + dump_tasks(batch) + "]").encode()
+                    if batch or prefix == "[" else b"]")
+            except Exception as e:
+                put(e)
+            finally:
+                put(None)
+
+        async with self._slots:
+            producer = loop.run_in_executor(self.executor, produce)
+            item = await chunks.get()
+            finished: bool = item is None
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                writer.write(head(200, {
+                    "Content-Type": "application/json; charset=utf-8",
+                    "Transfer-Encoding": "chunked",
+                    "Connection": "keep-alive" if keep_alive else "close",
+                }))
+                while not finished:
+                    writer.write(b"%x\r\n%s\r\n" % (len(item), item))
+                    await writer.drain()
+                    item = await chunks.get()
+                    finished = item is None
+                    if isinstance(item, Exception):
+                        # Заголовок уже отправлен: клиент увидит
+                        # оборванный ответ.
+                        raise ConnectionAbortedError(str(item))
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            finally:
+                # Поток чтения не должен остаться ждать места в очереди.
+                stopped.set()
+                while not finished:
+                    finished = await chunks.get() is None
+                await producer
+
+
+async def serve(host: str, port: int, workers: int) -> None:
+    """Запускает сервер и обслуживает соединения до отмены."""
+    server = TaskApiServer(host, port, workers)
+    await server.start()
+    print(f"Сервер API: http://{server.host}:{server.port}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        server.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создает парсер аргументов командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT,
+                        help="порт, 0 - любой свободный (по умол. 8080)")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="потоков для запросов к БД (по умол. 4)")
+    parser.add_argument("--db", default=None,
+                        help="файл БД (по умол. graduation_project.sqlite)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа сервера."""
+    args = build_parser().parse_args(argv)
+    if args.db is None:
+        logic.init_db()
+    else:
+        logic.init_db(args.db)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logic.close_db()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import re
+import sqlite3
+from typing import Iterable
+
+TAG_SEPARATORS = re.compile(r"[,;]")
+
+
+def parse_tags(tags: str | None) -> list[str]:
+    """Разбирает строку тэгов задачи ("работа, срочно") в список
+       нормализованных имен без повторов.
+
+    Args:
+        tags: Строка тэгов.
+
+    Returns:
+        Список имен тэгов в нижнем регистре.
+    """
+    if not tags:
+        return []
+    names: list[str] = []
+    for part in TAG_SEPARATORS.split(tags):
+        name = normalize_tag(part)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def normalize_tag(name: str) -> str:
+    """Приводит имя тэга к виду, в котором оно хранится в таблице tags."""
+    return " ".join(name.split()).lower()
+
+
+def replace_task_tags(cursor: sqlite3.Cursor,
+                      items: Iterable[tuple[int, str | None]]) -> None:
+    """Заменяет связи задач с тэгами в таблице task_tags по строкам тэгов.
+
+    Args:
+        cursor: Курсор (изменения не фиксируются).
+        items: Пары (id задачи, строка тэгов).
+    """
+    tag_ids: dict[str, int] = {}
+    for task_id, tags in items:
+        cursor.execute("DELETE FROM task_tags WHERE task_id = ?", (task_id,))
+        for name in parse_tags(tags):
+            tag_id = tag_ids.get(name)
+            if tag_id is None:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,))
+                cursor.execute("SELECT id FROM tags WHERE name = ?", (name,))
+                tag_id = tag_ids[name] = cursor.fetchone()[0]
+            cursor.execute(
+                "INSERT INTO task_tags (task_id, tag_id) VALUES (?, ?)",
+                (task_id, tag_id))
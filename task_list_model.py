@@ -0,0 +1,247 @@
+from typing import Callable
+from PyQt6.QtCore import (QAbstractListModel, QModelIndex, QObject, Qt,
+                          pyqtSignal)
+from logic import PAGE_SIZE
+from models import Task, TaskEvent, encode_field
+from workers import DataLoader
+
+# Загрузчик страницы: (размер страницы, токен) -> (задачи, следующий токен).
+PageFetcher = Callable[[int, str | None], tuple[list[Task], str | None]]
+
+
+def format_task(task: Task) -> str:
+    """Возвращает текст элемента списка для задачи."""
+    return f"""Title: {task.title}
+Status: {task.status}
+Priority: {task.priority}
+Tags: {task.tags if task.tags else "N/A"}"""
+
+
+class TaskListModel(QAbstractListModel):
+    """Модель списка задач (наследуется от QAbstractListModel).
+
+    Задачи подгружаются страницами по мере прокрутки (canFetchMore /
+    fetchMore), а текст элемента формируется только тогда, когда
+    представление запрашивает видимую строку. Если задан DataLoader,
+    страницы загружаются в фоновом потоке, а смена источника отменяет
+    незавершенную загрузку. События изменения задач применяются к одной
+    строке (apply_event) без перезагрузки списка.
+    """
+
+    CHANNEL: str = "task_list"
+
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self,
+                 parent: QObject | None = None,
+                 loader: DataLoader | None = None) -> None:
+        super().__init__(parent)
+        self.page_size: int = PAGE_SIZE
+        self._loader: DataLoader | None = loader
+        self._tasks: list[Task] = []
+        self._ids: set[int] = set()
+        self._fetcher: PageFetcher | None = None
+        self._page_token: str | None = None
+        self._has_more: bool = False
+        self._loading: bool = False
+        self._sort_field: str | None = None
+        self._ascending: bool = True
+        self._ordered: bool = False
+        self._task_filter: Callable[[Task], bool] | None = None
+
+    def set_fetcher(self,
+                    fetcher: PageFetcher | None,
+                    sort_field: str | None = None,
+                    sort_order: str | None = None,
+                    task_filter: Callable[[Task], bool] | None = None,
+                    ordered: bool = True) -> None:
+        """Сбрасывает модель и задает новый источник страниц.
+
+        Параметры сортировки и фильтра должны совпадать с теми, что
+        использует fetcher: по ним apply_event находит место строки.
+
+        Args:
+            fetcher: Загрузчик страниц (None - пустой список).
+            sort_field: Поле сортировки (по умол. None - по id).
+            sort_order: "ascending" или "descending" (по умол. None).
+            task_filter: Условие попадания задачи в список
+                (по умол. None - любая задача).
+            ordered: False, если порядок не определяется полем
+                (например, по релевантности поиска); тогда новые задачи
+                не добавляются, а измененные остаются на месте.
+        """
+        if self._loader is not None:
+            self._loader.cancel(self.CHANNEL)
+        self.beginResetModel()
+        self._tasks = []
+        self._ids = set()
+        self._fetcher = fetcher
+        self._page_token = None
+        self._has_more = fetcher is not None
+        self._loading = False
+        self._sort_field = sort_field
+        self._ascending = sort_order == "ascending"
+        self._ordered = ordered
+        self._task_filter = task_filter
+        self.endResetModel()
+
+    def set_tasks(self, tasks: list[Task]) -> None:
+        """Заполняет модель готовым списком задач."""
+        self.set_fetcher(lambda limit, page_token: (tasks, None),
+                         ordered=False)
+
+    def task(self, index: QModelIndex) -> Task | None:
+        """Возвращает задачу строки index."""
+        if not index.isValid() or index.row() >= len(self._tasks):
+            return None
+        return self._tasks[index.row()]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def data(self,
+             index: QModelIndex,
+             role: int = Qt.ItemDataRole.DisplayRole) -> object:
+        task = self.task(index)
+        if task is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return format_task(task)
+        if role == Qt.ItemDataRole.UserRole:
+            return task.id
+        return None
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return (not parent.isValid() and self._has_more
+                and not self._loading)
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if not self.canFetchMore(parent):
+            return
+        if self._loader is None:
+            self._append_page(self._fetcher(
+                self.page_size, self._page_token))
+            return
+        self._loading = True
+        self._loader.submit(self.CHANNEL,
+                            self._fetcher,
+                            self.page_size,
+                            self._page_token,
+                            on_result=self._append_page,
+                            on_error=self._on_load_failed)
+
+    def _append_page(self,
+                     page: tuple[list[Task], str | None]) -> None:
+        """Добавляет загруженную страницу в конец списка."""
+        tasks, self._page_token = page
+        self._loading = False
+        self._has_more = self._page_token is not None
+        # Задача могла уже попасть в список через apply_event.
+        tasks = [task for task in tasks if task.id not in self._ids]
+        if not tasks:
+            return
+        first: int = len(self._tasks)
+        self.beginInsertRows(QModelIndex(), first, first + len(tasks) - 1)
+        self._tasks.extend(tasks)
+        self._ids.update(task.id for task in tasks)
+        self.endInsertRows()
+
+    def _on_load_failed(self, error: str) -> None:
+        """Обрабатывает ошибку фоновой загрузки страницы."""
+        self._loading = False
+        self._has_more = False
+        self.loadFailed.emit(error)
+
+    def apply_event(self, event: TaskEvent) -> None:
+        """Применяет событие изменения задачи к загруженным строкам.
+
+        Прежняя строка задачи удаляется, а новая вставляется в позицию,
+        соответствующую текущей сортировке. Если позиция находится за
+        последней загруженной строкой, задача будет получена со следующей
+        страницей. Строка удаленной задачи только убирается из списка.
+
+        Args:
+            event: Событие изменения задачи.
+        """
+        task: Task = event.task
+        row: int | None = self._row_of(task.id)
+        if not self._ordered and event.kind != TaskEvent.DELETED:
+            if row is not None:
+                self._tasks[row] = task
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+            return
+
+        if (row is not None and event.kind != TaskEvent.DELETED
+                and (self._task_filter is None or self._task_filter(task))
+                and self._fits_at(row, task)):
+            # Позиция не изменилась: строка обновляется на месте, выделение
+            # в представлении сохраняется.
+            self._tasks[row] = task
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return
+
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._tasks[row]
+            self._ids.discard(task.id)
+            self.endRemoveRows()
+
+        if event.kind == TaskEvent.DELETED:
+            return
+        if self._task_filter is not None and not self._task_filter(task):
+            return
+        position: int = self._insert_position(task)
+        if position == len(self._tasks) and self._has_more:
+            return
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._tasks.insert(position, task)
+        self._ids.add(task.id)
+        self.endInsertRows()
+
+    def _row_of(self, task_id: int) -> int | None:
+        """Возвращает номер строки задачи среди загруженных."""
+        if task_id not in self._ids:
+            return None
+        for row, task in enumerate(self._tasks):
+            if task.id == task_id:
+                return row
+        return None
+
+    def _sort_key(self, task: Task) -> tuple:
+        """Ключ сортировки задачи в порядке SQLite (NULL меньше любого
+           значения, приоритет и статус сравниваются по кодам, id - второй
+           ключ)."""
+        if self._sort_field is None:
+            return (task.id,)
+        value = encode_field(self._sort_field,
+                             getattr(task, self._sort_field))
+        return (value is not None, value, task.id)
+
+    def _fits_at(self, row: int, task: Task) -> bool:
+        """Проверяет, что задача остается в порядке сортировки в строке
+           row (последняя строка при незагруженном продолжении списка
+           не подходит)."""
+        key: tuple = self._sort_key(task)
+        if row > 0:
+            before: tuple = self._sort_key(self._tasks[row - 1])
+            if not (before < key if self._ascending else before > key):
+                return False
+        if row + 1 < len(self._tasks):
+            after: tuple = self._sort_key(self._tasks[row + 1])
+            return key < after if self._ascending else key > after
+        return not self._has_more
+
+    def _insert_position(self, task: Task) -> int:
+        """Находит бинарным поиском позицию задачи в загруженных строках."""
+        key: tuple = self._sort_key(task)
+        low, high = 0, len(self._tasks)
+        while low < high:
+            middle: int = (low + high) // 2
+            middle_key: tuple = self._sort_key(self._tasks[middle])
+            if (middle_key < key if self._ascending else middle_key > key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
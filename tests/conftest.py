@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import sys
+from typing import Callable, Iterator
+import pytest
+
+# Модули проекта лежат в корне репозитория, а не в пакете.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from db import ConnectionPool, Database  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    """Путь к новой БД со схемой текущей версии."""
+    path = str(tmp_path / "tasks.sqlite")
+    pool = ConnectionPool(path)
+    pool.bootstrap()
+    pool.close_all()
+    return path
+
+
+@pytest.fixture
+def database(db_path: str) -> Iterator[Database]:
+    """Database поверх соединения пула с новой БД."""
+    pool = ConnectionPool(db_path)
+    with pool.session() as db:
+        yield db
+    pool.close_all()
+
+
+@pytest.fixture
+def logic_db(db_path: str) -> Iterator[str]:
+    """Логический слой (logic) поверх новой БД; возвращает путь к БД."""
+    import logic
+    logic.init_db(db_path)
+    yield db_path
+    logic.close_db()
+
+
+@pytest.fixture
+def old_db(tmp_path) -> Iterator[Callable[[int], sqlite3.Connection]]:
+    """Создает БД со схемой версии version (первые version миграций) и
+       возвращает соединение с ней (без конвертеров)."""
+    from migrations import MIGRATIONS
+    connections: list[sqlite3.Connection] = []
+
+    def create(version: int) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(tmp_path / "old.sqlite"),
+                               isolation_level=None)
+        connections.append(conn)
+        cursor = conn.cursor()
+        for number, migration in enumerate(MIGRATIONS[:version], 1):
+            cursor.execute("BEGIN")
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {number}")
+            cursor.execute("COMMIT")
+        return conn
+
+    yield create
+    for conn in connections:
+        conn.close()
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+import pytest
+import logic
+from db import Database
+from models import Task
+from query import TaskQuery
+
+NOW: datetime = datetime(2030, 6, 1, 12, 0)
+OLD: datetime = NOW - timedelta(days=90)
+
+
+@pytest.fixture
+def archived(database: Database) -> tuple[Database, dict[str, Task]]:
+    """Архивирует часть задач; возвращает БД и задачи до архивации по
+       названию."""
+    rows = [
+        ("Отчет за квартал", "сдан", "High", NOW - timedelta(days=100),
+         "work, finance", OLD),
+        ("Старый ремонт", "", "Low", None, "home", OLD),
+        ("Новый отчет", "", "Medium", NOW, "work", NOW - timedelta(days=1)),
+        ("Открытая задача", "отчет", "High", NOW, "work", None),
+    ]
+    for title, description, priority, deadline, tags, completed in rows:
+        task_id = database.add_task(title, description, priority, deadline,
+                                    tags)
+        if completed is not None:
+            assert database.update_task_status(task_id, "Completed",
+                                               completed)
+    before = {task.title: task for task in database.get_tasks()}
+    assert database.archive_completed(NOW - timedelta(days=30)) == 2
+    return database, before
+
+
+def test_archived_rows_leave_tasks(archived) -> None:
+    database, _ = archived
+    assert {task.title for task in database.get_tasks()} == {
+        "Новый отчет", "Открытая задача"}
+    assert database.conn.execute(
+        "SELECT COUNT(*) FROM tasks_archive").fetchone() == (2,)
+    assert database.archive_completed(NOW - timedelta(days=30)) == 0
+
+
+def test_converters_survive_archiving(archived) -> None:
+    database, before = archived
+    tasks = {task.title: task
+             for task in database.get_tasks(include_archive=True)}
+    assert tasks == before
+    report = tasks["Отчет за квартал"]
+    assert isinstance(report.deadline, datetime)
+    assert isinstance(report.created_at, datetime)
+    assert report.completed_at == OLD
+    assert (report.priority, report.status) == ("High", "Completed")
+    assert database.get_task_by_id(report.id) is None
+    assert database.get_task_by_id(report.id, include_archive=True) == report
+
+
+def test_fts_survives_archiving(archived) -> None:
+    database, _ = archived
+    assert {task.title for task in database.search_tasks("отчет")} == {
+        "Новый отчет", "Открытая задача"}
+    assert {task.title for task in database.search_tasks(
+        "отчет", include_archive=True)} == {
+        "Отчет за квартал", "Новый отчет", "Открытая задача"}
+    assert {task.title for task in database.search_tasks(
+        "Completed High finance", include_archive=True)} == {
+        "Отчет за квартал"}
+    # Заголовок весит больше описания и в объединении с архивом.
+    assert [task.title for task in database.search_tasks(
+        "отчет", include_archive=True)][-1] == "Открытая задача"
+
+
+def test_tags_survive_archiving(archived) -> None:
+    database, _ = archived
+    assert {task.title for task in database.get_tasks(
+        tags_all=["work"], include_archive=True)} == {
+        "Отчет за квартал", "Новый отчет", "Открытая задача"}
+    assert {task.title for task in database.get_tasks(
+        tags_all=["work", "finance"], include_archive=True)} == {
+        "Отчет за квартал"}
+    assert {task.title for task in database.get_tasks(
+        tags_any=["home", "finance"], include_archive=True)} == {
+        "Старый ремонт", "Отчет за квартал"}
+    assert database.get_tasks(tags_any=["home", "finance"]) == []
+    assert dict(database.get_tag_counts()) == {"work": 2}
+
+
+def test_union_read_path(archived) -> None:
+    database, before = archived
+    sql, parameters = TaskQuery().with_archive().where_priority(
+        "High").order_by("deadline", "ascending").compile()
+    assert sql.count(" UNION ALL ") == 1
+    assert parameters == [3, 3]
+    assert [task.title for task in database.query_tasks(
+        TaskQuery().with_archive().where_priority("High").order_by(
+            "deadline", "ascending"))] == [
+        "Отчет за квартал", "Открытая задача"]
+    assert [task.title for task in database.get_tasks(
+        "priority", "descending", include_archive=True)] == [
+        "Открытая задача", "Отчет за квартал", "Новый отчет",
+        "Старый ремонт"]
+
+    walked: list[int] = []
+    after = None
+    while True:
+        page, after = database.get_tasks_page(
+            "deadline", "ascending", limit=1, after=after,
+            include_archive=True)
+        walked.extend(task.id for task in page)
+        if after is None:
+            break
+    assert sorted(walked) == sorted(task.id for task in before.values())
+    assert len(walked) == len(before)
+
+    assert [task.title for task in database.get_tasks_completed_between(
+        include_archive=True)] == [
+        "Отчет за квартал", "Старый ремонт", "Новый отчет"]
+
+
+def test_archived_ids_are_not_reused(archived) -> None:
+    database, before = archived
+    task_id = database.add_task("Еще задача", "", "Low", None, None)
+    assert task_id > max(task.id for task in before.values())
+
+
+def test_logic_archive_invalidates_cache(logic_db: str) -> None:
+    task_id = logic.add_new_task("Задача", "", "Low", None, None)
+    logic.complete_task(task_id, NOW - timedelta(days=60))
+    assert [task.id for task in logic.get_all_tasks()] == [task_id]
+    assert logic.archive_completed(NOW) == 1
+    assert logic.get_all_tasks() == []
+    assert [task.id for task in logic.get_all_tasks(
+        include_archive=True)] == [task_id]
+    assert logic.search_tasks("Задача") == []
+    assert logic.archive_completed(NOW) == 0
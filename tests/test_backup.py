@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+import pytest
+import backup
+import logic
+from db import ConnectionPool
+from models import TaskEvent
+
+TABLES: tuple[str, ...] = ("tasks", "tasks_archive", *backup.RESTORED_TABLES)
+
+
+def rows(path: str, table: str) -> list[tuple]:
+    """Строки таблицы в хранимом виде (без конвертеров)."""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+    finally:
+        conn.close()
+
+
+def found_ids(term: str) -> set[int]:
+    return {task.id for task in logic.search_tasks(term)}
+
+
+def test_snapshot_under_concurrent_writes(db_path: str, tmp_path) -> None:
+    pool = ConnectionPool(db_path)
+    with pool.session() as db:
+        db.add_tasks_bulk([(f"seed {n}", "", "Low", None, "seed")
+                           for n in range(2000)])
+    pool.close_all()
+    stop = threading.Event()
+    written: list[int] = []
+
+    def write() -> None:
+        writer = ConnectionPool(db_path)
+        with writer.session() as db:
+            while not stop.is_set():
+                written.append(db.add_task("concurrent", "", "Low", None,
+                                           None))
+        writer.close_all()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        snapshot = backup.create_snapshot(db_path, str(tmp_path / "snap"),
+                                          pages=4, sleep=0.001)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert written and None not in written
+    assert backup.verify_snapshot(snapshot.path) == []
+    assert os.listdir(tmp_path / "snap") == [
+        os.path.basename(snapshot.path)]
+    ids = [row[0] for row in rows(snapshot.path, "tasks")]
+    # Снимок - согласованное состояние: задачи добавлялись по одной,
+    # поэтому в нем есть все задачи до некоторой.
+    assert ids == list(range(1, len(ids) + 1))
+    assert len(ids) >= 2000
+    conn = backup.open_snapshot(snapshot.path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    finally:
+        conn.close()
+
+
+def test_failed_check_leaves_no_snapshot(db_path: str, tmp_path,
+                                         monkeypatch) -> None:
+    monkeypatch.setattr(backup, "verify_snapshot", lambda path: ["bad"])
+    directory = tmp_path / "snap"
+    with pytest.raises(RuntimeError):
+        backup.create_snapshot(db_path, str(directory))
+    assert os.listdir(directory) == []
+
+
+def test_restore_round_trip(logic_db: str, tmp_path) -> None:
+    directory = str(tmp_path / "snap")
+    kept = logic.add_new_task("alpha report", "", "High", None, "work")
+    changed = logic.add_new_task("bravo meeting", "", "Low",
+                                 datetime(2030, 1, 1, 9, 30), "home")
+    removed = logic.add_new_task("charlie invoice", "", "Medium", None, None)
+    logic.complete_task(removed, datetime.now() - timedelta(days=60))
+    snapshot = logic.create_snapshot(directory)
+    expected = {table: rows(snapshot.path, table) for table in TABLES}
+
+    logic.update_task(changed, "delta review", "", "Medium", None, "ops")
+    logic.archive_completed()
+    added = logic.add_new_task("echo deploy", "", "Low", None, None)
+    logic.delete_tasks([kept])
+    since = logic.get_changes_since(0, 10000)[1]
+    events: list[TaskEvent] = []
+    logic.subscribe(events.append)
+    try:
+        logic.restore_snapshot(snapshot.path, directory)
+    finally:
+        logic.unsubscribe(events.append)
+
+    for table in TABLES:
+        assert rows(logic_db, table) == expected[table], table
+    assert found_ids("bravo") == {changed}
+    assert found_ids("alpha") == {kept}
+    assert found_ids("delta") == found_ids("echo") == set()
+    assert {task.id for task in logic.search_tasks(
+        "charlie", include_archive=False)} == {removed}
+
+    changes, _ = logic.get_changes_since(since, 10000)
+    assert all(change.seq > since for change in changes)
+    assert {change.task_id: change.operation for change in changes} == {
+        kept: "insert", changed: "update", removed: "insert",
+        added: "delete"}
+    assert {(event.kind, event.task.id) for event in events} == {
+        (TaskEvent.INSERTED, kept), (TaskEvent.UPDATED, changed),
+        (TaskEvent.INSERTED, removed), (TaskEvent.DELETED, added)}
+    # id удаленной восстановлением задачи не выдается повторно.
+    assert logic.add_new_task("foxtrot", "", "Low", None, None) > added
+    conn = sqlite3.connect(logic_db)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        conn.execute("INSERT INTO tasks_fts(tasks_fts) "
+                     "VALUES ('integrity-check')")
+    finally:
+        conn.close()
+
+
+def corrupt_header(path: str) -> None:
+    with open(path, "r+b") as file:
+        file.write(b"not a database".ljust(100, b"\0"))
+
+
+def corrupt_pages(path: str) -> None:
+    size = os.path.getsize(path)
+    with open(path, "r+b") as file:
+        for offset in range(4096, size, 4096):
+            file.seek(offset + 8)
+            file.write(b"\xff" * 64)
+
+
+@pytest.mark.parametrize("corrupt", [corrupt_header, corrupt_pages])
+def test_corrupt_snapshot_is_rejected(logic_db: str, tmp_path,
+                                      corrupt) -> None:
+    logic.add_new_task("alpha", "", "Low", None, "work")
+    snapshot = logic.create_snapshot(str(tmp_path / "snap"))
+    corrupt(snapshot.path)
+    assert backup.verify_snapshot(snapshot.path)
+    logic.add_new_task("bravo", "", "Low", None, None)
+    before = rows(logic_db, "tasks")
+    with pytest.raises(RuntimeError):
+        backup.restore_snapshot(snapshot.path, logic_db)
+    assert rows(logic_db, "tasks") == before
+
+
+def test_newer_snapshot_is_rejected(db_path: str, tmp_path) -> None:
+    snapshot = backup.create_snapshot(db_path, str(tmp_path / "snap"))
+    conn = sqlite3.connect(snapshot.path)
+    conn.execute("PRAGMA user_version = 999")
+    conn.close()
+    with pytest.raises(RuntimeError):
+        backup.restore_snapshot(snapshot.path, db_path)
+
+
+def test_prune_keeps_latest(db_path: str, tmp_path) -> None:
+    directory = str(tmp_path / "snap")
+    created = [backup.create_snapshot(db_path, directory) for _ in range(4)]
+    removed = backup.prune_snapshots(db_path, directory, keep=2)
+    assert [snapshot.path for snapshot in removed] == [
+        snapshot.path for snapshot in created[:2]]
+    assert backup.list_snapshots(db_path, directory) == created[2:]
+    with pytest.raises(ValueError):
+        backup.prune_snapshots(db_path, directory, keep=0)
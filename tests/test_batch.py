@@ -0,0 +1,95 @@
+import sqlite3
+from datetime import datetime
+import pytest
+from db import MAX_IN_PARAMETERS, Database
+
+# Больше задач, чем помещается в один список IN (...).
+COUNT: int = MAX_IN_PARAMETERS * 2 + 37
+
+
+@pytest.fixture
+def batch_db(database: Database) -> Database:
+    """БД с COUNT задачами (id 1..COUNT) и лимитом параметров, при
+       котором запрос без разбиения на порции завершился бы ошибкой."""
+    assert database.add_tasks_bulk(
+        (f"task {n}", "", ("Low", "High")[n % 2], None,
+         "even" if n % 2 == 0 else "odd")
+        for n in range(1, COUNT + 1)) == COUNT
+    database.conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER,
+                           MAX_IN_PARAMETERS + 10)
+    return database
+
+
+def count(database: Database, condition: str, parameters=()) -> int:
+    return database.conn.execute(
+        f"SELECT COUNT(*) FROM tasks WHERE {condition}",
+        parameters).fetchone()[0]
+
+
+def requested_ids() -> list[int]:
+    """Все существующие id, повторы и отсутствующие id."""
+    return [*range(1, COUNT + 1), 5, 7, 0, -1, COUNT + 1, COUNT + 1000]
+
+
+def test_update_status_reports_every_id(batch_db: Database) -> None:
+    when = datetime(2030, 5, 1, 9, 30)
+    outcomes = batch_db.update_tasks_status(requested_ids(), "Completed",
+                                            when)
+    assert list(outcomes) == [*range(1, COUNT + 1), 0, -1, COUNT + 1,
+                              COUNT + 1000]
+    assert all(outcomes[task_id] for task_id in range(1, COUNT + 1))
+    assert not any(outcomes[task_id]
+                   for task_id in (0, -1, COUNT + 1, COUNT + 1000))
+    assert count(batch_db, "status = 1 AND completed_at = ?",
+                 (when,)) == COUNT
+
+
+def test_update_tasks_reports_filtered_ids(batch_db: Database) -> None:
+    outcomes = batch_db.update_tasks(
+        requested_ids(), description="batch", tags="moved",
+        priority_filter="High", tags_any=["odd"])
+    high = {task_id for task_id in range(1, COUNT + 1) if task_id % 2}
+    assert {task_id for task_id, ok in outcomes.items() if ok} == high
+    assert len(outcomes) == COUNT + 4
+    assert count(batch_db, "description = 'batch'") == len(high)
+    assert count(batch_db, "tags = 'moved'") == len(high)
+    assert {task.id for task in batch_db.get_tasks(
+        tags_all=["moved"])} == high
+
+
+def test_update_tasks_without_ids_uses_filters(batch_db: Database) -> None:
+    outcomes = batch_db.update_tasks(None, priority="Medium",
+                                     tags_all=["even"])
+    assert set(outcomes) == set(range(2, COUNT + 1, 2))
+    assert all(outcomes.values())
+    assert count(batch_db, "priority = 2") == len(outcomes)
+
+
+def test_delete_reports_missing_ids(batch_db: Database) -> None:
+    first = batch_db.delete_tasks(range(1, COUNT + 1, 3))
+    assert all(first.values())
+    outcomes = batch_db.delete_tasks(requested_ids())
+    assert list(outcomes) == list(dict.fromkeys(requested_ids()))
+    assert {task_id for task_id, ok in outcomes.items() if ok} == {
+        task_id for task_id in range(1, COUNT + 1) if task_id % 3 != 1}
+    assert count(batch_db, "1") == 0
+    assert batch_db.conn.execute(
+        "SELECT COUNT(*) FROM task_tags").fetchone() == (0,)
+    assert batch_db.search_tasks("task") == []
+
+
+def test_failed_batch_is_rolled_back(batch_db: Database, capsys) -> None:
+    assert batch_db.update_tasks(requested_ids(), priority="Urgent") is None
+    assert "Ошибка обновления задач" in capsys.readouterr().out
+    assert count(batch_db, "priority = 3") == (COUNT + 1) // 2
+    assert not batch_db.conn.in_transaction
+    assert batch_db.update_tasks_status(range(1, COUNT + 1), "Unknown",
+                                        None) is None
+    assert count(batch_db, "status = 0") == COUNT
+
+
+def test_update_task_status_error_message(database: Database,
+                                          capsys) -> None:
+    task_id = database.add_task("task", "", "Low", None, None)
+    assert database.update_task_status(task_id, "Unknown", None) is False
+    assert "Ошибка при обновлении статуса задачи" in capsys.readouterr().out
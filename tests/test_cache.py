@@ -0,0 +1,118 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+import logic
+from cache import QueryCache
+
+
+def test_lru_eviction() -> None:
+    cache = QueryCache(maxsize=2)
+    for key in ("a", "b"):
+        cache.put((key,), key, cache.generation)
+    assert cache.get(("a",)) == (True, "a")
+    cache.put(("c",), "c", cache.generation)
+    assert cache.get(("b",)) == (False, None)
+    assert cache.get(("a",)) == (True, "a")
+    assert len(cache) == 2
+
+
+def test_result_read_before_invalidation_is_not_stored() -> None:
+    cache = QueryCache()
+    generation = cache.generation
+    cache.invalidate([1])
+    cache.put(("tasks",), "stale", generation)
+    assert cache.get(("tasks",)) == (False, None)
+
+
+def test_selective_invalidation() -> None:
+    cache = QueryCache()
+    for key in (("task", 1, False), ("task", 2, False), ("tasks", None)):
+        cache.put(key, key, cache.generation)
+    cache.invalidate([1])
+    assert cache.get(("task", 1, False))[0] is False
+    assert cache.get(("task", 2, False))[0] is True
+    assert cache.get(("tasks", None))[0] is False
+
+
+def cached_reads(task_ids: list[int]) -> tuple:
+    """Результаты всех кэшируемых чтений логического слоя."""
+    return (
+        logic.get_all_tasks("title", "ascending"),
+        logic.get_all_tasks(include_archive=True),
+        [logic.get_task_by_id(task_id) for task_id in task_ids],
+        [logic.get_task_by_id(task_id, True) for task_id in task_ids],
+        logic.get_tasks_page("deadline", "ascending", limit=2),
+        logic.search_tasks("alpha"),
+        logic.get_tag_counts(),
+    )
+
+
+def import_file(tmp_path) -> None:
+    path = os.path.join(tmp_path, "tasks.jsonl")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{"title": "alpha imported", "priority": "High", '
+                   '"tags": "new"}\n')
+    logic.import_tasks(path)
+
+
+def restore(tmp_path) -> None:
+    path = logic.create_snapshot(str(tmp_path / "restore")).path
+    os.replace(path, tmp_path / "restore.sqlite")
+
+
+MUTATIONS = {
+    "add": lambda ids, tmp: logic.add_new_task(
+        "alpha new", "", "High", None, "work"),
+    "update": lambda ids, tmp: logic.update_task(
+        ids[0], "alpha edited", None, "Low", None, "home"),
+    "complete": lambda ids, tmp: logic.complete_task(ids[1]),
+    "complete_many": lambda ids, tmp: logic.complete_tasks(ids),
+    "update_many": lambda ids, tmp: logic.update_tasks(
+        ids, tags="bulk"),
+    "delete": lambda ids, tmp: logic.delete_tasks([ids[0]]),
+    "archive": lambda ids, tmp: logic.archive_completed(timedelta(days=1)),
+    "import": lambda ids, tmp: import_file(tmp),
+    "restore": lambda ids, tmp: logic.restore_snapshot(
+        os.path.join(tmp, "restore.sqlite"), tmp),
+}
+
+
+@pytest.mark.parametrize("mutation", MUTATIONS)
+def test_mutation_invalidates_reads(logic_db: str, tmp_path,
+                                    mutation: str) -> None:
+    ids = [logic.add_new_task("alpha one", "", "Medium",
+                              datetime(2030, 1, 1), "work"),
+           logic.add_new_task("bravo two", "", "Low", None, "work"),
+           logic.add_new_task("alpha three", "", "High", None, "home")]
+    logic.complete_task(ids[2], datetime.now() - timedelta(days=10))
+    if mutation == "restore":
+        restore(tmp_path)
+        logic.update_task(ids[0], "alpha before restore")
+    before = cached_reads(ids)
+    hits = logic.get_cache().hits
+    assert cached_reads(ids) == before
+    assert logic.get_cache().hits > hits
+
+    MUTATIONS[mutation](ids, str(tmp_path))
+    after = cached_reads(ids)
+    logic.get_cache().invalidate()
+    assert after == cached_reads(ids)
+    assert after != before
+
+
+def test_other_connection_write_invalidates(logic_db: str) -> None:
+    task_id = logic.add_new_task("alpha", "", "Low", None, "work")
+    before = cached_reads([task_id])
+    assert cached_reads([task_id]) == before
+    conn = sqlite3.connect(logic_db)
+    with conn:
+        conn.execute("UPDATE tasks SET title = 'alpha external', "
+                     "tags = 'ops' WHERE id = ?", (task_id,))
+        conn.execute("UPDATE tags SET name = 'ops'")
+    conn.close()
+    task = logic.get_task_by_id(task_id)
+    assert task.title == "alpha external"
+    assert [task.title for task in logic.search_tasks("external")] == [
+        "alpha external"]
+    assert logic.get_tag_counts() == [("ops", 1)]
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+import logic
+from db import Database
+from migrations import MIGRATIONS, create_change_journal, migrate
+
+
+def journal(database: Database) -> list[tuple[int, str]]:
+    return [(change.task_id, change.operation)
+            for change in database.get_changes(0, 10000)]
+
+
+def test_triggers_record_every_change(database: Database) -> None:
+    first = database.add_task("first", "", "Low", None, None)
+    second = database.add_task("second", "", "Low", None, None)
+    database.update_task(first, title="first (edited)")
+    database.update_task_status(second, "Completed",
+                                datetime.now() - timedelta(days=60))
+    database.archive_completed(datetime.now() - timedelta(days=30))
+    database.delete_tasks([first])
+    assert journal(database) == [
+        (first, "insert"), (second, "insert"), (first, "update"),
+        (second, "update"), (second, "archive"), (first, "delete")]
+    changes = database.get_changes(0, 10000)
+    assert [change.seq for change in changes] == sorted(
+        {change.seq for change in changes})
+    # Удаленная и перенесенная в архив задачи в tasks отсутствуют.
+    assert [change.task for change in changes[-2:]] == [None, None]
+    assert database.get_last_change() == changes[-1].seq
+
+
+def test_since_cursor_pages_through_journal(database: Database) -> None:
+    ids = [database.add_task(f"task {n}", "", "Low", None, None)
+           for n in range(25)]
+    database.update_tasks(ids[::2], priority="High")
+    seen: list[int] = []
+    since = 0
+    while changes := database.get_changes(since, 7):
+        assert all(change.seq > since for change in changes)
+        seen.extend(change.seq for change in changes)
+        since = changes[-1].seq
+    assert len(seen) == 25 + 13
+    assert seen == sorted(set(seen))
+    assert database.get_changes(since) == []
+
+
+def test_get_changes_since_returns_latest_per_task(logic_db: str) -> None:
+    first = logic.add_new_task("first", "", "Low", None, None)
+    second = logic.add_new_task("second", "", "Low", None, None)
+    logic.update_task(first, "first v2", "", "Medium", None, None)
+    logic.update_task(first, "first v3", "", "High", None, None)
+    changes, since = logic.get_changes_since()
+    assert [(change.task_id, change.operation) for change in changes] == [
+        (second, "insert"), (first, "update")]
+    assert changes[1].task.title == "first v3"
+    assert logic.get_changes_since(since) == ([], since)
+
+    logic.delete_tasks([second])
+    changes, next_since = logic.get_changes_since(since)
+    assert [(change.task_id, change.operation, change.task)
+            for change in changes] == [(second, "delete", None)]
+    assert next_since > since
+
+
+def test_compaction_keeps_latest_state(logic_db: str) -> None:
+    ids = [logic.add_new_task(f"task {n}", "", "Low", None, None)
+           for n in range(5)]
+    for n in range(3):
+        logic.update_tasks(ids[:3], title=f"edit {n}")
+    logic.delete_tasks([ids[0]])
+    old_cursor = logic.get_changes_since(0, 6)[1]
+    before, last = logic.get_changes_since(0, 10000)
+
+    assert logic.compact_changes() == 5 + 9 + 1 - 5
+    after, last_after = logic.get_changes_since(0, 10000)
+    assert after == before
+    assert last_after == last
+    # Клиент, синхронизированный до сжатия, получает последнее состояние
+    # задач, измененных после его номера, в том числе удаление.
+    changes, _ = logic.get_changes_since(old_cursor)
+    assert {change.task_id: change.operation for change in changes} == {
+        ids[0]: "delete", ids[1]: "update", ids[2]: "update"}
+    # Номера журнала не выдаются повторно.
+    new_id = logic.add_new_task("new", "", "Low", None, None)
+    changes, _ = logic.get_changes_since(last)
+    assert [(change.task_id, change.operation) for change in changes] == [
+        (new_id, "insert")]
+
+
+def test_migration_backfills_existing_tasks(old_db) -> None:
+    version = MIGRATIONS.index(create_change_journal)
+    conn = old_db(version)
+    conn.executemany(
+        "INSERT INTO tasks (title, description, priority, status) "
+        "VALUES (?, '', 1, 0)", [("a",), ("b",), ("c",)])
+    assert migrate(conn) == len(MIGRATIONS)
+    assert conn.execute(
+        "SELECT seq, task_id, operation FROM task_changes").fetchall() == [
+        (1, 1, "insert"), (2, 2, "insert"), (3, 3, "insert")]
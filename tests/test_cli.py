@@ -0,0 +1,23 @@
+import pytest
+from cli import main
+
+
+@pytest.mark.parametrize("argv", [
+    ["add", "title", "--deadline", "bad"],
+    ["update", "1", "--deadline", "bad"],
+])
+def test_invalid_deadline_is_usage_error(db_path: str,
+                                         argv: list[str]) -> None:
+    with pytest.raises(SystemExit) as exc_info:
+        main(["--db", db_path, *argv])
+    assert exc_info.value.code == 2
+
+
+def test_add_with_deadline(db_path: str,
+                           capsys: pytest.CaptureFixture) -> None:
+    assert main(["--db", db_path, "add", "title",
+                 "--deadline", "2030-01-02 03:04"]) == 0
+    task_id = capsys.readouterr().out.strip()
+    assert main(["--db", db_path, "list", "--json"]) == 0
+    assert '"deadline": "2030-01-02 03:04:00"' in capsys.readouterr().out
+    assert task_id == "1"
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import time
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет времени запуска `python -m cli list` вместе со стартом
+# интерпретатора (с) и количество замеров (берется лучший).
+STARTUP_BUDGET: float = 0.1
+STARTUP_RUNS: int = 5
+
+
+def run_cli(*args: str, importtime: bool = False
+            ) -> subprocess.CompletedProcess:
+    """Запускает python -m cli с аргументами args в отдельном процессе.
+
+    Байт-код модулей записывается в __pycache__ (даже если задан
+    PYTHONDONTWRITEBYTECODE), как у установленного приложения: иначе
+    замер включает компиляцию исходников.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    options = ["-X", "importtime"] if importtime else []
+    return subprocess.run(
+        [sys.executable, *options, "-m", "cli", *args], cwd=ROOT, env=env,
+        capture_output=True, text=True, encoding="utf-8", check=True)
+
+
+def imported_modules(*args: str) -> list[str]:
+    """Возвращает модули, импортированные при запуске CLI."""
+    result = run_cli(*args, importtime=True)
+    return [line.rsplit("|", 1)[1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "self [us]" not in line]
+
+
+def test_help_does_not_import_qt() -> None:
+    modules = imported_modules("--help")
+    assert not [name for name in modules if name.startswith("PyQt6")]
+    assert "logic" not in modules
+
+
+def test_list_does_not_import_qt(db_path: str) -> None:
+    modules = imported_modules("--db", db_path, "list", "--limit", "1")
+    assert "logic" in modules
+    assert not [name for name in modules if name.startswith("PyQt6")]
+
+
+def test_list_startup_within_budget(db_path: str) -> None:
+    args = ("--db", db_path, "list", "--limit", "1")
+    run_cli(*args)
+    durations: list[float] = []
+    for _ in range(STARTUP_RUNS):
+        start = time.perf_counter()
+        run_cli(*args)
+        durations.append(time.perf_counter() - start)
+    assert min(durations) < STARTUP_BUDGET, (
+        f"запуск {min(durations) * 1000:.0f} мс")
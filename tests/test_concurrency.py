@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from benchmark import check_stress, create_database, stress_worker
+from db import (INTERACTIVE_BUSY_TIMEOUT, INTERACTIVE_WRITE_RETRIES,
+                ConnectionPool)
+
+THREADS: int = 8
+OPERATIONS: int = 50
+PROCESSES: int = 4
+PROCESS_OPERATIONS: int = 150
+
+
+def worker(pool: ConnectionPool,
+           counter_id: int,
+           task_id: int,
+           errors: list[BaseException]) -> None:
+    """Поток стресс-теста: увеличивает общий счетчик (чтение и запись в
+       одной транзакции) и переключает статус своей задачи."""
+    try:
+        with pool.session() as db:
+            for i in range(OPERATIONS):
+                db._begin()
+                value = int(db.get_task_by_id(counter_id).description)
+                assert db.update_task(counter_id, description=str(value + 1))
+                if i % 2 == 0:
+                    outcomes = db.update_tasks_status(
+                        [task_id], "Completed", datetime.now())
+                else:
+                    outcomes = db.update_tasks_status(
+                        [task_id], "Open", None)
+                assert outcomes == {task_id: True}
+    except BaseException as e:
+        errors.append(e)
+
+
+def test_concurrent_increments_and_status_flips(db_path: str) -> None:
+    pool = ConnectionPool(db_path)
+    with pool.session() as db:
+        counter_id = db.add_task("counter", "0", "Low", None, None)
+        task_ids = [db.add_task(f"task {n}", "", "Low", None, None)
+                    for n in range(THREADS)]
+    errors: list[BaseException] = []
+    threads = [threading.Thread(target=worker,
+                                args=(pool, counter_id, task_id, errors))
+               for task_id in task_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    with pool.session() as db:
+        assert db.get_task_by_id(counter_id).description == str(
+            THREADS * OPERATIONS)
+        statuses = [task.status for task in db.get_tasks_by_ids(task_ids)]
+    pool.close_all()
+    final = "Completed" if OPERATIONS % 2 else "Open"
+    assert statuses == [final] * THREADS
+
+
+def test_processes_lose_no_writes(tmp_path) -> None:
+    db_path = str(tmp_path / "stress.sqlite")
+    create_database(db_path, 200)
+    with ProcessPoolExecutor(PROCESSES) as executor:
+        reports = list(executor.map(
+            stress_worker, [db_path] * PROCESSES, range(PROCESSES),
+            [PROCESS_OPERATIONS] * PROCESSES, [0] * PROCESSES))
+    assert sum(report["failures"] for report in reports) == 0
+    assert check_stress(db_path, reports) == {
+        "lost": 0, "unexpected": 0, "mismatched": 0}
+    writes = sum(len(report["latencies"]["write"]) for report in reports)
+    assert writes > 0
+
+
+def test_limited_thread_write_fails_fast(db_path: str) -> None:
+    pool = ConnectionPool(db_path)
+    pool.limit_thread_writes()
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with pool.session() as db:
+            start = time.perf_counter()
+            task_id = db.add_task("blocked", "", "Low", None, None)
+            elapsed = time.perf_counter() - start
+    finally:
+        blocker.rollback()
+        blocker.close()
+        pool.close_all()
+    assert task_id is None
+    assert elapsed < INTERACTIVE_BUSY_TIMEOUT * (
+        INTERACTIVE_WRITE_RETRIES + 1) + 1
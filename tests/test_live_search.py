@@ -0,0 +1,104 @@
+import pytest
+import logic
+from live_search import LiveSearch, fold, search_terms
+from query import TaskQuery
+
+CORPUS: list[tuple] = [
+    ("Café meeting", "обсудить бюджет", "High", None, "work"),
+    ("cafe menu", "", "Low", None, "home"),
+    ("Ёлка", "купить ёлочные игрушки", "Medium", None, "праздник"),
+    ("Елочный базар", "", "Low", None, None),
+    ("foo_bar report", "", "Medium", None, "work"),
+    ("bar and foo", "", "High", None, None),
+    ("Отчет о работе", "годовой отчёт", "High", None, "work, отчет"),
+    ("Работа над ошибками", "", "Low", None, "study"),
+    ("Highway trip", "", "Low", None, None),
+    ("Naïve question", "", "Medium", None, None),
+]
+
+SEARCHES: list[str] = [
+    "cafe meeting", "café", "ёлоч", "елка", "foo_bar", "foo bar",
+    "отчет работ", "hig", "work foo", "naive", "rab", "раб ош",
+]
+
+SCOPES: list[TaskQuery] = [
+    TaskQuery().order_by("title"),
+    TaskQuery().where_priority("High", "Medium").order_by(
+        "priority", "descending"),
+    TaskQuery().where_all_tags("work").order_by("deadline"),
+]
+
+
+@pytest.fixture
+def corpus(logic_db: str) -> None:
+    for task in CORPUS:
+        logic.add_new_task(*task)
+
+
+def ids(tasks) -> list[int]:
+    return [task.id for task in tasks]
+
+
+@pytest.mark.parametrize("scope", SCOPES, ids=["title", "priority", "tag"])
+@pytest.mark.parametrize("search_criteria", SEARCHES)
+def test_typing_matches_fresh_query(corpus, scope: TaskQuery,
+                                    search_criteria: str) -> None:
+    live_search = LiveSearch()
+    narrowed_count: int = 0
+    for end in range(1, len(search_criteria) + 1):
+        typed = search_criteria[:end]
+        expected = logic.find_tasks(scope.where_text(typed))
+        narrowed = live_search.narrow(typed, scope)
+        if narrowed is None:
+            live_search.remember(typed, scope, expected,
+                                 live_search.generation)
+        else:
+            narrowed_count += 1
+            assert ids(narrowed) == ids(expected), typed
+    assert narrowed_count > 0
+
+
+def test_fold_matches_tokenizer(corpus) -> None:
+    assert fold("Café Naïve ЁЛКА") == "cafe naive елка"
+    assert search_terms("foo_bar, x-y") == ["foo", "bar", "x", "y"]
+
+
+def test_narrow_needs_same_scope_and_extension(corpus) -> None:
+    scope = SCOPES[0]
+    live_search = LiveSearch()
+    assert live_search.narrow("caf", scope) is None
+    live_search.remember("caf", scope, logic.find_tasks(
+        scope.where_text("caf")), live_search.generation)
+    assert live_search.narrow("caf", SCOPES[1]) is None
+    assert live_search.narrow("ca", scope) is None
+    assert ids(live_search.narrow("cafe m", scope)) == ids(
+        logic.find_tasks(scope.where_text("cafe m")))
+    # Сужение продолжается от последней строки.
+    assert live_search.narrow("caf", scope) is None
+
+
+def test_results_over_limit_are_not_kept(corpus) -> None:
+    scope = SCOPES[0]
+    live_search = LiveSearch(limit=1)
+    tasks = logic.find_tasks(scope.where_text("o"))
+    assert len(tasks) > 1
+    live_search.remember("o", scope, tasks, live_search.generation)
+    assert live_search.narrow("ot", scope) is None
+
+
+def test_reset_after_changes(corpus) -> None:
+    scope = SCOPES[0]
+    live_search = LiveSearch()
+    generation = live_search.generation
+    live_search.remember("caf", scope, logic.find_tasks(
+        scope.where_text("caf")), generation)
+    logic.add_new_task("Cafeteria", "", "Low", None, None)
+    live_search.reset()
+    assert live_search.narrow("cafe", scope) is None
+    # Результат запроса, начатого до сброса, не сохраняется.
+    live_search.remember("caf", scope, [], generation)
+    assert live_search.narrow("cafe", scope) is None
+    live_search.remember("caf", scope, logic.find_tasks(
+        scope.where_text("caf")), live_search.generation)
+    assert {task.title for task in live_search.narrow("cafet", scope)} == {
+        "Cafeteria"}
@@ -0,0 +1,113 @@
+import calendar
+import sqlite3
+from datetime import datetime
+import pytest
+from db import Database, connect
+from migrations import (MIGRATIONS, convert_dates_to_epoch,
+                        encode_priority_and_status, migrate)
+
+
+def db_file(conn: sqlite3.Connection) -> str:
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def test_priority_and_status_become_codes(old_db) -> None:
+    conn = old_db(MIGRATIONS.index(encode_priority_and_status))
+    conn.executemany(
+        "INSERT INTO tasks (title, priority, status, tags) "
+        "VALUES (?, ?, ?, ?)", [
+            ("alpha", "High", "Open", "work"),
+            ("bravo", "Low", "Completed", None),
+            ("charlie", "Medium", "Open", "home"),
+            ("delta", "Low", "Open", None),
+            ("removed", "Low", "Open", None)])
+    conn.execute("DELETE FROM tasks WHERE title = 'removed'")
+    conn.execute(
+        "INSERT INTO tasks_archive (id, title, priority, status) "
+        "VALUES (10, 'echo', 'High', 'Completed')")
+    assert migrate(conn) == len(MIGRATIONS)
+
+    assert conn.execute(
+        "SELECT title, priority, status, typeof(priority), typeof(status) "
+        "FROM tasks ORDER BY id").fetchall() == [
+        ("alpha", 3, 0, "integer", "integer"),
+        ("bravo", 1, 1, "integer", "integer"),
+        ("charlie", 2, 0, "integer", "integer"),
+        ("delta", 1, 0, "integer", "integer")]
+    assert conn.execute(
+        "SELECT priority, status FROM tasks_archive").fetchall() == [(3, 1)]
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO tasks (title, priority) VALUES ('x', 4)")
+    # Счетчик AUTOINCREMENT сохраняется: id удаленной задачи не
+    # выдается повторно.
+    conn.execute("INSERT INTO tasks (title, priority) VALUES ('foxtrot', 1)")
+    assert conn.execute("SELECT MAX(id) FROM tasks").fetchone() == (6,)
+    conn.execute("DELETE FROM tasks WHERE title = 'foxtrot'")
+
+    database = Database(conn=connect(db_file(conn)))
+    try:
+        tasks = database.get_tasks("priority", "ascending")
+        assert [(task.title, task.priority) for task in tasks] == [
+            ("bravo", "Low"), ("delta", "Low"), ("charlie", "Medium"),
+            ("alpha", "High")]
+        assert [task.status for task in tasks] == [
+            "Completed", "Open", "Open", "Open"]
+        assert {task.title for task in database.search_tasks("High")} == {
+            "alpha"}
+        assert {task.title for task in database.search_tasks(
+            "Completed", include_archive=True)} == {"bravo", "echo"}
+        assert {task.title for task in database.search_tasks("work")} == {
+            "alpha"}
+        database.update_task(4, priority="High")
+        assert {task.title for task in database.search_tasks("High")} == {
+            "alpha", "delta"}
+    finally:
+        database.conn.close()
+
+
+def test_dates_become_epoch_seconds(old_db) -> None:
+    conn = old_db(MIGRATIONS.index(convert_dates_to_epoch))
+    conn.executemany(
+        "INSERT INTO tasks (title, priority, status, deadline, created_at, "
+        "completed_at) VALUES (?, 'Low', ?, ?, ?, ?)", [
+            ("alpha", "Open", "2024-03-10 14:30:00", "2024-03-10 12:00:00",
+             None),
+            ("bravo", "Completed", "2024-03-09T08:00:00",
+             "2024-03-01 00:00:00", "2024-03-11 09:15:00"),
+            ("charlie", "Open", "", None, "not a date"),
+            ("delta", "Open", None, "", ""),
+            ("echo", "Open", 1700000000, 1600000000, None)])
+    assert migrate(conn) == len(MIGRATIONS)
+
+    assert {typeof for typeof, in conn.execute(
+        "SELECT typeof(deadline) FROM tasks UNION "
+        "SELECT typeof(created_at) FROM tasks UNION "
+        "SELECT typeof(completed_at) FROM tasks")} == {"integer", "null"}
+    database = Database(conn=connect(db_file(conn)))
+    try:
+        tasks = {task.title: task for task in database.get_tasks()}
+        # deadline и completed_at - местное время, created_at - UTC.
+        assert tasks["alpha"].deadline == datetime(2024, 3, 10, 14, 30)
+        assert tasks["alpha"].created_at == datetime.fromtimestamp(
+            calendar.timegm((2024, 3, 10, 12, 0, 0)))
+        assert tasks["alpha"].completed_at is None
+        assert tasks["bravo"].deadline == datetime(2024, 3, 9, 8, 0)
+        assert tasks["bravo"].completed_at == datetime(2024, 3, 11, 9, 15)
+        assert tasks["charlie"].deadline is None
+        assert tasks["charlie"].completed_at is None
+        assert tasks["delta"].created_at is None
+        assert tasks["echo"].deadline == datetime.fromtimestamp(1700000000)
+        assert tasks["echo"].created_at == datetime.fromtimestamp(1600000000)
+
+        ordered = database.get_tasks("deadline", "ascending")
+        assert [task.title for task in ordered] == [
+            "charlie", "delta", "echo", "bravo", "alpha"]
+        assert [task.title for task in database.get_tasks_completed_between(
+            datetime(2024, 3, 11), datetime(2024, 3, 12))] == ["bravo"]
+        assert [task.title for task in database.search_tasks("alp")] == [
+            "alpha"]
+        database.update_task(1, title="alpha renamed")
+        assert [task.title for task in database.search_tasks("renamed")] == [
+            "alpha renamed"]
+    finally:
+        database.conn.close()
@@ -0,0 +1,127 @@
+import base64
+import json
+from datetime import datetime, timedelta
+import pytest
+import logic
+from db import SORT_FIELDS, Database
+from models import PRIORITY_CODES, STATUS_CODES, Task
+
+ORDERS: tuple[str, ...] = ("ascending", "descending")
+
+# Коды, по которым сортируются поля в БД.
+SORT_VALUES = {"priority": PRIORITY_CODES, "status": STATUS_CODES}
+
+
+def sort_key(field: str, task: Task) -> tuple:
+    """Порядок SQLite: NULL раньше любых значений, затем id."""
+    value = getattr(task, field)
+    if field in SORT_VALUES:
+        value = SORT_VALUES[field][value]
+    return (value is not None, value, task.id)
+
+
+def expected_ids(tasks: list[Task], field: str | None, order: str
+                 ) -> list[int]:
+    ordered = sorted(tasks, key=lambda task: sort_key(field or "id", task))
+    if order == "descending":
+        ordered.reverse()
+    return [task.id for task in ordered]
+
+
+def seed(add) -> None:
+    """Задачи с повторяющимися значениями полей и пустыми дедлайнами."""
+    base = datetime(2030, 1, 1, 12, 0)
+    for n in range(23):
+        deadline = None if n % 3 == 0 else base + timedelta(days=n % 4)
+        add(f"task {n % 5}", "", ("Low", "Medium", "High")[n % 3],
+            deadline, "even" if n % 2 == 0 else "odd")
+
+
+@pytest.fixture
+def tasks(logic_db: str) -> list[Task]:
+    seed(logic.add_new_task)
+    ids = [task.id for task in logic.get_all_tasks()]
+    logic.complete_tasks(ids[::4])
+    return logic.get_all_tasks()
+
+
+@pytest.mark.parametrize("order", ORDERS)
+@pytest.mark.parametrize("field", (None, *SORT_FIELDS))
+def test_walk_with_tokens_returns_every_row_once(tasks: list[Task],
+                                                 field: str | None,
+                                                 order: str) -> None:
+    walked: list[int] = []
+    token = None
+    while True:
+        page, token = logic.get_tasks_page(field, order, limit=4,
+                                           page_token=token)
+        assert len(page) <= 4
+        walked.extend(task.id for task in page)
+        if token is None:
+            break
+    assert walked == expected_ids(tasks, field, order)
+
+
+@pytest.mark.parametrize("order", ORDERS)
+@pytest.mark.parametrize("field", SORT_FIELDS)
+def test_walk_with_filters(tasks: list[Task], field: str, order: str
+                           ) -> None:
+    walked: list[int] = []
+    token = None
+    while True:
+        page, token = logic.get_tasks_page(
+            field, order, "Medium", limit=3, page_token=token,
+            tags_all=["even"])
+        walked.extend(task.id for task in page)
+        if token is None:
+            break
+    matching = [task for task in tasks
+                if task.priority == "Medium" and task.tags == "even"]
+    assert walked == expected_ids(matching, field, order)
+
+
+def test_database_keys_cover_null_boundary(database: Database) -> None:
+    seed(database.add_task)
+    tasks = database.get_tasks()
+    for order in ORDERS:
+        walked: list[int] = []
+        after = None
+        while True:
+            page, after = database.get_tasks_page(
+                "deadline", order, limit=1, after=after)
+            walked.extend(task.id for task in page)
+            if after is None:
+                break
+        assert walked == expected_ids(tasks, "deadline", order)
+
+
+def test_page_boundary_on_last_row(tasks: list[Task]) -> None:
+    page, token = logic.get_tasks_page(limit=len(tasks))
+    assert len(page) == len(tasks)
+    assert token is None
+
+
+def token(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+@pytest.mark.parametrize("page_token", [
+    "not base64 at all!",
+    token("text"),
+    token([None, None, 1]),
+    token([None, None, {"value": 1}, 3]),
+    token([None, None, 1, "3"]),
+    token([None, None, 1, [3]]),
+    token(["title", "ascending", "task 1", 3]),
+])
+def test_tampered_token_is_rejected(tasks: list[Task],
+                                    page_token: str) -> None:
+    with pytest.raises(ValueError):
+        logic.get_tasks_page(limit=2, page_token=page_token)
+
+
+def test_token_for_other_sort_is_rejected(tasks: list[Task]) -> None:
+    _, page_token = logic.get_tasks_page("title", "ascending", limit=2)
+    with pytest.raises(ValueError):
+        logic.get_tasks_page("title", "descending", limit=2,
+                             page_token=page_token)
@@ -0,0 +1,148 @@
+import re
+from datetime import datetime
+import pytest
+from db import Database
+from query import FTS_WEIGHTS, ORDER_FIELDS, TASK_COLUMNS, TaskQuery
+
+SELECT: str = "SELECT " + ", ".join(
+    f"tasks.{field}" for field in TASK_COLUMNS.split(", "))
+WEIGHTS: str = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+
+
+def compact(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def compiled(query: TaskQuery, **kwargs) -> tuple[str, list]:
+    sql, parameters = query.compile(**kwargs)
+    return compact(sql), parameters
+
+
+def test_empty_query() -> None:
+    assert compiled(TaskQuery()) == (f"{SELECT} FROM tasks", [])
+
+
+def test_filters_and_sort() -> None:
+    query = (TaskQuery().where_priority("High", "Low", "High")
+             .where_status("Open")
+             .where_deadline(datetime(2030, 1, 1), datetime(2030, 2, 1))
+             .order_by("deadline", "descending"))
+    assert compiled(query, limit=10) == (
+        f"{SELECT} FROM tasks WHERE tasks.status = ? "
+        "AND tasks.priority IN (?, ?) "
+        "AND tasks.deadline >= ? AND tasks.deadline < ? "
+        "ORDER BY tasks.deadline DESC, tasks.id DESC LIMIT ?",
+        [0, 3, 1, datetime(2030, 1, 1), datetime(2030, 2, 1), 10])
+
+
+def test_tag_filters() -> None:
+    query = TaskQuery().where_all_tags("B", " a ").where_any_tag("c")
+    assert compiled(query) == (
+        f"{SELECT} FROM tasks WHERE tasks.id IN ( "
+        "SELECT task_tags.task_id FROM tags "
+        "JOIN task_tags ON task_tags.tag_id = tags.id "
+        "WHERE tags.name IN (?, ?) "
+        "GROUP BY task_tags.task_id HAVING COUNT(*) = ?) "
+        "AND tasks.id IN ( "
+        "SELECT task_tags.task_id FROM tags "
+        "JOIN task_tags ON task_tags.tag_id = tags.id "
+        "WHERE tags.name IN (?))",
+        ["a", "b", 2, "c"])
+
+
+def test_text_search_ranks_by_bm25() -> None:
+    query = TaskQuery().where_text("foo 'bar").where_priority("Medium")
+    assert compiled(query) == (
+        f"{SELECT} FROM tasks_fts CROSS JOIN tasks "
+        "ON tasks.id = tasks_fts.rowid "
+        "WHERE tasks_fts MATCH ? AND tasks.priority = ? "
+        f"ORDER BY bm25(tasks_fts, {WEIGHTS}) ASC, tasks.id ASC",
+        ['"foo"* "bar"*', 2])
+
+
+def test_archive_union() -> None:
+    sql, parameters = compiled(
+        TaskQuery().with_archive().where_status("Completed"),
+        conditions=["tasks.id > ?"], parameters=[7], limit=3)
+    parts = sql.split(" UNION ALL ")
+    assert len(parts) == 2
+    assert "FROM tasks WHERE tasks.status = ?" in parts[0]
+    assert parts[1].endswith(
+        "FROM tasks_archive WHERE tasks_archive.status = ?) AS tasks "
+        "WHERE tasks.id > ? ORDER BY tasks.id ASC LIMIT ?")
+    assert parameters == [1, 1, 7, 3]
+
+
+def test_columns_and_extra_conditions() -> None:
+    assert compiled(TaskQuery().where_priority("Low").order_by("title"),
+                    columns="tasks.id", conditions=["tasks.id > ?"],
+                    parameters=[5]) == (
+        "SELECT tasks.id FROM tasks WHERE tasks.priority = ? "
+        "AND tasks.id > ? ORDER BY tasks.title ASC, tasks.id ASC",
+        [1, 5])
+
+
+@pytest.mark.parametrize("field", [
+    "tasks.title", "title; DROP TABLE tasks", "title DESC", "Title",
+    "description", "tags", "", "rowid"])
+def test_order_by_rejects_unknown_fields(field: str) -> None:
+    with pytest.raises(ValueError, match="поле сортировки"):
+        TaskQuery().order_by(field)
+
+
+@pytest.mark.parametrize("order", ["asc", "DESC", "descending; --", None])
+def test_order_by_rejects_unknown_orders(order) -> None:
+    with pytest.raises(ValueError, match="направление сортировки"):
+        TaskQuery().order_by("title", order)
+
+
+def test_rank_requires_text() -> None:
+    with pytest.raises(ValueError, match="релевантности"):
+        TaskQuery().order_by("rank").compile()
+    sql, _ = compiled(TaskQuery().where_text("x").order_by("rank",
+                                                           "descending"))
+    assert sql.endswith(
+        f"ORDER BY bm25(tasks_fts, {WEIGHTS}) DESC, tasks.id DESC")
+
+
+def test_explicit_id_key_is_not_repeated() -> None:
+    sql, _ = compiled(TaskQuery().order_by("priority").order_by(
+        "id", "descending"))
+    assert sql.endswith("ORDER BY tasks.priority ASC, tasks.id DESC")
+
+
+def test_equivalent_queries_are_equal() -> None:
+    first = TaskQuery().where_priority("Low", "High").where_all_tags(
+        "Work", "home")
+    second = TaskQuery().where_all_tags("home", "work", "HOME").where_priority(
+        "High", "Low")
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first.compile() == second.compile()
+
+
+QUERIES: list[TaskQuery] = [
+    TaskQuery(),
+    TaskQuery().where_priority("Low", "Medium").order_by("title"),
+    TaskQuery().where_status("Open", "Completed").where_any_tag("x", "y"),
+    TaskQuery().where_all_tags("x").where_deadline(
+        datetime(2030, 1, 1)).order_by("deadline", "descending"),
+    TaskQuery().where_text("task").where_all_tags("x", "y"),
+    TaskQuery().where_text("task").order_by("created_at").with_archive(),
+    TaskQuery().with_archive().where_priority("High").where_any_tag("y")
+    .order_by("completed_at", "descending"),
+    *(TaskQuery().order_by(field) for field in ORDER_FIELDS
+      if field != "rank"),
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_compiled_queries_run(database: Database, query: TaskQuery) -> None:
+    for n in range(6):
+        database.add_task(f"task {n}", "", ("Low", "Medium", "High")[n % 3],
+                          datetime(2030, 1, 1 + n), ("x", "y", "x, y")[n % 3])
+    sql, parameters = query.compile(limit=100)
+    assert len(re.findall(r"\?", sql)) == len(parameters)
+    rows = database.conn.execute(sql, parameters).fetchall()
+    assert [task.id for task in database.query_tasks(query)] == [
+        row[0] for row in rows]
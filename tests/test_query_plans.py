@@ -0,0 +1,22 @@
+import itertools
+import pytest
+from db import Database
+from query import SORT_FIELDS
+
+SORT_ORDERS: tuple[str, ...] = ("ascending", "descending")
+PRIORITY_FILTERS: tuple[str, ...] = ("All", "Low", "Medium", "High")
+
+
+@pytest.mark.parametrize(
+    "sort_field, sort_order, priority_filter",
+    list(itertools.product((None, *SORT_FIELDS), SORT_ORDERS,
+                           PRIORITY_FILTERS)))
+def test_get_tasks_uses_index_order(database: Database,
+                                    sort_field: str | None,
+                                    sort_order: str,
+                                    priority_filter: str) -> None:
+    """Все варианты сортировки и фильтра get_tasks читают задачи в
+       порядке индекса, без временного B-дерева для сортировки."""
+    plan = database.explain_get_tasks(sort_field, sort_order,
+                                      priority_filter)
+    assert not any("USE TEMP B-TREE" in row for row in plan), plan
@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from PyQt6.QtCore import QCoreApplication
+import logic
+import reminders
+from models import Task
+from workers import ReminderTimer
+
+
+@pytest.fixture
+def app() -> QCoreApplication:
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_for(condition, app: QCoreApplication, timeout: float = 5.0
+             ) -> None:
+    """Обрабатывает события Qt, пока условие не выполнится."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def test_timer_loads_queue_off_gui_thread(logic_db: str,
+                                          app: QCoreApplication,
+                                          monkeypatch) -> None:
+    soon = datetime.now().replace(microsecond=0) + timedelta(minutes=30)
+    task_id = logic.add_new_task("soon", "", "Low", soon, None)
+    load_threads: list[threading.Thread] = []
+    load = reminders.get_upcoming_deadlines
+
+    def get_upcoming_deadlines(*args):
+        load_threads.append(threading.current_thread())
+        return load(*args)
+
+    monkeypatch.setattr(reminders, "get_upcoming_deadlines",
+                        get_upcoming_deadlines)
+    due: list[tuple[threading.Thread, list[Task]]] = []
+    timer = ReminderTimer(lead=timedelta(hours=1))
+    timer.remindersDue.connect(
+        lambda tasks: due.append((threading.current_thread(), tasks)))
+    timer.start()
+    try:
+        wait_for(lambda: due, app)
+    finally:
+        timer.stop()
+    assert load_threads
+    assert threading.main_thread() not in load_threads
+    thread, tasks = due[0]
+    assert thread is threading.main_thread()
+    assert [task.id for task in tasks] == [task_id]
+
+
+def test_timer_start_does_not_wait_for_locked_db(logic_db: str,
+                                                 app: QCoreApplication,
+                                                 monkeypatch) -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    def get_upcoming_deadlines(*args):
+        started.set()
+        release.wait()
+        return [], None
+
+    monkeypatch.setattr(reminders, "get_upcoming_deadlines",
+                        get_upcoming_deadlines)
+    timer = ReminderTimer()
+    begin = time.perf_counter()
+    timer.start()
+    elapsed = time.perf_counter() - begin
+    assert started.wait(5)
+    release.set()
+    timer.stop()
+    assert elapsed < 0.5
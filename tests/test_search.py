@@ -0,0 +1,115 @@
+import pytest
+from db import Database, connect
+from migrations import MIGRATIONS, create_fts_index, migrate
+from query import FTS_WEIGHTS, build_fts_query
+
+
+def db_file(conn) -> str:
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def titles(tasks) -> list[str]:
+    return [task.title for task in tasks]
+
+
+def test_fts_index_is_backfilled(old_db) -> None:
+    conn = old_db(MIGRATIONS.index(create_fts_index))
+    conn.executemany(
+        "INSERT INTO tasks (title, description, priority, tags) "
+        "VALUES (?, ?, ?, ?)", [
+            ("Квартальный отчет", "сдать до пятницы", "High", "work"),
+            ("Молоко", "купить в магазине", "Low", "home"),
+            ("Отчетность", None, "Medium", None)])
+    create_fts_index(conn.cursor())
+    assert conn.execute(
+        "SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ? "
+        "ORDER BY rowid", (build_fts_query("отчет"),)).fetchall() == [
+        (1,), (3,)]
+    assert conn.execute(
+        "INSERT INTO tasks_fts(tasks_fts, rank) VALUES "
+        "('integrity-check', 1)").rowcount == 1
+
+    conn.execute("PRAGMA user_version = 2")
+    assert migrate(conn) == len(MIGRATIONS)
+    database = Database(conn=connect(db_file(conn)))
+    try:
+        assert set(titles(database.search_tasks("магазин"))) == {"Молоко"}
+        assert set(titles(database.search_tasks("work"))) == {
+            "Квартальный отчет"}
+        assert set(titles(database.search_tasks("High"))) == {
+            "Квартальный отчет"}
+    finally:
+        database.close()
+
+
+def test_index_follows_update_and_delete(database: Database) -> None:
+    first = database.add_task("Позвонить врачу", "", "Low", None, "health")
+    second = database.add_task("Оплатить счет", "за интернет", "Medium",
+                               None, None)
+    assert titles(database.search_tasks("врачу")) == ["Позвонить врачу"]
+
+    assert database.update_task(first, title="Позвонить стоматологу",
+                                tags="dentist")
+    assert database.search_tasks("врачу") == []
+    assert database.search_tasks("health") == []
+    assert titles(database.search_tasks("стоматологу dentist")) == [
+        "Позвонить стоматологу"]
+
+    assert database.update_task_status(second, "Completed", None)
+    assert titles(database.search_tasks("Completed")) == ["Оплатить счет"]
+    assert database.search_tasks("Open интернет") == []
+
+    assert database.delete_tasks([second]) is not None
+    assert database.search_tasks("интернет") == []
+    assert database.search_tasks("Completed") == []
+    database.conn.execute(
+        "INSERT INTO tasks_fts(tasks_fts, rank) VALUES "
+        "('integrity-check', 1)")
+
+
+@pytest.mark.parametrize("criteria, expected", [
+    ("пла", {"План релиза", "Планирование отпуска"}),
+    ("план рел", {"План релиза"}),
+    ("о", {"Планирование отпуска"}),
+    ("PLAN", {"plan B"}),
+    ('"план" OR NOT', set()),
+    ("relea*", {"Release notes"}),
+])
+def test_prefix_queries(database: Database, criteria: str,
+                        expected: set[str]) -> None:
+    for title in ("План релиза", "Планирование отпуска", "plan B",
+                  "Release notes"):
+        database.add_task(title, "", "Low", None, None)
+    assert set(titles(database.search_tasks(criteria))) == expected
+
+
+def test_queries_without_words_find_nothing(database: Database) -> None:
+    database.add_task("Задача", "", "Low", None, None)
+    assert database.search_tasks("") == []
+    assert database.search_tasks(" * - ") == []
+
+
+def test_results_are_ordered_by_bm25(database: Database) -> None:
+    rows = [
+        ("Ремонт", "позвонить мастеру про ремонт крана", None),
+        ("Кран на кухне", "", None),
+        ("Покупки", "", "кран"),
+        ("Разное", "кран", None),
+        ("Кран кран", "кран течет", None),
+        ("Без совпадений", "", None),
+    ]
+    for title, description, tags in rows:
+        database.add_task(title, description, "Low", None, tags)
+
+    found = titles(database.search_tasks("кран"))
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    ranked = database.conn.execute(
+        f"SELECT tasks.title FROM tasks_fts JOIN tasks "
+        f"ON tasks.id = tasks_fts.rowid WHERE tasks_fts MATCH ? "
+        f"ORDER BY bm25(tasks_fts, {weights}), tasks.id",
+        (build_fts_query("кран"),)).fetchall()
+    assert found == [title for title, in ranked]
+    # Вес совпадения: заголовок > описание > тэги.
+    assert found[:2] == ["Кран кран", "Кран на кухне"]
+    assert found.index("Разное") < found.index("Покупки")
+    assert "Без совпадений" not in found
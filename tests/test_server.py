@@ -0,0 +1,278 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
+import time
+from typing import Callable, Iterator
+from urllib.parse import quote
+import pytest
+import logic
+import server
+from server import MAX_BODY_SIZE, TaskApiServer
+
+
+@pytest.fixture
+def start_server(logic_db: str) -> Iterator[Callable[..., TaskApiServer]]:
+    """Фабрика серверов API на свободном порту, каждый со своим циклом
+       событий в отдельном потоке."""
+    running: list[tuple] = []
+
+    def start(workers: int = 2) -> TaskApiServer:
+        api = TaskApiServer(port=0, workers=workers)
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run() -> None:
+            loop.run_until_complete(api.start())
+            started.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        assert started.wait(5)
+        running.append((api, loop, thread))
+        return api
+
+    yield start
+
+    async def stop(api: TaskApiServer) -> None:
+        api._server.close()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    for api, loop, thread in running:
+        asyncio.run_coroutine_threadsafe(stop(api), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        api.close()
+        loop.close()
+
+
+@pytest.fixture
+def api(start_server) -> TaskApiServer:
+    return start_server()
+
+
+def call(api: TaskApiServer, method: str, path: str,
+         body: dict | bytes | None = None,
+         headers: dict[str, str] | None = None) -> tuple[int, object]:
+    """Выполняет запрос; возвращает код ответа и разобранный JSON."""
+    if isinstance(body, dict):
+        body = json.dumps(body).encode()
+    conn = http.client.HTTPConnection(api.host, api.port, timeout=10)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def add_tasks(count: int) -> list[int]:
+    return [logic.add_new_task(f"task {n}", "", ("Low", "High")[n % 2],
+                               None, None) for n in range(count)]
+
+
+def test_add_task_defaults_priority_to_low(api: TaskApiServer) -> None:
+    status, task = call(api, "POST", "/tasks", {"title": "Без приоритета"})
+    assert status == 201
+    assert (task["title"], task["priority"], task["status"]) == (
+        "Без приоритета", "Low", "Open")
+    status, task = call(api, "POST", "/tasks", {
+        "title": "Отчет", "priority": "High", "deadline": "2030-01-02 10:00",
+        "tags": "work"})
+    assert status == 201
+    assert (task["priority"], task["deadline"]) == (
+        "High", "2030-01-02 10:00:00")
+    assert logic.get_task_by_id(task["id"]).tags == "work"
+
+
+@pytest.mark.parametrize("method, path, body, message", [
+    ("POST", "/tasks", {"priority": "Low"}, "не указан заголовок"),
+    ("POST", "/tasks", {"title": "a", "priority": "Urgent"},
+     "недопустимый приоритет: Urgent"),
+    ("POST", "/tasks", {"title": "a", "deadline": "завтра"},
+     "некорректный дедлайн"),
+    ("POST", "/tasks", b"{broken", "Некорректный JSON"),
+    ("POST", "/tasks", b"[1]", "JSON-объектом"),
+    ("GET", "/tasks?limit=0", None, "limit"),
+    ("GET", "/tasks?limit=abc", None, "limit"),
+    ("GET", "/tasks?sort_field=id", None, "поле сортировки"),
+    ("GET", "/tasks?sort_order=up", None, "порядок"),
+    ("GET", "/tasks?priority=Urgent", None, "priority"),
+    ("GET", "/tasks?status=Done", None, "status"),
+    ("GET", "/tasks?due_after=soon", None, "due_after"),
+    ("GET", "/tasks?page_token=garbage", None, "токен"),
+    ("GET", "/search", None, "строка поиска"),
+    ("GET", "/changes?since=-1", None, "since"),
+    ("PATCH", "/tasks/1", {"status": "Completed"}, "Неизвестные поля"),
+    ("PATCH", "/tasks/1", {"title": 5}, "строкой"),
+    ("PATCH", "/tasks/1", {"title": ""}, "Заголовок"),
+    ("PATCH", "/tasks/1", {"priority": "Urgent"}, "приоритет"),
+    ("PATCH", "/tasks/1", {"deadline": "x"}, "дедлайн"),
+    ("POST", "/tasks/1/complete", {"completed_at": 5}, "дата завершения"),
+])
+def test_bad_requests(api: TaskApiServer, method: str, path: str,
+                      body, message: str) -> None:
+    add_tasks(1)
+    status, payload = call(api, method, path, body)
+    assert status == 400
+    assert message in payload["error"]
+
+
+@pytest.mark.parametrize("method, path", [
+    ("DELETE", "/tasks"),
+    ("PUT", "/tasks/1"),
+    ("POST", "/tasks/stream"),
+    ("GET", "/tasks/1/complete"),
+    ("POST", "/changes"),
+])
+def test_wrong_method(api: TaskApiServer, method: str, path: str) -> None:
+    status, payload = call(api, method, path)
+    assert status == 405
+    assert method in payload["error"]
+
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "/tasks/42"),
+    ("PATCH", "/tasks/42"),
+    ("POST", "/tasks/42/complete"),
+    ("GET", "/unknown"),
+    ("GET", "/tasks/abc"),
+])
+def test_not_found(api: TaskApiServer, method: str, path: str) -> None:
+    assert call(api, method, path, {})[0] == 404
+
+
+def test_request_framing_errors(api: TaskApiServer) -> None:
+    assert call(api, "POST", "/tasks", None, {
+        "Content-Length": str(MAX_BODY_SIZE + 1)})[0] == 413
+    assert call(api, "POST", "/tasks", b"", {
+        "Transfer-Encoding": "chunked"})[0] == 400
+
+
+def test_task_lifecycle(api: TaskApiServer) -> None:
+    [task_id] = add_tasks(1)
+    status, task = call(api, "PATCH", f"/tasks/{task_id}", {
+        "title": "Новое имя", "deadline": "2030-05-01"})
+    assert status == 200
+    assert (task["title"], task["deadline"]) == (
+        "Новое имя", "2030-05-01 00:00:00")
+    status, task = call(api, "POST", f"/tasks/{task_id}/complete", {
+        "completed_at": "2030-05-02 09:00"})
+    assert (status, task["status"], task["completed_at"]) == (
+        200, "Completed", "2030-05-02 09:00:00")
+    assert call(api, "GET", f"/tasks/{task_id}") == (200, task)
+    status, payload = call(
+        api, "GET", f"/search?q={quote('новое')}&status=Completed")
+    assert [found["id"] for found in payload["tasks"]] == [task_id]
+    status, payload = call(api, "GET", "/changes?since=0")
+    assert status == 200
+    assert [change["task_id"] for change in payload["changes"]] == [task_id]
+
+
+@pytest.mark.parametrize("sort_order", ["ascending", "descending"])
+def test_list_pages(api: TaskApiServer, sort_order: str) -> None:
+    ids = add_tasks(11)
+    walked: list[int] = []
+    path = f"/tasks?limit=4&priority=High&sort_order={sort_order}"
+    token = None
+    while True:
+        status, payload = call(
+            api, "GET", path + (f"&page_token={token}" if token else ""))
+        assert status == 200
+        walked.extend(task["id"] for task in payload["tasks"])
+        token = payload["next_page_token"]
+        if token is None:
+            break
+    expected = [task_id for n, task_id in enumerate(ids) if n % 2]
+    if sort_order == "descending":
+        expected.reverse()
+    assert walked == expected
+
+
+def read_raw(api: TaskApiServer, path: str) -> tuple[bytes, list[bytes]]:
+    """Запрос без разбора ответа: заголовок и фрагменты chunked."""
+    with socket.create_connection((api.host, api.port), timeout=10) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: test\r\n"
+                     f"Connection: close\r\n\r\n".encode())
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    header, _, body = data.partition(b"\r\n\r\n")
+    chunks: list[bytes] = []
+    while True:
+        size_line, _, body = body.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            assert body == b"\r\n"
+            return header, chunks
+        chunks.append(body[:size])
+        assert body[size:size + 2] == b"\r\n"
+        body = body[size + 2:]
+
+
+@pytest.mark.parametrize("count", [0, 1, 9, 10])
+def test_stream_is_chunked(api: TaskApiServer, monkeypatch,
+                           count: int) -> None:
+    monkeypatch.setattr(server, "STREAM_BATCH", 3)
+    ids = add_tasks(count)
+    header, chunks = read_raw(api, "/tasks/stream?sort_field=title")
+    assert header.startswith(b"HTTP/1.1 200 OK")
+    assert b"Transfer-Encoding: chunked" in header
+    assert len(chunks) == count // 3 + 1
+    tasks = json.loads(b"".join(chunks))
+    assert sorted(task["id"] for task in tasks) == ids
+    assert [task["title"] for task in tasks] == sorted(
+        task["title"] for task in tasks)
+
+
+def test_stream_applies_filters(api: TaskApiServer) -> None:
+    ids = add_tasks(6)
+    status, tasks = call(api, "GET", "/tasks/stream?priority=Low")
+    assert status == 200
+    assert [task["id"] for task in tasks] == ids[::2]
+    assert call(api, "GET", "/tasks/stream?status=Done")[0] == 400
+
+
+def test_slots_limit_pending_calls(start_server, monkeypatch) -> None:
+    monkeypatch.setattr(server, "PENDING_PER_WORKER", 3)
+    api = start_server(workers=1)
+    release = threading.Event()
+    respond = server.respond
+
+    def blocking_respond(*args):
+        assert release.wait(10)
+        return respond(*args)
+
+    monkeypatch.setattr(server, "respond", blocking_respond)
+    submitted: list[object] = []
+    submit = api.executor.submit
+
+    def counting_submit(fn, *args):
+        submitted.append(fn)
+        return submit(fn, *args)
+
+    monkeypatch.setattr(api.executor, "submit", counting_submit)
+    results: list[int] = []
+    clients = [threading.Thread(
+        target=lambda: results.append(call(api, "GET", "/tasks")[0]))
+        for _ in range(8)]
+    for client in clients:
+        client.start()
+    deadline = time.monotonic() + 5
+    while len(submitted) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    # Один запрос выполняется, два ждут в очереди пула, остальные -
+    # в цикле событий.
+    assert len(submitted) == 3
+    release.set()
+    for client in clients:
+        client.join(10)
+    assert results == [200] * 8
+    assert len(submitted) == 8
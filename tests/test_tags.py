@@ -0,0 +1,114 @@
+from itertools import combinations
+import pytest
+import logic
+from db import Database
+from tags import normalize_tag, parse_tags
+
+TAGGED: dict[str, str | None] = {
+    "a": "work, urgent",
+    "b": "Work; home",
+    "c": "homework",
+    "d": "  urgent  ,home,  work ",
+    "e": None,
+    "f": "",
+    "g": "Long   Tag, work, WORK",
+}
+
+
+@pytest.mark.parametrize("tags, expected", [
+    (None, []),
+    ("", []),
+    (" , ;", []),
+    ("Work", ["work"]),
+    ("work, Work;WORK", ["work"]),
+    ("b; a, c", ["b", "a", "c"]),
+    ("  Long \t Tag ", ["long tag"]),
+])
+def test_parse_tags(tags: str | None, expected: list[str]) -> None:
+    assert parse_tags(tags) == expected
+
+
+def test_normalize_tag() -> None:
+    assert normalize_tag("  Мой   Тэг ") == "мой тэг"
+
+
+@pytest.fixture
+def tagged(database: Database) -> dict[str, int]:
+    return {title: database.add_task(title, "", "Low", None, tags)
+            for title, tags in TAGGED.items()}
+
+
+def matching(names: list[str], match_all: bool) -> set[str]:
+    """Ожидаемый результат фильтра по разбору строк тэгов в Python."""
+    wanted = {normalize_tag(name) for name in names}
+    found: set[str] = set()
+    for title, tags in TAGGED.items():
+        have = set(parse_tags(tags))
+        if wanted <= have if match_all else wanted & have:
+            found.add(title)
+    return found
+
+
+NAMES: tuple[str, ...] = ("work", "home", "urgent", "long tag", "missing")
+FILTERS: list[list[str]] = [list(names) for size in (1, 2, 3)
+                            for names in combinations(NAMES, size)]
+
+
+@pytest.mark.parametrize("names", FILTERS, ids=",".join)
+def test_all_and_any_filters(database: Database, tagged: dict[str, int],
+                             names: list[str]) -> None:
+    titles_all = {task.title for task in database.get_tasks(
+        tags_all=names)}
+    titles_any = {task.title for task in database.get_tasks(
+        tags_any=names)}
+    assert titles_all == matching(names, True)
+    assert titles_any == matching(names, False)
+
+
+def test_filter_names_are_normalized(database: Database,
+                                     tagged: dict[str, int]) -> None:
+    assert {task.title for task in database.get_tasks(
+        tags_all=[" WORK ", "work", "Long  Tag"])} == {"g"}
+    assert {task.title for task in database.get_tasks(
+        tags_any=["HOME"])} == {"b", "d"}
+
+
+def test_all_and_any_combine(database: Database,
+                             tagged: dict[str, int]) -> None:
+    assert {task.title for task in database.get_tasks(
+        tags_all=["work"], tags_any=["home", "long tag"])} == {
+        "b", "d", "g"}
+    assert {task.title for task in database.get_tasks(
+        "title", "descending", "Low", tags_all=["work", "urgent"],
+        tags_any=["home"])} == {"d"}
+
+
+def test_links_follow_updates_and_deletes(database: Database,
+                                          tagged: dict[str, int]) -> None:
+    assert database.update_task(tagged["a"], tags="home")
+    assert {task.title for task in database.get_tasks(
+        tags_all=["work", "urgent"])} == {"d"}
+    assert {task.title for task in database.get_tasks(
+        tags_any=["home"])} == {"a", "b", "d"}
+    assert database.update_task(tagged["b"], tags="")
+    assert database.delete_tasks([tagged["d"]])[tagged["d"]]
+    assert {task.title for task in database.get_tasks(
+        tags_any=["home"])} == {"a"}
+    assert dict(database.get_tag_counts()) == {
+        "home": 1, "homework": 1, "work": 1, "long tag": 1}
+
+
+def test_tag_counts(database: Database, tagged: dict[str, int]) -> None:
+    assert database.get_tag_counts() == [
+        ("work", 4), ("home", 2), ("urgent", 2), ("homework", 1),
+        ("long tag", 1)]
+
+
+def test_logic_tag_filters_share_cache_key(logic_db: str) -> None:
+    for title, tags in TAGGED.items():
+        logic.add_new_task(title, "", "Low", None, tags)
+    first = logic.get_all_tasks(tags_all=["work", "home"])
+    hits = logic.get_cache().hits
+    assert logic.get_all_tasks(tags_all=["Home", "work"]) == first
+    assert logic.get_cache().hits == hits + 1
+    assert {task.title for task in first} == {"b", "d"}
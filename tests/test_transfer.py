@@ -0,0 +1,140 @@
+import io
+from datetime import datetime
+import pytest
+import logic
+from transfer import (EXPORT_FIELDS, IMPORT_FIELDS, ImportResult,
+                      detect_format, read_csv, read_jsonl, valid_rows,
+                      validate_record)
+
+TASKS: list[tuple] = [
+    ("Простая", "", "Low", None, None),
+    ("Запятые, \"кавычки\"", "строка 1\nстрока 2", "High",
+     datetime(2030, 1, 2, 3, 4, 5), "work, home"),
+    ("Unicode ✓ ёЁ", "описание", "Medium", datetime(2031, 12, 31), "ё"),
+]
+
+
+@pytest.mark.parametrize("record, expected", [
+    ({"title": "a", "priority": "Low"}, ("a", None, "Low", None, None)),
+    ({"title": "a", "description": "", "priority": "High",
+      "deadline": "2030-01-02 03:04", "tags": "x", "id": 5},
+     ("a", None, "High", datetime(2030, 1, 2, 3, 4), "x")),
+    ({"title": "a", "priority": "Medium", "deadline": ""},
+     ("a", None, "Medium", None, None)),
+])
+def test_validate_record_accepts(record: dict, expected: tuple) -> None:
+    assert validate_record(record) == expected
+
+
+@pytest.mark.parametrize("record, message", [
+    ({"priority": "Low"}, "не указан заголовок"),
+    ({"title": "", "priority": "Low"}, "не указан заголовок"),
+    ({"title": "a"}, "недопустимый приоритет: None"),
+    ({"title": "a", "priority": "low"}, "недопустимый приоритет: low"),
+    ({"title": "a", "priority": "Low", "deadline": "завтра"},
+     "некорректный дедлайн: завтра"),
+    ({"title": 1, "priority": "Low"}, "поле title должно быть строкой"),
+    ({"title": "a", "priority": "Low", "tags": ["x"]},
+     "поле tags должно быть строкой"),
+    ({"__error__": "сломано"}, "сломано"),
+])
+def test_validate_record_rejects(record: dict, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        validate_record(record)
+
+
+def test_csv_errors_report_file_lines() -> None:
+    file = io.StringIO(
+        "title,description,priority,deadline,tags\r\n"
+        "ok,,Low,,\r\n"
+        ",,Low,,\r\n"
+        "multi,\"a\r\nb\",Bad,,\r\n"
+        "late,,High,2030-13-01,\r\n"
+        "ok2,,Medium,2030-01-01,t\r\n")
+    result = ImportResult()
+    rows = list(valid_rows(read_csv(file), result))
+    assert [row[0] for row in rows] == ["ok", "ok2"]
+    assert result.errors == [
+        (3, "не указан заголовок"),
+        (5, "недопустимый приоритет: Bad"),
+        (6, "некорректный дедлайн: 2030-13-01")]
+
+
+def test_jsonl_errors_report_file_lines() -> None:
+    file = io.StringIO(
+        '{"title": "ok", "priority": "Low"}\n'
+        "\n"
+        "{broken\n"
+        '["title", "priority"]\n'
+        '{"title": "n", "priority": "Low", "deadline": 20300101}\n'
+        '{"title": "ok2", "priority": "High"}\n')
+    result = ImportResult()
+    rows = list(valid_rows(read_jsonl(file), result))
+    assert [row[0] for row in rows] == ["ok", "ok2"]
+    assert [line for line, _ in result.errors] == [3, 4, 5]
+    assert result.errors[0][1].startswith("некорректный JSON")
+    assert result.errors[1][1] == "строка должна быть JSON-объектом"
+    assert result.errors[2][1] == "поле deadline должно быть строкой"
+
+
+def test_detect_format() -> None:
+    assert detect_format("tasks.csv") == "csv"
+    assert detect_format("tasks.ndjson") == "jsonl"
+    with pytest.raises(ValueError):
+        detect_format("tasks.xlsx")
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_export_import_round_trip(logic_db: str, tmp_path,
+                                  extension: str) -> None:
+    for task in TASKS:
+        logic.add_new_task(*task)
+    exported = logic.get_all_tasks("title", "ascending")
+    path = str(tmp_path / f"tasks.{extension}")
+    assert logic.export_tasks(path, sort_field="title",
+                              sort_order="ascending") == len(TASKS)
+
+    logic.init_db(str(tmp_path / "copy.sqlite"))
+    result = logic.import_tasks(path)
+    assert (result.imported, result.errors) == (len(TASKS), [])
+    imported = logic.get_all_tasks("title", "ascending")
+
+    def fields(task) -> tuple:
+        return tuple(getattr(task, field) or None
+                     for field in IMPORT_FIELDS)
+
+    assert [fields(task) for task in imported] == [
+        fields(task) for task in exported]
+    assert {task.title for task in logic.get_all_tasks(
+        tags_all=["work", "home"])} == {TASKS[1][0]}
+    assert {task.title for task in logic.search_tasks("строка")} == {
+        TASKS[1][0]}
+
+
+def test_export_writes_every_column(logic_db: str, tmp_path) -> None:
+    task_id = logic.add_new_task(*TASKS[1])
+    logic.complete_task(task_id, datetime(2030, 2, 1, 8, 0))
+    path = str(tmp_path / "tasks.jsonl")
+    assert logic.export_tasks(path) == 1
+    with open(path, encoding="utf-8") as file:
+        [(_, record)] = read_jsonl(file)
+    assert list(record) == list(EXPORT_FIELDS)
+    assert record["id"] == task_id
+    assert record["deadline"] == "2030-01-02 03:04:05"
+    assert record["completed_at"] == "2030-02-01 08:00:00"
+    assert (record["priority"], record["status"]) == ("High", "Completed")
+
+
+def test_import_reports_errors_and_keeps_valid_rows(logic_db: str,
+                                                    tmp_path) -> None:
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(
+        '{"title": "ok", "priority": "Low", "tags": "a"}\n'
+        '{"title": "bad", "priority": "Urgent"}\n'
+        "not json\n", encoding="utf-8")
+    assert logic.get_all_tasks() == []
+    result = logic.import_tasks(str(path))
+    assert result.imported == 1
+    assert [line for line, _ in result.errors] == [2, 3]
+    assert [task.title for task in logic.get_all_tasks(
+        tags_all=["a"])] == ["ok"]
@@ -0,0 +1,168 @@
+import csv
+import json
+from datetime import datetime
+from typing import IO, Iterable, Iterator
+
+# Поля, которые берутся из файла при импорте (в порядке INSERT).
+IMPORT_FIELDS: tuple[str, ...] = (
+    "title", "description", "priority", "deadline", "tags")
+
+# Столбцы таблицы tasks в порядке SELECT * (используются при экспорте).
+EXPORT_FIELDS: tuple[str, ...] = (
+    "id", "title", "description", "priority", "deadline", "status",
+    "created_at", "completed_at", "tags")
+
+PRIORITIES: tuple[str, ...] = ("Low", "Medium", "High")
+
+FORMATS: tuple[str, ...] = ("csv", "jsonl")
+
+
+class ImportResult:
+    """Класс представляет собой итог импорта задач."""
+
+    def __init__(self) -> None:
+        """Инициализация объекта ImportResult."""
+        self.imported: int = 0
+        self.errors: list[tuple[int, str]] = []
+
+    def add_error(self, line: int, message: str) -> None:
+        """Добавляет ошибку строки файла.
+
+        Args:
+            line: Номер строки.
+            message: Описание ошибки.
+        """
+        self.errors.append((line, message))
+
+
+def detect_format(path: str) -> str:
+    """Определяет формат файла по расширению (.csv или .jsonl)."""
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError(f"Не удалось определить формат файла: {path}")
+
+
+def read_csv(file: IO[str]) -> Iterator[tuple[int, dict]]:
+    """Построчно читает задачи из CSV с заголовком.
+
+    Returns:
+        Пары (номер строки, запись).
+    """
+    reader = csv.DictReader(file)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def read_jsonl(file: IO[str]) -> Iterator[tuple[int, dict]]:
+    """Построчно читает задачи из JSON Lines; некорректная строка
+       возвращается как запись с ключом "__error__".
+
+    Returns:
+        Пары (номер строки, запись).
+    """
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = {"__error__": f"некорректный JSON: {e}"}
+        if not isinstance(record, dict):
+            record = {"__error__": "строка должна быть JSON-объектом"}
+        yield line_number, record
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def validate_record(record: dict) -> tuple:
+    """Проверяет запись и приводит ее к параметрам INSERT.
+
+    Args:
+        record: Запись из файла.
+
+    Returns:
+        Кортеж значений в порядке IMPORT_FIELDS.
+
+    Raises:
+        ValueError: Если запись некорректна.
+    """
+    if "__error__" in record:
+        raise ValueError(record["__error__"])
+    values: dict = {field: record.get(field) for field in IMPORT_FIELDS}
+    for field, value in values.items():
+        if value == "":
+            values[field] = None
+        elif value is not None and not isinstance(value, str):
+            raise ValueError(f"поле {field} должно быть строкой")
+    if not values["title"]:
+        raise ValueError("не указан заголовок")
+    if values["priority"] not in PRIORITIES:
+        raise ValueError(f"недопустимый приоритет: {values['priority']}")
+    if values["deadline"] is not None:
+        try:
+            values["deadline"] = datetime.fromisoformat(values["deadline"])
+        except ValueError:
+            raise ValueError(
+                f"некорректный дедлайн: {values['deadline']}") from None
+    return tuple(values[field] for field in IMPORT_FIELDS)
+
+
+def valid_rows(records: Iterable[tuple[int, dict]],
+               result: ImportResult) -> Iterator[tuple]:
+    """Пропускает только корректные записи, ошибки собираются в result.
+
+    Args:
+        records: Пары (номер строки, запись).
+        result: Итог импорта.
+
+    Returns:
+        Кортежи значений для INSERT.
+    """
+    for line_number, record in records:
+        try:
+            yield validate_record(record)
+        except ValueError as e:
+            result.add_error(line_number, str(e))
+
+
+def _export_value(value: object) -> object:
+    """Приводит значение столбца к виду для файла экспорта."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def write_csv(rows: Iterable[tuple], file: IO[str]) -> int:
+    """Построчно записывает задачи в CSV с заголовком.
+
+    Returns:
+        Количество записанных задач.
+    """
+    writer = csv.writer(file)
+    writer.writerow(EXPORT_FIELDS)
+    count: int = 0
+    for row in rows:
+        writer.writerow([_export_value(value) for value in row])
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[tuple], file: IO[str]) -> int:
+    """Построчно записывает задачи в JSON Lines.
+
+    Returns:
+        Количество записанных задач.
+    """
+    count: int = 0
+    for row in rows:
+        record = {field: _export_value(value)
+                  for field, value in zip(EXPORT_FIELDS, row)}
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
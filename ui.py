@@ -1,16 +1,33 @@
+from datetime import datetime
+from functools import partial
+from typing import Callable
 from PyQt6.QtWidgets import (QWidget, QDialog, QFormLayout, QLabel, QLineEdit,
                              QPushButton, QVBoxLayout, QHBoxLayout, QComboBox,
-                             QGridLayout, QTextEdit, QListWidget,
-                             QListWidgetItem, QDateTimeEdit,
-                             QMessageBox, QDialogButtonBox)
-from PyQt6.QtCore import Qt, QDateTime
+                             QGridLayout, QTextEdit, QListView,
+                             QAbstractItemView, QCheckBox,
+                             QDateTimeEdit, QMessageBox, QDialogButtonBox)
+from PyQt6.QtCore import Qt, QDateTime, QModelIndex, QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
 from logic import (add_new_task,
-                   get_all_tasks,
-                   search_tasks,
+                   find_tasks,
+                   find_tasks_page,
+                   get_pool,
+                   get_tag_counts,
                    complete_task,
+                   complete_tasks,
+                   delete_tasks,
                    update_task,
+                   update_tasks,
                    get_task_by_id)
+from live_search import LiveSearch, search_terms, task_matches
 from models import Task
+from query import TaskQuery
+from tags import parse_tags
+from task_list_model import TaskListModel
+from workers import DataLoader, ReminderTimer, TaskEventBridge
+
+# Пауза после ввода, через которую запускается поиск (мс).
+SEARCH_DELAY_MS: int = 250
 
 
 class TaskManagerUI(QWidget):
@@ -21,6 +38,8 @@ class TaskManagerUI(QWidget):
         super().__init__()
         self.setWindowTitle("Task Manager")
         self.setWindowFlags(self.windowFlags())
+        # Записи из потока GUI не ждут освобождения БД дольше ~1 с.
+        get_pool().limit_thread_writes()
 
         title_label: QLabel = QLabel("Title:")
         self.title_edit: QLineEdit = QLineEdit()
@@ -46,6 +65,10 @@ class TaskManagerUI(QWidget):
         priority_filter_label = QLabel("Filter by Priority:")
         self.priority_filter_combo = QComboBox()
         self.priority_filter_combo.addItems(["All", "Low", "Medium", "High"])
+        tag_filter_label = QLabel("Filter by Tag:")
+        self.tag_filter_combo = QComboBox()
+        self.tag_filter_combo.addItem("All", None)
+        self.include_archive_check: QCheckBox = QCheckBox("Include Archive")
 
         add_layout: QGridLayout = QGridLayout()
         add_layout.addWidget(title_label, 0, 0)
@@ -60,13 +83,42 @@ class TaskManagerUI(QWidget):
         add_layout.addWidget(self.tags_edit, 4, 1)
         add_layout.addWidget(add_button, 5, 1)
 
-        self.task_list: QListWidget = QListWidget()
-        self.task_list.itemClicked.connect(self.show_task_details)
+        self.loader: DataLoader = DataLoader(self)
+        self.task_model: TaskListModel = TaskListModel(self, self.loader)
+        self.task_model.loadFailed.connect(self.show_load_error)
+        self.task_events: TaskEventBridge = TaskEventBridge(self)
+        self.task_events.taskChanged.connect(self.task_model.apply_event)
+        self.task_events.taskChanged.connect(self.update_tag_filter)
+        self.task_list: QListView = QListView()
+        self.task_list.setUniformItemSizes(True)
+        self.task_list.setModel(self.task_model)
+        self.task_list.setSelectionMode(
+            QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.task_list.activated.connect(self.show_task_details)
+
+        complete_selected_button: QPushButton = QPushButton(
+            "Complete Selected")
+        complete_selected_button.clicked.connect(self.complete_selected)
+        self.batch_priority_combo: QComboBox = QComboBox()
+        self.batch_priority_combo.addItems(["Low", "Medium", "High"])
+        set_priority_button: QPushButton = QPushButton("Set Priority")
+        set_priority_button.clicked.connect(self.set_selected_priority)
+        delete_selected_button: QPushButton = QPushButton("Delete Selected")
+        delete_selected_button.clicked.connect(self.delete_selected)
 
         search_label: QLabel = QLabel("Search:")
         self.search_edit: QLineEdit = QLineEdit()
         search_button: QPushButton = QPushButton("Search")
         search_button.clicked.connect(self.search_tasks)
+        # Поиск по мере ввода: таймер перезапускается при каждом изменении
+        # строки, запрос выполняется после паузы.
+        self.live_search: LiveSearch = LiveSearch()
+        self.task_events.taskChanged.connect(self.live_search.reset)
+        self.search_timer: QTimer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search_tasks)
+        self.search_edit.textChanged.connect(self.search_timer.start)
 
         search_layout: QHBoxLayout = QHBoxLayout()
         search_layout.addWidget(search_label)
@@ -81,6 +133,15 @@ class TaskManagerUI(QWidget):
         priority_filter_layout = QHBoxLayout()
         priority_filter_layout.addWidget(priority_filter_label)
         priority_filter_layout.addWidget(self.priority_filter_combo)
+        priority_filter_layout.addWidget(tag_filter_label)
+        priority_filter_layout.addWidget(self.tag_filter_combo)
+        priority_filter_layout.addWidget(self.include_archive_check)
+
+        batch_layout: QHBoxLayout = QHBoxLayout()
+        batch_layout.addWidget(complete_selected_button)
+        batch_layout.addWidget(self.batch_priority_combo)
+        batch_layout.addWidget(set_priority_button)
+        batch_layout.addWidget(delete_selected_button)
 
         main_layout: QVBoxLayout = QVBoxLayout()
         main_layout.addLayout(add_layout)
@@ -88,30 +149,42 @@ class TaskManagerUI(QWidget):
         main_layout.addLayout(sort_layout)
         main_layout.addLayout(priority_filter_layout)
         main_layout.addWidget(self.task_list)
+        main_layout.addLayout(batch_layout)
         self.setLayout(main_layout)
+        # Окно статистики запросов открывается по Ctrl+Shift+D.
+        self.debug_panel = None
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.show_debug_panel)
+        self.reminders: ReminderTimer = ReminderTimer(self)
+        self.reminders.remindersDue.connect(self.show_reminders)
+        self.reminders.start()
         self.update_task_list()
+        self.update_tag_filter()
         self.sort_field_combo.currentIndexChanged.connect(
             self.update_task_list)
         self.sort_order_combo.currentIndexChanged.connect(
             self.update_task_list)
         self.priority_filter_combo.currentIndexChanged.connect(
             self.update_task_list)
+        self.tag_filter_combo.currentIndexChanged.connect(
+            self.update_task_list)
+        self.include_archive_check.toggled.connect(self.update_task_list)
 
     def add_task(self) -> None:
         """Добавление задачи и обновление списка задач."""
         title: str = self.title_edit.text()
         description: str = self.description_edit.toPlainText()
         priority: str = self.priority_combo.currentText()
-        deadline: str = self.deadline_edit.dateTime().toString(
-            "yyyy-MM-dd HH:mm:ss")
+        deadline: datetime = self.deadline_edit.dateTime().toPyDateTime()
         tags: str = self.tags_edit.text()
 
         if not title:
             QMessageBox.warning(self, "Ошибка", "Введите заголовок задачи!")
             return
 
-        add_new_task(title, description, priority, deadline, tags)
-        self.update_task_list()
+        if add_new_task(title, description, priority, deadline, tags) is None:
+            QMessageBox.warning(
+                self, "Ошибка", "Ошибка при добавлении задачи.")
+            return
         self.clear_input_fields()
 
     def clear_input_fields(self) -> None:
@@ -122,54 +195,199 @@ class TaskManagerUI(QWidget):
         self.deadline_edit.setDateTime(QDateTime.currentDateTime())
         self.tags_edit.clear()
 
+    def current_query(self) -> TaskQuery:
+        """Составной запрос по выбранным сортировке и фильтрам (без
+           строки поиска)."""
+        tag: str | None = self.tag_filter_combo.currentData()
+        return TaskQuery.create(
+            self.sort_field_combo.currentText().lower(),
+            self.sort_order_combo.currentText().lower(),
+            self.priority_filter_combo.currentText(),
+            None if tag is None else [tag],
+            include_archive=self.include_archive_check.isChecked())
+
+    def current_filter(self, query: TaskQuery) -> Callable[[Task], bool]:
+        """Условие попадания задачи в список для запроса query (по нему
+           модель размещает измененные задачи)."""
+        terms: list[str] = search_terms(query.text or "")
+
+        def task_filter(task: Task) -> bool:
+            return ((not query.priorities or task.priority in query.priorities)
+                    and all(tag in parse_tags(task.tags)
+                            for tag in query.tags_all)
+                    and task_matches(task, terms))
+
+        return task_filter
+
     def update_task_list(self) -> None:
-        """Обновление списка задач, отображаемых в UI."""
-        sort_field = self.sort_field_combo.currentText().lower()
-        sort_order = self.sort_order_combo.currentText().lower()
-        priority_filter = self.priority_filter_combo.currentText()
-        self.task_list.clear()
-        tasks: list[Task] = get_all_tasks(
-            sort_field, sort_order, priority_filter)
-        for task in tasks:
-            item_text: str = f"""Title: {task.title}
-Status: {task.status}
-Priority: {task.priority}
-Tags: {task.tags if task.tags else "N/A"}"""
-            item: QListWidgetItem = QListWidgetItem(item_text)
-            item.setData(Qt.ItemDataRole.UserRole, task.id)
-            self.task_list.addItem(item)
+        """Обновление списка задач, отображаемых в UI.
+
+        Задачи подгружаются моделью постранично по мере прокрутки. Если
+        введена строка поиска, список строится поиском с теми же
+        сортировкой и фильтрами."""
+        if self.search_edit.text().strip():
+            self.search_tasks()
+            return
+        query: TaskQuery = self.current_query()
+        sort_field, sort_order = query.sort[0]
+        self.task_model.set_fetcher(
+            partial(find_tasks_page, query), sort_field, sort_order,
+            self.current_filter(query))
+
+    def update_tag_filter(self) -> None:
+        """Загружает в фоне тэги с количеством задач для фильтра."""
+        self.loader.submit("tag_counts", get_tag_counts,
+                           on_result=self.fill_tag_filter)
+
+    def fill_tag_filter(self, tag_counts: list[tuple[str, int]]) -> None:
+        """Заполняет фильтр тэгов, сохраняя выбранный тэг."""
+        current: str | None = self.tag_filter_combo.currentData()
+        self.tag_filter_combo.blockSignals(True)
+        self.tag_filter_combo.clear()
+        self.tag_filter_combo.addItem("All", None)
+        for name, count in tag_counts:
+            self.tag_filter_combo.addItem(f"{name} ({count})", name)
+        index: int = self.tag_filter_combo.findData(current)
+        self.tag_filter_combo.setCurrentIndex(max(index, 0))
+        self.tag_filter_combo.blockSignals(False)
+        if index < 0 and current is not None:
+            self.update_task_list()
 
     def search_tasks(self) -> None:
         """Выполняет поиск задач на основе поискового запроса
-           и обновляет список задач."""
+           и обновляет список задач.
+
+        Поиск учитывает выбранные сортировку и фильтры (один запрос к
+        БД). Если строка продолжает прежнюю, прежний результат сужается
+        в памяти; иначе запрос выполняется в фоне, а незавершенный запрос
+        по прежней строке отменяется."""
+        self.search_timer.stop()
         search_term: str = self.search_edit.text()
-        if search_term:
-            tasks: list[Task] = search_tasks(search_term)
-            self.update_task_list_from_tasks(tasks)
-        else:
+        if not search_term.strip():
+            self.live_search.reset()
             self.update_task_list()
+            return
+        scope: TaskQuery = self.current_query()
+        query: TaskQuery = scope.where_text(search_term)
+        sort_field, sort_order = query.sort[0]
+        task_filter = self.current_filter(query)
+        narrowed = self.live_search.narrow(search_term, scope)
+        if narrowed is not None:
+            self.task_model.set_fetcher(
+                lambda limit, page_token: (narrowed, None),
+                sort_field, sort_order, task_filter)
+            return
+        live_search: LiveSearch = self.live_search
+        generation: int = live_search.generation
+
+        def fetch(limit: int, page_token: str | None
+                  ) -> tuple[list[Task], None]:
+            tasks = find_tasks(query)
+            live_search.remember(search_term, scope, tasks, generation)
+            return tasks, None
+
+        self.task_model.set_fetcher(fetch, sort_field, sort_order,
+                                    task_filter)
 
     def update_task_list_from_tasks(self, tasks: list[Task]) -> None:
         """Обновляет список задач определенным списком задач."""
-        self.task_list.clear()
-        for task in tasks:
-            item_text: str = f"""Title: {task.title}
-Status: {task.status}
-Priority: {task.priority}
-Tags: {task.tags if task.tags else "N/A"}"""
-            item: QListWidgetItem = QListWidgetItem(item_text)
-            item.setData(Qt.ItemDataRole.UserRole, task.id)
-            self.task_list.addItem(item)
-
-    def show_task_details(self, item: QListWidgetItem) -> None:
+        self.task_model.set_tasks(tasks)
+
+    def selected_task_ids(self) -> list[int]:
+        """Возвращает id выделенных в списке задач."""
+        return [index.data(Qt.ItemDataRole.UserRole)
+                for index in self.task_list.selectionModel().selectedRows()]
+
+    def complete_selected(self) -> None:
+        """Завершает выделенные задачи одной транзакцией."""
+        task_ids: list[int] = self.selected_task_ids()
+        if task_ids:
+            self.show_batch_result("Завершено", complete_tasks(task_ids))
+
+    def set_selected_priority(self) -> None:
+        """Задает выбранный приоритет выделенным задачам."""
+        task_ids: list[int] = self.selected_task_ids()
+        if task_ids:
+            priority: str = self.batch_priority_combo.currentText()
+            self.show_batch_result(
+                "Обновлено", update_tasks(task_ids, priority=priority))
+
+    def delete_selected(self) -> None:
+        """Удаляет выделенные задачи после подтверждения."""
+        task_ids: list[int] = self.selected_task_ids()
+        if not task_ids:
+            return
+        answer = QMessageBox.question(
+            self, "Удаление", f"Удалить выбранные задачи ({len(task_ids)})?")
+        if answer == QMessageBox.StandardButton.Yes:
+            self.show_batch_result("Удалено", delete_tasks(task_ids))
+
+    def show_batch_result(self,
+                          action: str,
+                          outcomes: dict[int, bool] | None) -> None:
+        """Сообщает итог пакетной операции над выделенными задачами.
+
+        Args:
+            action: Описание действия ("Завершено", "Удалено", ...).
+            outcomes: Результат для каждого id (None - ошибка БД).
+        """
+        if outcomes is None:
+            QMessageBox.warning(
+                self, "Ошибка", "Ошибка при изменении задач.")
+            return
+        missing: list[str] = [
+            str(task_id) for task_id, done in outcomes.items() if not done]
+        if missing:
+            QMessageBox.warning(
+                self, "Ошибка",
+                f"Задачи не найдены: {', '.join(missing)}.")
+        QMessageBox.information(
+            self, "Успех",
+            f"{action} задач: {len(outcomes) - len(missing)}.")
+
+    def show_debug_panel(self) -> None:
+        """Открывает окно статистики запросов к БД."""
+        if self.debug_panel is None:
+            from debug_panel import DebugPanel
+            self.debug_panel = DebugPanel(self)
+        self.debug_panel.show()
+        self.debug_panel.raise_()
+
+    def show_reminders(self, tasks: list[Task]) -> None:
+        """Сообщает о наступивших дедлайнах, не блокируя окно."""
+        lines = "\n".join(f"{task.deadline:%Y-%m-%d %H:%M}  {task.title}"
+                          for task in tasks)
+        box = QMessageBox(QMessageBox.Icon.Information, "Напоминание",
+                          f"Наступил дедлайн:\n{lines}",
+                          QMessageBox.StandardButton.Ok, self)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        box.setModal(False)
+        box.show()
+
+    def show_load_error(self, error: str) -> None:
+        """Сообщает об ошибке загрузки списка задач."""
+        QMessageBox.warning(
+            self, "Ошибка", f"Ошибка при загрузке задач: {error}")
+
+    def closeEvent(self, event) -> None:
+        """Отменяет загрузку списка и дожидается фоновых запросов."""
+        self.task_events.detach()
+        self.reminders.stop()
+        self.search_timer.stop()
+        self.loader.cancel(TaskListModel.CHANNEL)
+        self.loader.cancel("tag_counts")
+        self.loader.wait()
+        super().closeEvent(event)
+
+    def show_task_details(self, index: QModelIndex) -> None:
         """Отображает подробную информацию о выбранной задаче и
            предоставляет опции для обновления или завершения."""
-        task_id: int = item.data(Qt.ItemDataRole.UserRole)
+        task_id: int = index.data(Qt.ItemDataRole.UserRole)
         try:
-            task: Task = get_task_by_id(task_id)
+            task: Task = get_task_by_id(
+                task_id, self.include_archive_check.isChecked())
             details_dialog = TaskDetailsDialog(task)
             details_dialog.exec()
-            self.update_task_list()
         except IndexError:
             QMessageBox.warning(self, "Ошибка", "Задача не найдена.")
 
@@ -188,7 +406,9 @@ class TaskDetailsDialog(QDialog):
         self.form.addRow(QLabel("Title:"), QLabel(task.title))
         self.form.addRow(QLabel("Description:"), QLabel(task.description))
         self.form.addRow(QLabel("Priority:"), QLabel(task.priority))
-        self.form.addRow(QLabel("Deadline:"), QLabel(task.deadline))
+        deadline: str = (task.deadline.strftime("%Y-%m-%d %H:%M")
+                         if task.deadline else "-")
+        self.form.addRow(QLabel("Deadline:"), QLabel(deadline))
         self.form.addRow(QLabel("Status:"), QLabel(task.status))
         self.form.addRow(QLabel("Tags:"), QLabel(task.tags))
 
@@ -239,7 +459,8 @@ class TaskUpdateDialog(QDialog):
         self.priority_combo.addItems(["Low", "Medium", "High"])
         self.priority_combo.setCurrentText(task.priority)
         self.deadline_edit: QDateTimeEdit = QDateTimeEdit(
-            QDateTime.currentDateTime())
+            QDateTime(task.deadline) if task.deadline
+            else QDateTime.currentDateTime())
         self.deadline_edit.setCalendarPopup(True)
         self.tags_edit: QLineEdit = QLineEdit(task.tags)
 
@@ -265,7 +486,7 @@ class TaskUpdateDialog(QDialog):
         title: str = self.title_edit.text()
         description: str = self.description_edit.toPlainText()
         priority: str = self.priority_combo.currentText()
-        deadline: str = self.deadline_edit.dateTime().toString("yyyy-MM-dd")
+        deadline: datetime = self.deadline_edit.dateTime().toPyDateTime()
         tags: str = self.tags_edit.text()
 
         if update_task(self.task_id,
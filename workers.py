@@ -0,0 +1,196 @@
+import sqlite3
+import threading
+from datetime import timedelta
+from typing import Any, Callable
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from logic import get_pool, subscribe, unsubscribe
+from models import TaskEvent
+from reminders import ReminderThread
+
+
+class _JobSignals(QObject):
+    """Сигналы фонового задания (живут в потоке GUI)."""
+
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class _Job(QRunnable):
+    """Фоновое задание: вызов функции логического слоя в пуле потоков."""
+
+    def __init__(self,
+                 request_id: int,
+                 fn: Callable[..., Any],
+                 args: tuple) -> None:
+        super().__init__()
+        self.request_id: int = request_id
+        self.fn: Callable[..., Any] = fn
+        self.args: tuple = args
+        self.signals: _JobSignals = _JobSignals()
+        self._lock = threading.Lock()
+        self._cancelled: bool = False
+        self._conn: sqlite3.Connection | None = None
+
+    def cancel(self) -> None:
+        """Отменяет задание; выполняющийся SQL-запрос прерывается."""
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def run(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            # Логический слой работает через соединение текущего потока.
+            self._conn = get_pool().connection()
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            error: str | None = str(e)
+        else:
+            error = None
+        with self._lock:
+            self._conn = None
+            if self._cancelled:
+                return
+        if error is None:
+            self.signals.finished.emit(self.request_id, result)
+        else:
+            self.signals.failed.emit(self.request_id, error)
+
+
+class DataLoader(QObject):
+    """Асинхронный доступ к данным для UI (наследуется от QObject).
+
+    Запросы выполняются в QThreadPool. Каждый запрос относится к каналу
+    (например, "task_list"): новый запрос в канале отменяет предыдущий,
+    поэтому устаревшие результаты до UI не доходят. Обработчики
+    результата и ошибки вызываются в потоке GUI.
+    """
+
+    def __init__(self,
+                 parent: QObject | None = None,
+                 max_threads: int = 2) -> None:
+        super().__init__(parent)
+        self._thread_pool: QThreadPool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(max_threads)
+        self._next_id: int = 0
+        self._current: dict[str, _Job] = {}
+        self._handlers: dict[int, tuple[str, Callable, Callable | None]] = {}
+
+    def submit(self,
+               channel: str,
+               fn: Callable[..., Any],
+               *args: Any,
+               on_result: Callable[[Any], None],
+               on_error: Callable[[str], None] | None = None) -> int:
+        """Запускает fn(*args) в фоне, отменяя предыдущий запрос канала.
+
+        Args:
+            channel: Канал запроса.
+            fn: Функция логического слоя.
+            args: Аргументы функции.
+            on_result: Обработчик результата.
+            on_error: Обработчик ошибки (по умол. None).
+
+        Returns:
+            id запроса.
+        """
+        self.cancel(channel)
+        self._next_id += 1
+        job = _Job(self._next_id, fn, args)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        self._current[channel] = job
+        self._handlers[job.request_id] = (channel, on_result, on_error)
+        self._thread_pool.start(job)
+        return job.request_id
+
+    def cancel(self, channel: str) -> None:
+        """Отменяет текущий запрос канала, если он есть."""
+        job = self._current.pop(channel, None)
+        if job is None:
+            return
+        self._handlers.pop(job.request_id, None)
+        try:
+            taken: bool = self._thread_pool.tryTake(job)
+        except RuntimeError:
+            # Задание уже выполнено и удалено пулом, а его сигнал еще не
+            # обработан: снятых обработчиков достаточно.
+            return
+        if not taken:
+            job.cancel()
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Ожидает завершения всех запущенных запросов."""
+        return self._thread_pool.waitForDone(msecs)
+
+    def _take_handlers(self, request_id: int
+                       ) -> tuple[Callable, Callable | None] | None:
+        """Снимает обработчики завершившегося запроса."""
+        handlers = self._handlers.pop(request_id, None)
+        if handlers is None:
+            return None
+        channel, on_result, on_error = handlers
+        job = self._current.get(channel)
+        if job is not None and job.request_id == request_id:
+            del self._current[channel]
+        return on_result, on_error
+
+    def _on_finished(self, request_id: int, result: object) -> None:
+        handlers = self._take_handlers(request_id)
+        if handlers is not None:
+            handlers[0](result)
+
+    def _on_failed(self, request_id: int, error: str) -> None:
+        handlers = self._take_handlers(request_id)
+        if handlers is not None and handlers[1] is not None:
+            handlers[1](error)
+
+
+class TaskEventBridge(QObject):
+    """Передает события изменения задач из логического слоя в поток GUI
+       (наследуется от QObject)."""
+
+    taskChanged = pyqtSignal(object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        subscribe(self._emit)
+
+    def _emit(self, event: TaskEvent) -> None:
+        # Вызывается в потоке, где произошло изменение; сигнал доставляется
+        # получателям в их потоке.
+        self.taskChanged.emit(event)
+
+    def detach(self) -> None:
+        """Отписывается от событий логического слоя."""
+        unsubscribe(self._emit)
+
+
+class ReminderTimer(QObject):
+    """Напоминания о дедлайнах в интерфейсе (наследуется от QObject).
+
+    Очередь загружается и перечитывается в фоновом потоке
+    (ReminderThread), поэтому медленная или заблокированная БД не
+    задерживает поток GUI. Сигнал remindersDue доставляет в поток GUI
+    список задач, время напоминания которых наступило.
+    """
+
+    remindersDue = pyqtSignal(list)
+
+    def __init__(self,
+                 parent: QObject | None = None,
+                 lead: timedelta = timedelta(0)) -> None:
+        super().__init__(parent)
+        self.scheduler: ReminderThread = ReminderThread(
+            self.remindersDue.emit, lead)
+
+    def start(self) -> None:
+        """Запускает фоновый поток напоминаний."""
+        self.scheduler.start()
+
+    def stop(self) -> None:
+        """Останавливает напоминания."""
+        self.scheduler.stop()